@@ -0,0 +1,278 @@
+# ~/autocarz/src/benchmark.py
+# 카메라/브라우저 없이 녹화 영상(또는 이미지 폴더)으로 파이프라인 처리량을 측정하는 벤치마크
+#
+# 사용 예:
+#   python benchmark.py --input ../videos/road.mp4 --intervals 1,3,5 --resolutions 640x480,1280x720 \
+#       --backends pytorch,onnx --duration 30 --output bench_results.json
+#
+# 캡처 → 탐지(추론 워커) → 그리기 → 인코딩(가상 시청자 1명)까지 실제 서버와 같은 CameraPipeline을 사용합니다.
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import itertools
+import subprocess
+import threading
+import multiprocessing
+from datetime import datetime
+
+import numpy as np
+import psutil
+
+from camera.camera_manager import CameraManager
+from camera.frame_sources import open_replay_source
+from camera.stream_profile import DEFAULT_PROFILE
+from utils.metrics import stage_seconds, frames_captured, frames_dropped, detections
+
+BENCH_CAMERA_INDEX = 0
+STAGES = ('capture', 'decode', 'yolo_detect', 'opencv_detect', 'draw', 'encode')
+DROP_REASONS = ('read_failed', 'inference_busy')
+
+def parse_resolution(text):
+    width, height = text.lower().split('x')
+    return int(width), int(height)
+
+def percentiles(values):
+    """단계별 지연 시간 요약 (ms)"""
+    if not values:
+        return {"count": 0}
+    arr = np.asarray(values) * 1000
+    return {
+        "count": int(arr.size),
+        "mean_ms": round(float(arr.mean()), 3),
+        "p50_ms": round(float(np.percentile(arr, 50)), 3),
+        "p90_ms": round(float(np.percentile(arr, 90)), 3),
+        "p99_ms": round(float(np.percentile(arr, 99)), 3),
+        "max_ms": round(float(arr.max()), 3)
+    }
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+class ResourceSampler:
+    def __init__(self, interval=0.25):
+        """
+        측정 구간의 CPU 사용률과 최대 메모리(RSS)를 기록합니다.
+        interval: RSS 샘플링 주기(초)
+        """
+        self.interval = interval
+        self._process = psutil.Process()
+        self._stop = threading.Event()
+        self._thread = None
+        self.peak_rss = 0
+
+    def start(self):
+        self._cpu_start = self._process.cpu_times()
+        self._wall_start = time.perf_counter()
+        self.peak_rss = self._process.memory_info().rss
+        self._thread = threading.Thread(target=self._run, name="bench-resource", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_rss = max(self.peak_rss, self._process.memory_info().rss)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        cpu_end = self._process.cpu_times()
+        wall = time.perf_counter() - self._wall_start
+        cpu = (cpu_end.user - self._cpu_start.user) + (cpu_end.system - self._cpu_start.system)
+        return {
+            # 100% = 코어 1개를 모두 사용
+            "cpu_percent": round(cpu / wall * 100, 1) if wall > 0 else 0.0,
+            "cpu_count": psutil.cpu_count(),
+            "peak_rss_mb": round(self.peak_rss / (1024 * 1024), 1)
+        }
+
+def counter_snapshot():
+    camera = str(BENCH_CAMERA_INDEX)
+    snapshot = {
+        "captured": frames_captured.labels(camera).value,
+        "detections_yolo": detections.labels(camera, 'yolo').value,
+        "detections_opencv": detections.labels(camera, 'opencv').value
+    }
+    for reason in DROP_REASONS:
+        snapshot[f"dropped_{reason}"] = frames_dropped.labels(camera, reason).value
+    return snapshot
+
+def run_config(args, interval, resolution, backend):
+    """
+    설정 1개로 파이프라인을 실행하고 측정 결과를 반환합니다.
+    interval: 고정 검출 간격 (자동 조절은 끔)
+    resolution: (width, height)
+    backend: 'pytorch' / 'onnx' / 'openvino'
+    """
+    width, height = resolution
+    print(f"\n⏱️ 벤치마크: 검출간격 {interval}, {width}x{height}, 백엔드 {backend}")
+    # 정확한 백분위 계산을 위해 단계별 원본 지연 시간을 보관합니다.
+    stage_seconds.enable_samples()
+
+    manager = CameraManager()
+    manager.backend = backend
+    # 측정 중에 백엔드 비교가 백그라운드에서 돌지 않도록 끕니다.
+    manager.config.set('YOLO', 'BACKEND_CHECK', 'false')
+    manager.target_width, manager.target_height = width, height
+    manager.target_fps = args.fps or 30
+    manager.detection_interval = interval
+    manager.interval_controller.enabled = False
+    manager.motion_gate_enabled = not args.no_motion_gate
+    manager.yolo_enabled = not args.no_yolo
+    manager.opencv_enabled = not args.no_opencv
+    # 측정 결과에 디스크 쓰기가 섞이지 않도록 탐지 이력 저장은 끕니다.
+    manager.events_enabled = False
+    manager.clips_enabled = False
+
+    load_start = time.perf_counter()
+    manager.wait_for_models()
+    model_load_sec = time.perf_counter() - load_start
+
+    # --fps가 없으면(0) 소스가 기다리지 않고 최대 속도로 재생합니다 (처리량 측정)
+    source = open_replay_source(args.input, fps=args.fps, loop=not args.once)
+    if not manager.start_camera(BENCH_CAMERA_INDEX, source=source):
+        print(f"❌ 입력을 열 수 없습니다: {args.input}")
+        return None
+    pipeline = manager.get_pipeline(BENCH_CAMERA_INDEX)
+
+    # 가상 시청자 1명 - 실제 서버처럼 프레임마다 JPEG 인코딩이 일어나도록 구독합니다.
+    stop_viewer = threading.Event()
+    viewer_stats = {"frames": 0, "bytes": 0}
+
+    def viewer():
+        for encoded in pipeline.broadcaster.subscribe_encoded(timeout=0.5, profile=DEFAULT_PROFILE):
+            if stop_viewer.is_set():
+                return
+            if encoded is not None:
+                viewer_stats["frames"] += 1
+                viewer_stats["bytes"] += len(encoded.jpeg)
+
+    viewer_thread = threading.Thread(target=viewer, name="bench-viewer", daemon=True)
+    viewer_thread.start()
+
+    try:
+        # 워밍업 구간의 값은 버립니다.
+        time.sleep(args.warmup)
+        stage_seconds.drain_samples()
+        counters_before = counter_snapshot()
+        viewer_before = dict(viewer_stats)
+        inferences_before = pipeline.inference_worker.processed_count
+
+        sampler = ResourceSampler()
+        sampler.start()
+        start = time.perf_counter()
+        while time.perf_counter() - start < args.duration:
+            if args.once and source.exhausted:
+                break
+            time.sleep(0.05)
+        elapsed = time.perf_counter() - start
+        resources = sampler.stop()
+
+        counters_after = counter_snapshot()
+        samples = stage_seconds.drain_samples()
+        inferences = pipeline.inference_worker.processed_count - inferences_before
+        encoded_frames = viewer_stats["frames"] - viewer_before["frames"]
+        encoded_bytes = viewer_stats["bytes"] - viewer_before["bytes"]
+    finally:
+        stop_viewer.set()
+        manager.stop_camera()
+        viewer_thread.join(timeout=2.0)
+
+    delta = {key: counters_after[key] - counters_before[key] for key in counters_after}
+    result = {
+        "config": {
+            "detection_interval": interval,
+            "resolution": f"{width}x{height}",
+            "backend": backend,
+            "model_path": manager.model_path,
+            "motion_gate": manager.motion_gate_enabled,
+            "yolo": manager.yolo_enabled,
+            "opencv": manager.opencv_enabled,
+            "paced_fps": args.fps
+        },
+        "duration_sec": round(elapsed, 2),
+        "model_load_sec": round(model_load_sec, 2),
+        "capture_fps": round(delta["captured"] / elapsed, 2) if elapsed else 0.0,
+        "stream_fps": round(encoded_frames / elapsed, 2) if elapsed else 0.0,
+        "inference_fps": round(inferences / elapsed, 2) if elapsed else 0.0,
+        "avg_jpeg_kb": round(encoded_bytes / encoded_frames / 1024, 1) if encoded_frames else 0.0,
+        "frames": delta,
+        "stages": {stage: percentiles(samples.get((stage,), [])) for stage in STAGES},
+        "resources": resources
+    }
+    print(f"   -> 캡처 {result['capture_fps']}fps, 스트림 {result['stream_fps']}fps, 추론 {result['inference_fps']}/s, "
+          f"CPU {resources['cpu_percent']}%, 최대 RSS {resources['peak_rss_mb']}MB")
+    for stage in STAGES:
+        summary = result["stages"][stage]
+        if summary["count"]:
+            print(f"      {stage:<14} p50 {summary['p50_ms']:>8.2f}ms  p90 {summary['p90_ms']:>8.2f}ms  p99 {summary['p99_ms']:>8.2f}ms")
+    return result
+
+def run_config_isolated(args, interval, resolution, backend):
+    """
+    설정 1개를 새 프로세스에서 실행합니다 (run_config와 같은 결과 반환)
+    - 한 프로세스에서 연달아 실행하면 이전 설정의 모델(model_registry)과 배치 추론 스레드가 남아
+      뒤쪽 설정의 CPU/최대 RSS가 부풀려지므로 설정마다 프로세스를 새로 띄웁니다.
+    """
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(processes=1) as pool:
+        return pool.apply(run_config, (args, interval, resolution, backend))
+
+def main():
+    parser = argparse.ArgumentParser(description="AutocarZ 파이프라인 벤치마크 (녹화 영상 재생, Flask 없음)")
+    parser.add_argument("--input", required=True, help="영상 파일 또는 이미지 폴더 경로")
+    parser.add_argument("--intervals", default="1,3", help="비교할 검출 간격 목록 (예: 1,3,5)")
+    parser.add_argument("--resolutions", default="640x480", help="비교할 해상도 목록 (예: 640x480,1280x720)")
+    parser.add_argument("--backends", default="pytorch", help="비교할 추론 백엔드 목록 (pytorch,onnx,openvino)")
+    parser.add_argument("--duration", type=float, default=20.0, help="설정별 측정 시간(초)")
+    parser.add_argument("--warmup", type=float, default=3.0, help="측정 전 워밍업 시간(초)")
+    parser.add_argument("--fps", type=float, default=0, help="재생 FPS 제한 (0이면 최대 속도)")
+    parser.add_argument("--once", action="store_true", help="반복 재생하지 않고 입력이 끝나면 측정 종료")
+    parser.add_argument("--no-motion-gate", action="store_true", help="움직임 게이트 끄기")
+    parser.add_argument("--no-yolo", action="store_true", help="YOLO 탐지 끄기")
+    parser.add_argument("--no-opencv", action="store_true", help="OpenCV 탐지 끄기")
+    parser.add_argument("--output", default="bench_results.json", help="결과 JSON 파일 경로")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"❌ 입력 경로가 없습니다: {args.input}")
+        sys.exit(1)
+
+    intervals = [int(v) for v in args.intervals.split(",") if v.strip()]
+    resolutions = [parse_resolution(v) for v in args.resolutions.split(",") if v.strip()]
+    backends = [v.strip().lower() for v in args.backends.split(",") if v.strip()]
+
+    results = []
+    for backend, resolution, interval in itertools.product(backends, resolutions, intervals):
+        result = run_config_isolated(args, interval, resolution, backend)
+        if result is not None:
+            results.append(result)
+
+    report = {
+        "meta": {
+            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "git_revision": git_revision(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "python": platform.python_version(),
+            "input": os.path.abspath(args.input),
+            "duration_sec": args.duration,
+            "warmup_sec": args.warmup
+        },
+        "results": results
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ 벤치마크 결과 저장: {args.output} ({len(results)}개 설정)")
+
+if __name__ == "__main__":
+    main()
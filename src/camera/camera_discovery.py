@@ -0,0 +1,359 @@
+# /home/pi/autocarz/src/camera/camera_discovery.py
+# 카메라 병렬 탐색 + 장치 성능(해상도/FPS/fourcc) 디스크 캐시 + 핫플러그 감지
+
+import os
+import re
+import json
+import glob
+import time
+import platform
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+from utils.settings_manager import PROJECT_ROOT
+
+DEFAULT_CACHE_PATH = os.path.join(PROJECT_ROOT, 'camera_cache.json')
+SYSFS_V4L_DIR = '/sys/class/video4linux'
+
+# 장치 성능 확인 시 시도해 볼 해상도 (처음 한 번만 확인하고 캐시에 저장)
+PROBE_RESOLUTIONS = ((640, 480), (1280, 720), (1920, 1080))
+
+# 카메라가 아닌 라즈베리파이 하드웨어 코덱/ISP 노드 이름 (/dev/video10~31) - 열어보지 않고 제외합니다.
+NON_CAPTURE_NAME_PREFIXES = ('bcm2835-codec', 'bcm2835-isp', 'rpivid', 'rpi-hevc', 'pispbe')
+
+# sysfs 장치 경로 속 USB 포트 이름 (예: .../usb1/1-1/1-1.3/1-1.3:1.0 → 1-1.3)
+USB_PORT_PATTERN = re.compile(r'/(\d+-\d+(?:\.\d+)*)(?=[/:]|$)')
+
+def _fourcc_to_str(value):
+    value = int(value)
+    if value <= 0:
+        return ""
+    return "".join(chr((value >> (8 * i)) & 0xFF) for i in range(4)).strip('\x00')
+
+def _read_sysfs(index, name):
+    try:
+        with open(os.path.join(SYSFS_V4L_DIR, f"video{index}", name), encoding='utf-8') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def _sysfs_device(index):
+    """
+    장치 노드의 실제 sysfs 장치 경로 (같은 포트에 꽂힌 같은 장치면 재부팅 후에도 같음)
+    return: 경로 문자열 또는 None (sysfs가 없는 환경)
+    """
+    link = os.path.join(SYSFS_V4L_DIR, f"video{index}", 'device')
+    if not os.path.exists(link):
+        return None
+    return os.path.realpath(link)
+
+def _bus_info(device_path):
+    """
+    sysfs 장치 경로로 연결 방식을 판단합니다.
+    return: {'bus': 'usb' | 'platform' | None, 'usb_port': 예 '1-1.3', 'removable': 'removable' | 'fixed' | 'unknown' | None}
+    - removable은 USB 허브 포트 정보로, 노트북 내장 웹캠은 보통 'fixed'입니다.
+    """
+    if not device_path:
+        return {'bus': None, 'usb_port': None, 'removable': None}
+    matches = list(USB_PORT_PATTERN.finditer(device_path))
+    if not matches:
+        return {'bus': 'platform', 'usb_port': None, 'removable': None}
+    last = matches[-1]
+    removable = None
+    try:
+        with open(os.path.join(device_path[:last.end()], 'removable'), encoding='utf-8') as f:
+            removable = f.read().strip()
+    except OSError:
+        pass
+    return {'bus': 'usb', 'usb_port': last.group(1), 'removable': removable}
+
+class CameraDiscovery:
+    def __init__(self, cache_path=DEFAULT_CACHE_PATH, max_index=10, poll_interval=2.0, max_workers=4):
+        """
+        카메라 탐색기
+        cache_path: 장치 성능 캐시 파일 (JSON)
+        max_index: /dev/video*가 없는 환경(윈도우)에서 확인할 인덱스 범위
+        poll_interval: 핫플러그 감지 주기(초)
+        max_workers: 동시에 확인할 장치 수
+        - 리눅스에서는 /dev/video* 목록으로 장치 유무를 판단하므로 카메라를 열지 않습니다.
+        - 해상도/FPS/fourcc는 장치별로 처음 한 번만 열어서 확인하고 캐시합니다.
+        - 열어봤지만 카메라가 아닌 노드도 (노드 번호, sysfs 장치 경로) 기준으로 캐시해 다시 열지 않습니다.
+        - 사용 중인 카메라(busy_fn)는 다시 열지 않습니다.
+        """
+        self.cache_path = cache_path
+        self.max_index = max_index
+        self.poll_interval = poll_interval
+        self.max_workers = max_workers
+        self.is_linux = platform.system().lower() == "linux"
+        self.is_windows = platform.system().lower() == "windows"
+
+        self._lock = threading.Lock()
+        self._devices = {}       # {index: 장치 정보 dict} - 현재 연결된 카메라
+        self._cache = self._load_cache()
+        self._listeners = []
+        self._busy_fn = None
+        self._monitor_thread = None
+        self._monitor_stop = threading.Event()
+
+    # --- 캐시 ---
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                return {int(k): v for k, v in json.load(f).items()}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self):
+        # 임시 파일에 쓴 뒤 교체하여 저장 중 종료되어도 캐시가 깨지지 않도록 합니다.
+        with self._lock:
+            data = {str(k): v for k, v in sorted(self._cache.items())}
+        tmp_path = f"{self.cache_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"⚠️ 카메라 캐시 저장 실패: {e}")
+
+    # --- 장치 목록 ---
+
+    def _list_device_nodes(self):
+        """
+        연결된 비디오 장치 노드 목록 {index: 장치 이름}
+        - 리눅스: /dev/video* (UVC 메타데이터 노드, 라즈베리파이 코덱/ISP 노드처럼 영상 캡처가 아닌 노드는 제외)
+        - 그 외: None (장치 목록을 알 수 없으므로 인덱스를 직접 열어봐야 함)
+        """
+        if not self.is_linux:
+            return None
+        nodes = {}
+        for path in glob.glob('/dev/video*'):
+            match = re.fullmatch(r'/dev/video(\d+)', path)
+            if not match:
+                continue
+            index = int(match.group(1))
+            # 같은 카메라의 두 번째 노드(index != 0)는 메타데이터용이라 열 수 없습니다.
+            node_index = _read_sysfs(index, 'index')
+            if node_index not in (None, '0'):
+                continue
+            name = _read_sysfs(index, 'name') or f"video{index}"
+            if name.startswith(NON_CAPTURE_NAME_PREFIXES):
+                continue
+            nodes[index] = name
+        return nodes
+
+    def _busy_indices(self):
+        try:
+            return set(self._busy_fn()) if self._busy_fn else set()
+        except Exception:
+            return set()
+
+    def _open(self, index):
+        if self.is_windows:
+            return cv2.VideoCapture(index, cv2.CAP_DSHOW)
+        return cv2.VideoCapture(index)
+
+    def _probe(self, index, name, device_path=None):
+        """
+        장치를 열어 성능을 확인합니다 (캐시에 없을 때만 호출)
+        device_path: sysfs 장치 경로 (캐시가 같은 장치의 것인지 확인하는 데 사용)
+        return: 장치 정보 dict (카메라가 아니면 None)
+        """
+        cap = self._open(index)
+        try:
+            if not cap.isOpened():
+                return None
+            info = {
+                'index': index,
+                'name': name,
+                'sysfs_device': device_path,
+                'fourcc': _fourcc_to_str(cap.get(cv2.CAP_PROP_FOURCC)),
+                'default_resolution': [int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))],
+                'fps': round(float(cap.get(cv2.CAP_PROP_FPS) or 0), 1),
+                'resolutions': [],
+                'probed_at': time.strftime('%Y-%m-%d %H:%M:%S')
+            }
+            # 드라이버가 요청 해상도를 지원하지 않으면 가까운 값으로 바꿔주므로 실제 적용된 값을 기록합니다.
+            for width, height in PROBE_RESOLUTIONS:
+                cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+                actual = [int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))]
+                if actual not in info['resolutions']:
+                    info['resolutions'].append(actual)
+            return info
+        except Exception as e:
+            print(f"⚠️ 카메라 {index} 확인 오류: {e}")
+            return None
+        finally:
+            cap.release()
+
+    def _is_present(self, index):
+        # 장치 목록이 없는 환경에서 캐시된 카메라가 아직 연결되어 있는지 가볍게 확인합니다.
+        cap = self._open(index)
+        try:
+            return cap.isOpened()
+        finally:
+            cap.release()
+
+    def _resolve(self, index, name, busy, check_presence):
+        """
+        캐시에 있으면 캐시를, 없으면 장치를 열어 확인한 결과를 반환합니다.
+        return: (장치 정보 또는 None, 캐시에 새로 저장할 항목 또는 None)
+        """
+        device_path = _sysfs_device(index) if self.is_linux else None
+        with self._lock:
+            cached = self._cache.get(index)
+        # 리눅스에서는 같은 인덱스에 다른 장치가 연결된 경우(이름이나 sysfs 경로가 다름) 캐시를 버립니다.
+        if cached is not None and not ((name is None or cached.get('name') == name) and
+                                       cached.get('sysfs_device', device_path) == device_path):
+            cached = None
+        if cached is not None and cached.get('capture') is False:
+            # 이전에 열어봤지만 카메라가 아니었던 노드 (코덱/ISP 등)
+            return None, None
+        if index in busy:
+            # 이미 이 프로그램이 사용 중인 카메라는 다시 열지 않습니다.
+            info = cached or {'index': index, 'name': name or f"Camera {index}", 'resolutions': []}
+            return self._with_bus(info, device_path), None
+        if cached is not None:
+            if check_presence and not self._is_present(index):
+                return None, None
+            return self._with_bus(cached, device_path), None
+        info = self._probe(index, name or f"Camera {index}", device_path)
+        if info is None:
+            if device_path is None:
+                # 장치 목록이 없는 환경(윈도우)에서는 나중에 카메라를 꽂을 수 있으므로 실패를 기억하지 않습니다.
+                return None, None
+            return None, {'index': index, 'name': name, 'sysfs_device': device_path, 'capture': False,
+                          'probed_at': time.strftime('%Y-%m-%d %H:%M:%S')}
+        return self._with_bus(info, device_path), info
+
+    def _with_bus(self, info, device_path):
+        # 연결 방식은 캐시하지 않고 매번 sysfs에서 읽습니다 (파일 읽기만 하므로 가벼움).
+        return dict(info, **_bus_info(device_path)) if self.is_linux else info
+
+    def _scan(self, nodes):
+        busy = self._busy_indices()
+        if nodes is None:
+            # 장치 목록을 알 수 없는 환경: 사용 중이 아닌 인덱스만 동시에 열어봅니다.
+            candidates = [(i, None) for i in range(self.max_index)]
+        else:
+            candidates = sorted(nodes.items())
+
+        found, probed = {}, False
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="camera-probe") as executor:
+            futures = {
+                index: executor.submit(self._resolve, index, name, busy, nodes is None)
+                for index, name in candidates
+            }
+            for index, future in futures.items():
+                info, new_entry = future.result()
+                if new_entry is not None:
+                    probed = True
+                    with self._lock:
+                        self._cache[index] = new_entry
+                if info is not None:
+                    found[index] = info
+
+        if probed:
+            self._save_cache()
+        return found
+
+    def discover(self):
+        """
+        사용 가능한 카메라를 탐색하고 인덱스 목록을 반환합니다.
+        - 리눅스: /dev/video* 목록 + 캐시 (새 장치만 열어서 확인)
+        - 윈도우 등: 인덱스 0~max_index-1 을 동시에 열어서 확인
+        """
+        found = self._scan(self._list_device_nodes())
+        with self._lock:
+            self._devices = found
+        return sorted(found)
+
+    def available_indices(self):
+        with self._lock:
+            return sorted(self._devices)
+
+    def get_devices(self):
+        """연결된 카메라 정보 목록 (요청 중에 카메라를 열지 않습니다)"""
+        with self._lock:
+            return [dict(self._devices[i]) for i in sorted(self._devices)]
+
+    def preferred_index(self, indices):
+        """
+        여러 카메라 중 기본으로 사용할 카메라 (외부 USB 웹캠 우선)
+        indices: 후보 인덱스 목록
+        - 분리 가능한 USB 포트의 카메라 > 기타 USB 카메라 > CSI 등 보드 카메라 순서이고,
+          같은 순위면 USB 포트 경로가 가장 앞선 카메라를 고릅니다 (인덱스는 연결 순서에 따라 바뀜).
+        - 연결 방식을 알 수 없는 환경(윈도우)에서는 마지막 인덱스를 사용합니다.
+        """
+        with self._lock:
+            devices = {i: self._devices.get(i) or {} for i in indices}
+        if not any(info.get('bus') for info in devices.values()):
+            return indices[-1]
+
+        def rank(index):
+            info = devices[index]
+            if info.get('bus') == 'usb':
+                usb_rank = 0 if info.get('removable') == 'removable' else 1
+                return (usb_rank, [int(p) for p in re.split(r'[-.]', info.get('usb_port') or '0')], index)
+            return (2, [], index)
+        return min(indices, key=rank)
+
+    # --- 핫플러그 감지 ---
+
+    def add_listener(self, callback):
+        """
+        카메라가 연결/해제될 때 호출할 함수를 등록합니다.
+        callback(added, removed): 추가/제거된 인덱스 리스트
+        """
+        self._listeners.append(callback)
+
+    def start_monitor(self, busy_fn=None):
+        """
+        백그라운드에서 카메라 연결/해제를 감지합니다.
+        busy_fn: 현재 사용 중인 카메라 인덱스 목록을 반환하는 함수 (다시 열지 않음)
+        - 리눅스에서만 동작합니다 (/dev/video* 목록 확인은 카메라를 열지 않으므로 가볍습니다).
+        """
+        self._busy_fn = busy_fn
+        if not self.is_linux:
+            print("ℹ️ 카메라 핫플러그 감지는 리눅스(/dev/video*)에서만 지원합니다.")
+            return
+        if self._monitor_thread is not None and self._monitor_thread.is_alive():
+            return
+        self._monitor_stop.clear()
+        self._monitor_thread = threading.Thread(target=self._monitor_loop, name="camera-hotplug", daemon=True)
+        self._monitor_thread.start()
+
+    def stop_monitor(self):
+        self._monitor_stop.set()
+        if self._monitor_thread is not None:
+            self._monitor_thread.join(timeout=self.poll_interval + 1.0)
+            self._monitor_thread = None
+
+    def _monitor_loop(self):
+        known = set(self._list_device_nodes() or {})
+        while not self._monitor_stop.wait(self.poll_interval):
+            nodes = self._list_device_nodes() or {}
+            if set(nodes) == known:
+                continue
+            # 장치 노드가 막 생긴 직후에는 열리지 않을 수 있어 잠시 기다립니다.
+            time.sleep(0.5)
+            nodes = self._list_device_nodes() or {}
+            known = set(nodes)
+
+            before = set(self.available_indices())
+            found = self._scan(nodes)
+            with self._lock:
+                self._devices = found
+            added, removed = sorted(set(found) - before), sorted(before - set(found))
+            if not added and not removed:
+                continue
+            print(f"🔌 카메라 변경 감지 - 연결: {added}, 해제: {removed}")
+            for callback in list(self._listeners):
+                try:
+                    callback(added, removed)
+                except Exception as e:
+                    print(f"❌ 카메라 변경 처리 오류: {e}")
+
+# 전역 카메라 탐색기 인스턴스
+camera_discovery = CameraDiscovery()
@@ -3,46 +3,73 @@
 
 import cv2
 import time
+import numpy as np
 import platform
+import threading
 from threading import Lock
+from camera.camera_pipeline import CameraPipeline
+from camera.stream_profile import DEFAULT_PROFILE, set_default_quality
+from camera.frame_sources import FrameSource, create_frame_source
+from camera.stream_clients import stream_clients
 from detection.yolo_detector import YoloDetector
 from detection.opencv_detector import OpenCVCascadeDetector
+from detection.interval_controller import DetectionIntervalController
+from detection.roi import RoiMask
+from detection.model_export import prepare_backend_model
+from detection.backend_check import run_startup_check
+from detection.model_registry import model_registry
+from utils.settings_manager import load_config, resolve_path, settings_store
+from utils.startup_timer import startup_timer
+from utils.event_bus import event_bus
+from utils.system_monitor import system_monitor
 
 class CameraManager:
     def __init__(self):
-        self.cap = None
-        self.is_running = False
         self.lock = Lock()
+        # 현재 메인 화면(/video_feed)에 표시하는 카메라 인덱스
         self.camera_index = -1
 
-        print("🤖 객체 탐지 모델들을 로딩합니다...")
-        self.yolo = YoloDetector(model_path='models/best.pt') 
-        # OpenCV도 같은 YOLO 모델을 사용
-        self.opencv = OpenCVCascadeDetector(cascade_dir='models/haarcascades', yolo_model_path='models/best.pt')
-        print("✅ 모든 모델 로딩 완료!")
-
-        # YOLO 모델 클래스 정보 출력
-        if self.yolo.model:
-            print(f"📋 YOLO 모델 클래스 목록:")
-            for i, name in self.yolo.model.names.items():
-                print(f"   Class_{i}: {name}")
-            
-            # 만약 클래스 이름이 숫자로만 되어 있다면, 사용자가 직접 설정할 수 있음
-            if len(self.yolo.model.names) > 0:
-                first_class = list(self.yolo.model.names.values())[0]
-                if first_class.isdigit() or first_class.startswith('Class_'):
-                    print("⚠️ 클래스 이름이 숫자로 되어 있습니다. data.yaml 파일이 필요할 수 있습니다.")
-                    print("💡 훈련 폴더에서 data.yaml 파일을 models/ 폴더로 복사해주세요.")
-        else:
-            print("⚠️ YOLO 모델이 로드되지 않았습니다.")
+        # 카메라 인덱스별 파이프라인 (전방/후방 카메라 동시 스트리밍 및 탐지)
+        # 각 파이프라인은 자체 캡처 스레드와 추론 워커를 가지므로 카메라끼리 서로 기다리지 않습니다.
+        self.pipelines = {}
+        # /start_camera나 --cameras로 명시적으로 시작한 카메라 (메인 카메라를 전환해도 정지하지 않음)
+        self.pinned_indices = set()
+
+        # 모델은 import 시점이 아니라 load_models_async()에서 백그라운드로 로드합니다.
+        # 로딩이 끝나기 전에도 카메라 스트리밍은 먼저 시작되고, 탐지는 준비된 뒤부터 동작합니다.
+        self.yolo = None
+        self.opencv = None
+        self.models_ready = threading.Event()
+        self._model_lock = Lock()
+        self._model_thread = None
+
+        # config.ini [YOLO] 섹션에서 추론 백엔드를 선택합니다 (pytorch / onnx / openvino)
+        self.config = load_config()
+        self.pt_model_path = resolve_path(self.config.get('YOLO', 'MODEL_PATH', fallback='models/best.pt'))
+        self.backend = self.config.get('YOLO', 'BACKEND', fallback='pytorch').lower()
+        self.model_path = self.pt_model_path
+        self.backend_report = None
 
         # === [차이점 1] 모든 설정을 __init__에서 중앙 관리합니다 ===
         # 이렇게 하면 코드가 더 깔끔해지고, 나중에 설정을 바꿀 때 이 부분만 수정하면 됩니다.
         
-        # 1. 객체 탐지 모델 활성화 설정
-        self.yolo_enabled = True
-        self.opencv_enabled = True
+        # 1. 객체 탐지 모델 활성화 설정 (설정 화면에서 바꾼 값은 settings_store에 저장됨)
+        detection_settings = settings_store.get_section('detection')
+        self.yolo_enabled = detection_settings['yolo_enabled']
+        self.opencv_enabled = detection_settings['opencv_enabled']
+        # 카메라 반전/회전 (캡처 직후, 탐지 전에 적용)
+        self.flip_settings = settings_store.get_section('flip')
         print("   -> 💡 YOLO와 OpenCV 동시 탐지 모드가 활성화되었습니다.")
+
+        # 움직임 게이트: 정지된 장면에서는 YOLO를 건너뛰어 CPU 사용량을 줄입니다.
+        self.motion_gate_enabled = True
+
+        # MJPEG 패스스루 (config.ini [CAMERA]): 그릴 것이 없는 프레임은 카메라 JPEG를 디코딩/재인코딩 없이 스트리밍합니다.
+        self.mjpeg_passthrough = self.config.getboolean('CAMERA', 'MJPEG_PASSTHROUGH', fallback=False)
+
+        # 카메라별 관심 영역(ROI): 도로 주변만 잘라서 탐지합니다 (설정 API로 변경, settings.json에 저장)
+        self.roi_masks = {}
+        self.show_roi = True
         
         # 2. 플랫폼별 자동 최적화 설정
         # 64비트 라즈베리파이(aarch64)도 정확하게 감지하도록 로직을 개선했습니다.
@@ -53,67 +80,371 @@ class CameraManager:
             # 🍓 라즈베리파이 환경: 성능 최적화 모드
             self.target_width, self.target_height, self.target_fps = 640, 480, 15
             self.detection_interval = 3  # 3프레임마다 한 번씩만 탐지하여 CPU 부하를 줄입니다.
+            self.detection_latency_target = 0.5  # 목표 탐지 지연(초) - 검출 주기 + 추론 시간
             print(f"   -> 🍓 라즈베리파이 환경 감지! 성능 최적화 모드로 설정합니다.")
         else:
             # 💻 노트북/데스크탑 환경: 고품질 모드
             self.target_width, self.target_height, self.target_fps = 1280, 720, 30
             self.detection_interval = 1  # 매 프레임마다 탐지하여 실시간 정확도를 높입니다.
+            self.detection_latency_target = 0.1  # 목표 탐지 지연(초) - 검출 주기 + 추론 시간
             print(f"   -> 💻 노트북/PC 환경 감지! 고품질 모드로 설정합니다.")
-            
-        print(f"   -> 📊 최종 설정: {self.target_width}x{self.target_height} @ {self.target_fps}fps, 검출간격: {self.detection_interval}프레임")
-        
-        # 3. 프레임 카운터 초기화 (검출 빈도 제어용)
-        self.frame_count = 0
+
+        # config.ini [YOLO] LATENCY_TARGET이 있으면 플랫폼 기본 목표 지연 시간 대신 사용합니다 (0이면 기본값).
+        latency_target = self.config.getfloat('YOLO', 'LATENCY_TARGET', fallback=0.0)
+        if latency_target > 0:
+            self.detection_latency_target = latency_target
+
+        # 설정에서 해상도/FPS를 비우거나 0으로 되돌리면 다시 이 플랫폼 기본값을 사용합니다.
+        self.default_resolution = (self.target_width, self.target_height)
+        self.default_fps = self.target_fps
+
+        # 설정 화면/config.ini에서 해상도나 FPS를 지정했다면 플랫폼 기본값 대신 사용합니다.
+        if detection_settings['resolution']:
+            self.target_width, self.target_height = map(int, detection_settings['resolution'].split('x'))
+        if detection_settings['fps_limit']:
+            self.target_fps = detection_settings['fps_limit']
+        set_default_quality(detection_settings['quality'])
+
+        print(f"   -> 📊 최종 설정: {self.target_width}x{self.target_height} @ {self.target_fps}fps, 검출간격: {self.detection_interval}프레임, "
+              f"목표 추론 지연: {self.detection_latency_target * 1000:.0f}ms")
         
-        # 4. 검출 결과 저장 및 유지 시간 설정
-        self.detection_results = {
-            'yolo': {'boxes': [], 'timestamp': 0},
-            'opencv': {'boxes': [], 'timestamp': 0}
+        # 3. 검출 결과 유지 시간 설정 (검출 결과는 카메라별 파이프라인에 저장됩니다)
+        self.result_keep_time = 5.0  # 검출 결과를 5초간 유지 (추적을 끈 경우)
+
+        # 추적기: 탐지 사이 프레임에서 박스 위치를 예측해 멈춘 박스가 남지 않도록 합니다.
+        self.tracking_enabled = True
+
+        # 탐지 이력 저장 (config.ini [EVENTS] - 산양 출현 기록을 SQLite에 남김)
+        self.events_enabled = self.config.getboolean('EVENTS', 'ENABLED', fallback=True)
+
+        # 탐지 클립 녹화 (config.ini [CLIPS] - 탐지 전후 몇 초를 MJPEG로 저장)
+        self.clips_enabled = self.config.getboolean('CLIPS', 'ENABLED', fallback=True)
+        self.clip_settings = {
+            'output_dir': resolve_path(self.config.get('CLIPS', 'OUTPUT_DIR', fallback='../clips')),
+            'pre_seconds': self.config.getfloat('CLIPS', 'PRE_SECONDS', fallback=5.0),
+            'post_seconds': self.config.getfloat('CLIPS', 'POST_SECONDS', fallback=5.0),
+            'max_clip_seconds': self.config.getfloat('CLIPS', 'MAX_CLIP_SECONDS', fallback=60.0),
+            'fps': self.config.getint('CLIPS', 'FPS', fallback=10),
+            'max_buffer_mb': self.config.getfloat('CLIPS', 'MAX_BUFFER_MB', fallback=16)
         }
-        self.result_keep_time = 5.0  # 검출 결과를 5초간 유지
 
-    def start_camera(self, index=0):
-        with self.lock:
-            print(f"📷 카메라 (인덱스 {index}) 시작을 시도합니다...")
-            
-            if self.cap is not None:
-                self.is_running = False
-                self.cap.release()
-                self.cap = None
-                time.sleep(1)
+        # 4. 검출 간격 자동 조절 (위 detection_interval은 시작값으로만 사용)
+        # 실제 YoloDetector.detect() 지연 시간으로 추론이 차지하는 CPU 비율을 계산해 예산(config.ini [YOLO] INFERENCE_CPU_BUDGET)에 맞추고,
+        # 시스템 CPU 사용률, 장면 움직임, 실행 중인 카메라 수도 함께 반영합니다.
+        self.interval_controller = DetectionIntervalController(
+            initial_interval=self.detection_interval,
+            target_fps=self.target_fps,
+            latency_target=self.detection_latency_target,
+            cpu_budget=self.config.getfloat('YOLO', 'INFERENCE_CPU_BUDGET', fallback=0.5),
+            cpu_percent_fn=lambda: system_monitor.latest().get('cpu_percent'),
+            scene_active_fn=self.scene_active,
+            camera_count_fn=lambda: len(self.running_indices())
+        )
 
-            self.camera_index = index
+    def load_models_async(self):
+        """
+        모델 로딩을 백그라운드 스레드에서 시작합니다 (카메라 열기와 병렬 진행)
+        - 이미 시작했거나 끝났으면 아무것도 하지 않습니다.
+        """
+        with self._model_lock:
+            if self._model_thread is not None:
+                return
+            self._model_thread = threading.Thread(target=self._load_models, name="model-loader", daemon=True)
+            self._model_thread.start()
+
+    def wait_for_models(self, timeout=None):
+        """
+        모델 로딩이 끝날 때까지 기다립니다 (벤치마크 등 동기 실행용)
+        return: 준비 완료 여부
+        """
+        self.load_models_async()
+        return self.models_ready.wait(timeout)
+
+    def _load_models(self):
+        try:
+            config = self.config
+            with startup_timer.phase("백엔드 모델 준비"):
+                self.model_path = prepare_backend_model(
+                    self.pt_model_path,
+                    backend=self.backend,
+                    onnx_path=resolve_path(config.get('YOLO', 'ONNX_MODEL_PATH', fallback='')),
+                    int8=config.getboolean('YOLO', 'INT8', fallback=False)
+                )
+            print(f"   -> 🧠 추론 백엔드: {self.backend} ({self.model_path})")
+            # 워밍업도 실제와 같은 conf/iou/imgsz로 실행되도록 먼저 적용합니다.
+            self._apply_predict_options()
+
+            print("🤖 객체 탐지 모델들을 로딩합니다...")
+            with startup_timer.phase("모델 로딩"):
+                yolo = YoloDetector(model_path=self.model_path) 
+                # OpenCV도 같은 YOLO 모델을 사용
+                opencv = OpenCVCascadeDetector(cascade_dir='models/haarcascades', yolo_model_path=self.model_path)
+            print("✅ 모든 모델 로딩 완료!")
+
+            # 첫 추론은 초기화 비용이 커서 첫 탐지가 늦어지므로 미리 한 번 실행합니다.
+            if yolo.model:
+                with startup_timer.phase("모델 워밍업"):
+                    try:
+                        warmup_frame = np.zeros((self.target_height, self.target_width, 3), dtype=np.uint8)
+                        model_registry.predict(self.model_path, warmup_frame)
+                    except Exception as e:
+                        print(f"⚠️ 모델 워밍업 실패: {e}")
+
+            # 변환 모델을 쓰는 경우, 시작 시 pytorch 모델과 정확도/지연 시간을 비교합니다 (백그라운드)
+            if self.model_path != self.pt_model_path and config.getboolean('YOLO', 'BACKEND_CHECK', fallback=True):
+                sample_dir = resolve_path(config.get('YOLO', 'SAMPLE_DIR', fallback=''))
+                threading.Thread(target=self._run_backend_check, args=(sample_dir,), name="backend-check", daemon=True).start()
+
+            # 여러 카메라가 동시에 탐지할 때 프레임을 모아 한 번의 배치로 추론합니다.
+            # 실행 중인 카메라 수만큼 요청이 모이면 대기 창이 끝나기 전에 바로 실행됩니다.
+            yolo.enable_batching(expected_batch_fn=lambda: len(self.running_indices()))
+
+            # YOLO 모델 클래스 정보 출력
+            if yolo.model:
+                print(f"📋 YOLO 모델 클래스 목록:")
+                for i, name in yolo.model.names.items():
+                    print(f"   Class_{i}: {name}")
             
-            if platform.system().lower() == "windows":
-                # Windows에서는 DirectShow 사용
-                self.cap = cv2.VideoCapture(index, cv2.CAP_DSHOW)
+                # 만약 클래스 이름이 숫자로만 되어 있다면, 사용자가 직접 설정할 수 있음
+                if len(yolo.model.names) > 0:
+                    first_class = list(yolo.model.names.values())[0]
+                    if first_class.isdigit() or first_class.startswith('Class_'):
+                        print("⚠️ 클래스 이름이 숫자로 되어 있습니다. data.yaml 파일이 필요할 수 있습니다.")
+                        print("💡 훈련 폴더에서 data.yaml 파일을 models/ 폴더로 복사해주세요.")
             else:
-                # Linux/라즈베리파이에서는 기본 백엔드 사용
-                self.cap = cv2.VideoCapture(index)
-            
-            if not self.cap or not self.cap.isOpened():
-                print(f"❌ 에러: 카메라 {index}를 열 수 없습니다.")
-                self.is_running = False
+                print("⚠️ YOLO 모델이 로드되지 않았습니다.")
+
+            # 탐지기 교체는 마지막에 한 번에 - 파이프라인은 models_ready 이후에만 탐지기를 사용합니다.
+            self.yolo = yolo
+            self.opencv = opencv
+            startup_timer.mark("모델 준비 완료")
+        except Exception as e:
+            print(f"❌ 모델 로딩 중 오류: {e}")
+        finally:
+            # 실패해도 기다리는 쪽이 멈추지 않도록 항상 신호를 보냅니다 (탐지기 없이 스트리밍만 동작)
+            self.models_ready.set()
+
+    def _apply_predict_options(self):
+        """설정의 conf/iou/imgsz를 공유 모델의 기본 추론 옵션으로 적용합니다."""
+        detection_settings = settings_store.get_section('detection')
+        model_registry.set_predict_options(
+            self.model_path,
+            conf=detection_settings['confidence'],
+            iou=detection_settings['iou'],
+            imgsz=detection_settings['imgsz']
+        )
+
+    def apply_settings(self, section, changed):
+        """
+        설정 저장소에서 바뀐 값을 실행 중에 바로 적용합니다 (settings_store 리스너)
+        section: 'detection' 또는 'flip'
+        changed: 바뀐 항목 {이름: 새 값}
+        - 모델은 다시 로드하지 않습니다. 해상도가 바뀐 경우에만 카메라 소스를 다시 엽니다.
+        """
+        if section == 'flip':
+            self.flip_settings = settings_store.get_section('flip')
+            print(f"🔄 카메라 반전/회전 설정 적용: {self.flip_settings}")
+            return
+
+        if 'yolo_enabled' in changed:
+            self.yolo_enabled = changed['yolo_enabled']
+        if 'opencv_enabled' in changed:
+            self.opencv_enabled = changed['opencv_enabled']
+        if 'quality' in changed:
+            set_default_quality(changed['quality'])
+        if {'confidence', 'iou', 'imgsz'} & set(changed):
+            self._apply_predict_options()
+            print(f"🎯 추론 옵션 적용: conf={settings_store.get('detection', 'confidence')}, "
+                  f"iou={settings_store.get('detection', 'iou')}, imgsz={settings_store.get('detection', 'imgsz')}")
+        if 'fps_limit' in changed:
+            # USB 카메라는 캡처 루프의 FPS 제한만 바꾸면 되므로 다시 열지 않습니다. (0이면 플랫폼 기본값)
+            self.target_fps = changed['fps_limit'] or self.default_fps
+            self.interval_controller.target_fps = self.target_fps
+        if 'resolution' in changed:
+            # 빈 값이면 플랫폼 기본 해상도로 되돌립니다.
+            if changed['resolution']:
+                width, height = map(int, changed['resolution'].split('x'))
+            else:
+                width, height = self.default_resolution
+            if (width, height) != (self.target_width, self.target_height):
+                self.target_width, self.target_height = width, height
+                for pipeline in list(self.pipelines.values()):
+                    pipeline.reconfigure_source()
+
+    def _run_backend_check(self, sample_dir):
+        self.backend_report = run_startup_check(self.pt_model_path, self.model_path, sample_dir)
+
+    def scene_active(self):
+        """실행 중인 카메라 중 하나라도 최근 탐지 결과나 움직임이 있으면 True (검출 간격 컨트롤러 입력)"""
+        now = time.time()
+        for pipeline in list(self.pipelines.values()):
+            for source in ('yolo', 'opencv'):
+                result = pipeline.detection_results[source]
+                if result['boxes'] and now - result['timestamp'] < self.result_keep_time:
+                    return True
+            gate = pipeline.motion_gate
+            if gate.enabled and gate.last_changed_ratio >= gate.min_changed_ratio:
+                return True
+        return False
+
+    def current_detection_interval(self):
+        """지금 적용 중인 검출 간격 (자동 조절이 켜져 있으면 컨트롤러 값)"""
+        if self.interval_controller.enabled:
+            return self.interval_controller.interval
+        return self.detection_interval
+
+    def start_camera(self, index=0, source=None, pinned=False):
+        """
+        카메라 파이프라인을 시작하고 메인 화면 카메라로 지정합니다.
+        source: 프레임 소스 (FrameSource 또는 create_frame_source() 설정 문자열, None이면 index번 USB 카메라)
+        pinned: True면 메인 카메라를 다른 카메라로 전환해도 계속 실행합니다 (/start_camera, --cameras)
+        - 이미 실행 중인 다른 카메라는 그대로 유지됩니다.
+        - 같은 카메라가 이미 실행 중이면 다시 열지 않습니다.
+        """
+        with self.lock:
+            if pinned:
+                self.pinned_indices.add(index)
+            pipeline = self.pipelines.get(index)
+            if pipeline is not None and pipeline.is_running:
+                self.camera_index = index
+                print(f"✅ 카메라 {index}는 이미 실행 중입니다. 메인 카메라로 지정합니다.")
+                self.publish_camera_state()
+                return True
+
+            if source is not None and not isinstance(source, FrameSource):
+                source = create_frame_source(source)
+            pipeline = CameraPipeline(self, index, source=source)
+            if not pipeline.open():
+                self.pinned_indices.discard(index)
                 return False
-            
-            # === [차이점 2] __init__에서 미리 정해둔 설정값을 가져와 사용합니다 ===
-            # start_camera 함수는 이제 카메라를 '켜는' 역할에만 집중합니다.
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.target_width)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.target_height)
-            self.cap.set(cv2.CAP_PROP_FPS, self.target_fps)
-            print(f"   -> 카메라에 설정 적용 완료.")
-            
-            self.is_running = True
-            print(f"✅ 카메라 {index}가 성공적으로 시작되었습니다.")
+
+            self.pipelines[index] = pipeline
+            self.camera_index = index
+            self.publish_camera_state()
             return True
 
-    def stop_camera(self):
+    def stop_camera(self, index=None):
+        """
+        카메라 파이프라인을 정지합니다.
+        index: 정지할 카메라 인덱스 (None이면 모든 카메라 정지)
+        """
         with self.lock:
-            if self.cap:
-                self.is_running = False
-                self.cap.release()
-                self.cap = None
-                print("🔌 카메라가 정지되었습니다.")
+            if index is None:
+                targets = list(self.pipelines.keys())
+            else:
+                targets = [index] if index in self.pipelines else []
+
+            for i in targets:
+                self.pipelines.pop(i).close()
+                self.pinned_indices.discard(i)
+
+            if self.camera_index not in self.pipelines:
+                self.camera_index = next(iter(self.pipelines), -1)
+            self.publish_camera_state()
+
+    def switch_camera(self, index):
+        """
+        메인 화면 카메라를 index로 전환합니다 (/switch_camera)
+        - 이전 메인 카메라는 명시적으로 시작한(pinned) 카메라가 아니면 정지해
+          전환할 때마다 캡처 스레드와 추론 워커가 쌓이지 않게 합니다.
+        return: 성공 여부
+        """
+        previous = self.camera_index
+        if not self.start_camera(index):
+            return False
+        if previous != index and previous in self.pipelines and previous not in self.pinned_indices:
+            print(f"🔁 이전 메인 카메라 {previous}를 정지합니다.")
+            self.stop_camera(previous)
+        return True
+
+    def set_main_camera(self, index):
+        """
+        메인 화면 카메라를 지정하고 /events 구독자에게 알립니다.
+        index: 실행 중인 카메라 인덱스
+        return: 지정 여부 (실행 중이 아니면 메인 카메라를 바꾸지 않음)
+        """
+        with self.lock:
+            if index not in self.pipelines:
+                return False
+            self.camera_index = index
+            self.publish_camera_state()
+            return True
+
+    def camera_state(self):
+        """메인 카메라와 실행 중인 카메라 목록 (/get_current_camera, /events의 camera 이벤트)"""
+        index = self.camera_index
+        return {
+            "camera_index": index,
+            "camera_name": f"Camera {index}",
+            "is_running": self.is_running,
+            "running_cameras": self.running_indices()
+        }
+
+    def publish_camera_state(self):
+        """카메라 상태가 바뀌었음을 /events 구독자에게 알립니다 (새 구독자도 마지막 상태를 받음)"""
+        event_bus.publish('camera', self.camera_state(), retain=True)
+
+    def get_pipeline(self, index=None):
+        """
+        카메라 파이프라인을 반환합니다.
+        index: 카메라 인덱스 (None이면 메인 카메라)
+        return: CameraPipeline 또는 None
+        """
+        if index is None:
+            index = self.camera_index
+        return self.pipelines.get(index)
+
+    def get_roi(self, index):
+        """카메라별 ROI 마스크 (처음 요청 시 settings.json에서 불러오고, 없으면 전체 프레임)"""
+        roi = self.roi_masks.get(index)
+        if roi is None:
+            try:
+                roi = RoiMask(settings_store.get_roi(index))
+            except (TypeError, ValueError) as e:
+                print(f"⚠️ 저장된 카메라 {index} ROI가 잘못되어 전체 프레임을 사용합니다: {e}")
+                roi = RoiMask()
+            self.roi_masks[index] = roi
+        return roi
+
+    def set_roi(self, index, polygons):
+        """
+        카메라별 ROI 다각형을 설정합니다.
+        index: 카메라 인덱스
+        polygons: [[[x, y], ...], ...] 0~1 정규화 좌표 (빈 리스트면 전체 프레임)
+        - 추론 워커가 사용 중일 수 있으므로 기존 객체를 수정하지 않고 새 객체로 교체합니다.
+        - 검사를 통과한 값은 settings.json에 저장되어 재시작 후에도 유지됩니다.
+        """
+        roi = RoiMask(polygons)
+        settings_store.set_roi(index, roi.to_dict()['polygons'])
+        self.roi_masks[index] = roi
+        print(f"🗺️ 카메라 {index} ROI 설정: 다각형 {len(roi.polygons)}개")
+        return roi
+
+    def running_indices(self):
+        """실행 중인 카메라 인덱스 목록"""
+        return sorted(i for i, p in self.pipelines.items() if p.is_running)
+
+    # === 기존 단일 카메라 API 호환용 속성 (메인 카메라 기준) ===
+    @property
+    def cap(self):
+        pipeline = self.get_pipeline()
+        return pipeline.cap if pipeline else None
+
+    @property
+    def is_running(self):
+        pipeline = self.get_pipeline()
+        return pipeline is not None and pipeline.is_running
+
+    @property
+    def detection_results(self):
+        pipeline = self.get_pipeline()
+        if pipeline is None:
+            return {
+                'yolo': {'boxes': [], 'timestamp': 0},
+                'opencv': {'boxes': [], 'timestamp': 0},
+                'motion': {'box': None, 'timestamp': 0}
+            }
+        return pipeline.detection_results
 
     def put_text_safe(self, img, text, position, font_scale=0.5, color=(255, 255, 255), thickness=1):
         try:
@@ -128,134 +459,78 @@ class CameraManager:
         except Exception as e:
             print(f"텍스트 렌더링 오류: {e}")
 
-    def generate_frames(self):
-        # === [차이점 3] __init__에서 미리 정해둔 FPS 값을 가져와 사용합니다 ===
-        frame_time = 1.0 / self.target_fps
-        last_frame_time = time.time()
-        
+    def extract_boxes(self, results, names, source_name, emoji):
+        """
+        YOLO 결과 객체를 그리기/저장용 박스 딕셔너리 리스트로 변환합니다.
+        """
+        boxes = []
+        for r in results:
+            for box in r.boxes:
+                x1, y1, x2, y2 = map(int, box.xyxy[0])
+                conf = float(box.conf[0])
+                cls_id = int(box.cls[0])
+                class_name = names.get(cls_id, f"Class_{cls_id}")
+                # 한글 클래스명 처리
+                if isinstance(class_name, str) and not class_name.isascii():
+                    class_name = f"Class_{cls_id}"
+                
+                # 디버그: 클래스 ID와 이름 출력
+                print(f"{emoji} {source_name} 검출 - ID: {cls_id}, 이름: {class_name}, 신뢰도: {conf:.2f}")
+                
+                boxes.append({
+                    'coords': (x1, y1, x2, y2),
+                    'conf': conf,
+                    'class_name': class_name
+                })
+        return boxes
+
+    def iter_encoded(self, index=None, profile=DEFAULT_PROFILE, client=None):
+        """
+        공유 JPEG(EncodedFrame) 제너레이터 - MJPEG/WebSocket 전송 공통
+        index: 카메라 인덱스 (None이면 메인 카메라)
+        profile: StreamProfile (해상도 배율, JPEG 품질, 최대 FPS) - 같은 프로필의 시청자는 인코딩 결과를 공유합니다.
+        client: StreamClient (전송/드롭 통계 기록용)
+        - 카메라가 아직 시작되지 않았다면 시작될 때까지 기다립니다.
+        """
         while True:
-            current_time = time.time()
-            
-            # FPS 제한 적용
-            if current_time - last_frame_time < frame_time:
-                time.sleep(0.005) # CPU 사용량을 줄이기 위해 짧게 대기
+            pipeline = self.get_pipeline(index)
+            if pipeline is None:
+                time.sleep(0.5)
                 continue
-            
-            last_frame_time = current_time
-
-            frame = None
-            with self.lock:
-                if not self.is_running or self.cap is None:
-                    time.sleep(0.1)
+            if client is not None:
+                client.reset_sequence()
+            # 파이프라인이 교체(메인 카메라 전환, 정지 후 재시작)되면 새 파이프라인을 다시 구독합니다.
+            for encoded in pipeline.broadcaster.subscribe_encoded(profile=profile, client=client):
+                if self.get_pipeline(index) is not pipeline:
+                    break
+                if encoded is None:
                     continue
-                ret, frame = self.cap.read()
+                yield encoded
 
-            if frame is None: continue
+    def generate_frames(self, index=None, profile=DEFAULT_PROFILE, remote_addr=None, client=None):
+        """
+        MJPEG 스트림 제너레이터
+        index: 카메라 인덱스 (None이면 메인 카메라)
+        profile: StreamProfile
+        remote_addr: 시청자 주소 (클라이언트 목록 표시용)
+        client: 라우트에서 미리 등록한 StreamClient (없으면 여기서 등록 - 시청자 수 초과 시 빈 스트림)
+        - yield가 막히는 동안(느린 클라이언트) 쌓이는 프레임은 없고, 다음에 최신 프레임으로 건너뜁니다.
+        - 캡처/추론은 별도 스레드라 느린 클라이언트가 늦출 수 없습니다.
+        """
+        if client is None:
+            client = stream_clients.register(index, profile, 'mjpeg', remote_addr)
+            if client is None:
+                return
+        try:
+            for encoded in self.iter_encoded(index, profile, client):
+                start = time.perf_counter()
+                yield encoded.part
+                # 제너레이터가 다시 불렸다는 것은 서버가 이전 조각을 소켓에 다 썼다는 뜻입니다.
+                client.record_sent(encoded, time.perf_counter() - start)
+        finally:
+            stream_clients.unregister(client)
 
-            try:
-                # === [석이님 아이디어] 프레임별 검출 빈도 제어 ===
-                self.frame_count += 1
-                should_detect = (self.frame_count % self.detection_interval == 0)
-                current_time = time.time()
-                
-                # 디버그: 5초마다 검출 상태 출력
-                if hasattr(self, '_last_debug_time'):
-                    if current_time - self._last_debug_time > 5:
-                        yolo_count = len(self.detection_results['yolo']['boxes'])
-                        opencv_count = len(self.detection_results['opencv']['boxes'])
-                        print(f"🔍 검출 상태 - YOLO: {yolo_count}개, OpenCV: {opencv_count}개")
-                        self._last_debug_time = current_time
-                else:
-                    self._last_debug_time = current_time
-                
-                # 새로운 검출 수행 (3프레임마다)
-                if should_detect:
-                    # 1. YOLO 탐지 (파란색)
-                    if self.yolo_enabled and self.yolo.model:
-                        results = self.yolo.detect(frame)
-                        if results:
-                            yolo_boxes = []
-                            for r in results:
-                                for box in r.boxes:
-                                    x1, y1, x2, y2 = map(int, box.xyxy[0])
-                                    conf = float(box.conf[0])
-                                    cls_id = int(box.cls[0])
-                                    class_name = self.yolo.model.names.get(cls_id, f"Class_{cls_id}")
-                                    # 한글 클래스명 처리
-                                    if isinstance(class_name, str) and not class_name.isascii():
-                                        class_name = f"Class_{cls_id}"
-                                    
-                                    # 디버그: 클래스 ID와 이름 출력
-                                    print(f"🦌 YOLO 검출 - ID: {cls_id}, 이름: {class_name}, 신뢰도: {conf:.2f}")
-                                    
-                                    yolo_boxes.append({
-                                        'coords': (x1, y1, x2, y2),
-                                        'conf': conf,
-                                        'class_name': class_name
-                                    })
-                            # 검출 결과 저장
-                            self.detection_results['yolo'] = {
-                                'boxes': yolo_boxes,
-                                'timestamp': current_time
-                            }
-
-                    # 2. OpenCV 탐지 (빨간색)
-                    if self.opencv_enabled and self.opencv.yolo_model:
-                        opencv_results = self.opencv.detect_yolo_objects(frame)
-                        if opencv_results:
-                            opencv_boxes = []
-                            for r in opencv_results:
-                                for box in r.boxes:
-                                    x1, y1, x2, y2 = map(int, box.xyxy[0])
-                                    conf = float(box.conf[0])
-                                    cls_id = int(box.cls[0])
-                                    class_name = self.opencv.yolo_model.names.get(cls_id, f"Class_{cls_id}")
-                                    # 한글 클래스명 처리
-                                    if isinstance(class_name, str) and not class_name.isascii():
-                                        class_name = f"Class_{cls_id}"
-                                    
-                                    # 디버그: 클래스 ID와 이름 출력
-                                    print(f"🔴 OpenCV 검출 - ID: {cls_id}, 이름: {class_name}, 신뢰도: {conf:.2f}")
-                                    
-                                    opencv_boxes.append({
-                                        'coords': (x1, y1, x2, y2),
-                                        'conf': conf,
-                                        'class_name': class_name
-                                    })
-                            # 검출 결과 저장
-                            self.detection_results['opencv'] = {
-                                'boxes': opencv_boxes,
-                                'timestamp': current_time
-                            }
-                
-                # === 검출 결과 그리기 (5초간 유지) ===
-                # YOLO 결과 그리기
-                yolo_time_diff = current_time - self.detection_results['yolo']['timestamp']
-                if yolo_time_diff < self.result_keep_time:
-                    for box_info in self.detection_results['yolo']['boxes']:
-                        x1, y1, x2, y2 = box_info['coords']
-                        color = (255, 191, 0)  # 파란색 (BGR)
-                        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-                        label = f'YOLO: {box_info["class_name"]} {box_info["conf"]:.2f}'
-                        self.put_text_safe(frame, label, (x1, y1 - 10), color=color)
-                
-                # OpenCV 결과 그리기
-                opencv_time_diff = current_time - self.detection_results['opencv']['timestamp']
-                if opencv_time_diff < self.result_keep_time:
-                    for box_info in self.detection_results['opencv']['boxes']:
-                        x1, y1, x2, y2 = box_info['coords']
-                        color = (0, 0, 255)  # 빨간색 (BGR)
-                        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-                        label = f'OpenCV: {box_info["class_name"]} {box_info["conf"]:.2f}'
-                        self.put_text_safe(frame, label, (x1, y2 + 20), color=color)
-
-            except Exception as e:
-                print(f"탐지/그리기 중 오류 발생: {e}")
-
-            (flag, encodedImage) = cv2.imencode(".jpg", frame)
-            if not flag: continue
-            yield(b'--frame\r\n' b'Content-Type: image/jpeg\r\n\r\n' + 
-                  bytearray(encodedImage) + b'\r\n')
-
-# 전역 카메라 매니저 인스턴스
-camera_manager = CameraManager()
\ No newline at end of file
+# 전역 카메라 매니저 인스턴스 (모델은 load_models_async() 호출 시 로드되므로 import는 가볍습니다)
+camera_manager = CameraManager()
+# 설정 화면에서 저장한 값을 실행 중인 카메라/탐지기에 바로 반영합니다.
+settings_store.add_listener(camera_manager.apply_settings)
\ No newline at end of file
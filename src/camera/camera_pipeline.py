@@ -0,0 +1,435 @@
+# /home/pi/autocarz/src/camera/camera_pipeline.py
+# 카메라 1대에 대한 캡처 → 탐지 → 그리기 → 스트리밍 파이프라인
+
+import cv2
+import time
+import threading
+from threading import Lock
+from camera.frame_broadcaster import FrameBroadcaster, JpegFrame
+from camera.clip_recorder import ClipRecorder
+from camera.frame_sources import UsbCameraSource
+from detection.inference_worker import InferenceWorker
+from detection.motion_gate import MotionGate
+from detection.tracker import IouTracker
+from utils.event_store import event_store
+from utils.event_bus import event_bus
+from utils.metrics import stage_seconds, frames_captured, frames_dropped, detections
+
+class CameraPipeline:
+    def __init__(self, manager, index, source=None):
+        """
+        카메라 1대 전용 파이프라인
+        manager: 공유 탐지기와 설정을 가진 CameraManager
+        index: 카메라 인덱스
+        source: 프레임 소스 (FrameSource - None이면 index번 USB 카메라, config.ini의 MJPEG 패스스루 설정 적용)
+        - 캡처 스레드와 추론 워커를 카메라마다 따로 두어 여러 카메라가 동시에 동작합니다.
+        """
+        self.manager = manager
+        self.index = index
+        self.source = source if source is not None else UsbCameraSource(index, passthrough=manager.mjpeg_passthrough)
+        self.cap = None  # 열려 있는 동안의 프레임 소스 (기존 코드 호환용 이름)
+        self.is_running = False
+        self.lock = Lock()
+
+        # 카메라 1대당 캡처 스레드 1개만 돌리고, 모든 클라이언트는 브로드캐스터를 구독합니다.
+        self.broadcaster = FrameBroadcaster()
+        self._capture_thread = None
+        self._capture_stop = threading.Event()
+
+        # 탐지 전후 클립 녹화기 (스트리밍용 JPEG를 그대로 버퍼링)
+        self.clip_recorder = ClipRecorder(self.broadcaster, index, **manager.clip_settings)
+
+        # 프레임 카운터 (검출 빈도 제어용)
+        self.frame_count = 0
+
+        # 검출 결과 저장 (카메라별)
+        self.detection_results = {
+            'yolo': {'boxes': [], 'timestamp': 0},
+            'opencv': {'boxes': [], 'timestamp': 0},
+            'motion': {'box': None, 'timestamp': 0}
+        }
+
+        # 탐지 결과별 추적기 (탐지가 없는 프레임에서 박스 위치를 예측)
+        self.trackers = {
+            'yolo': IouTracker(),
+            'opencv': IouTracker()
+        }
+
+        # 저장된 ROI를 미리 불러옵니다 (settings.json)
+        manager.get_roi(index)
+
+        # 움직임 게이트 (장면 변화가 없으면 YOLO를 건너뜀)
+        self.motion_gate = MotionGate()
+        self.motion_gate.enabled = manager.motion_gate_enabled
+
+        # /metrics 지표 (뜨거운 루프에서 레이블 조회를 하지 않도록 미리 받아 둡니다)
+        camera_label = str(index)
+        self._capture_seconds = stage_seconds.labels('capture')
+        self._decode_seconds = stage_seconds.labels('decode')
+        self._draw_seconds = stage_seconds.labels('draw')
+        self._frames_captured = frames_captured.labels(camera_label)
+        self._read_failures = frames_dropped.labels(camera_label, 'read_failed')
+        self._detections = {
+            'yolo': detections.labels(camera_label, 'yolo'),
+            'opencv': detections.labels(camera_label, 'opencv')
+        }
+
+        # 추론 워커 (스트리밍 루프와 분리, 항상 최신 프레임만 추론)
+        self.inference_worker = InferenceWorker(
+            self._run_detection,
+            name=f"inference-{index}",
+            on_drop=frames_dropped.labels(camera_label, 'inference_busy').inc
+        )
+
+    def open(self):
+        """
+        카메라를 열고 캡처 스레드를 시작합니다.
+        return: 성공 여부
+        """
+        manager = self.manager
+        with self.lock:
+            print(f"📷 카메라 (인덱스 {self.index}, 소스 {self.source.kind}) 시작을 시도합니다...")
+
+            # CameraManager에서 미리 정해둔 해상도/FPS를 소스에 알려준 뒤 엽니다.
+            self.source.configure(manager.target_width, manager.target_height, manager.target_fps)
+            if not self.source.open():
+                print(f"❌ 에러: 카메라 {self.index}를 열 수 없습니다.")
+                self.cap = None
+                self.is_running = False
+                return False
+            self.cap = self.source
+            print(f"   -> 카메라에 설정 적용 완료. ({self.source.width}x{self.source.height} @ {self.source.fps}fps)")
+
+            self.is_running = True
+
+        self._start_capture_thread()
+        print(f"✅ 카메라 {self.index}가 성공적으로 시작되었습니다.")
+        return True
+
+    def close(self):
+        # 캡처 스레드가 lock을 잡고 있을 수 있으므로 lock 밖에서 먼저 정지시킵니다.
+        self._stop_capture_thread()
+        with self.lock:
+            self.is_running = False
+            if self.cap:
+                self.cap.release()
+                self.cap = None
+                print(f"🔌 카메라 {self.index}가 정지되었습니다.")
+        self.broadcaster.clear()
+
+    def _start_capture_thread(self):
+        self._capture_stop.clear()
+        self.inference_worker.start()
+        if self.manager.clips_enabled:
+            self.clip_recorder.start()
+        self._capture_thread = threading.Thread(target=self._capture_loop, name=f"camera-capture-{self.index}", daemon=True)
+        self._capture_thread.start()
+
+    def _stop_capture_thread(self):
+        if self._capture_thread is None:
+            return
+        self._capture_stop.set()
+        self._capture_thread.join(timeout=2.0)
+        self._capture_thread = None
+        self.inference_worker.stop()
+        self.clip_recorder.stop()
+
+    def _capture_loop(self):
+        """
+        카메라당 하나만 실행되는 백그라운드 캡처 루프
+        - 프레임을 읽고 그리기를 한 번만 수행한 뒤 브로드캐스터에 올립니다.
+        - 클라이언트 수와 관계없이 카메라 프레임을 나눠 갖지 않습니다.
+        - 스스로 속도를 맞추는 소스(영상/합성)는 소스의 FPS를, USB 카메라는 target_fps 제한을 따릅니다.
+        - MJPEG 패스스루 소스는 탐지할 차례이거나 그릴 것(박스/ROI/반전)이 있을 때만 JPEG를 디코딩하고,
+          나머지 프레임은 카메라 JPEG를 그대로 브로드캐스터에 올립니다.
+        """
+        last_frame_time = 0.0
+        end_reported = False
+
+        while not self._capture_stop.is_set():
+            current_time = time.time()
+            # 설정 화면에서 fps_limit을 바꾸면 카메라를 다시 열지 않고 다음 프레임부터 적용됩니다.
+            frame_time = 1.0 / self.manager.target_fps
+
+            # FPS 제한 적용 (자체 속도 조절 소스는 소스가 정한 다음 프레임 시각까지 대기)
+            if self.source.self_paced:
+                wait_time = self.source.time_until_next()
+            else:
+                wait_time = frame_time - (current_time - last_frame_time)
+            if wait_time > 0:
+                self._capture_stop.wait(wait_time)
+                continue
+
+            last_frame_time = current_time
+
+            frame = packet = None
+            with self.lock:
+                if not self.is_running or self.cap is None:
+                    break
+                read_start = time.perf_counter()
+                if self.cap.passthrough:
+                    jpeg, timestamp = self.cap.read_jpeg()
+                    if jpeg is not None:
+                        packet = JpegFrame(jpeg)
+                else:
+                    frame, timestamp = self.cap.read_frame()
+                self._capture_seconds.observe(time.perf_counter() - read_start)
+
+            if frame is None and packet is None:
+                if self.source.exhausted:
+                    # 반복하지 않는 영상/이미지 소스가 끝났으면 읽기 실패로 세지 않고,
+                    # 마지막 프레임을 시청자에게 남겨 둔 채 정지될 때까지 쉬어 갑니다.
+                    if not end_reported:
+                        print(f"⏹️ 카메라 {self.index}: 프레임 소스({self.source.kind})의 재생이 끝났습니다.")
+                        end_reported = True
+                    self._capture_stop.wait(0.5)
+                    continue
+                self._read_failures.inc()
+                time.sleep(0.01)
+                continue
+            end_reported = False
+            self._frames_captured.inc()
+
+            detect = self._detection_due(timestamp)
+            boxes = {source: self._boxes_to_draw(source, timestamp) for source in ('yolo', 'opencv')}
+            needs_overlay = self._needs_overlay(boxes)
+            if packet is not None:
+                if not detect and not needs_overlay:
+                    # 픽셀이 필요 없는 프레임: 디코딩도 재인코딩도 하지 않습니다.
+                    self.broadcaster.publish(packet)
+                    continue
+                decode_start = time.perf_counter()
+                frame = packet.decode()
+                self._decode_seconds.observe(time.perf_counter() - decode_start)
+                if frame is None:
+                    self._read_failures.inc()
+                    continue
+
+            frame = self._apply_flip(frame)
+            self._process_frame(frame, timestamp, detect, boxes)
+            # 탐지만 하고 그린 것이 없으면 카메라 JPEG를 그대로 스트리밍합니다.
+            self.broadcaster.publish(packet if packet is not None and not needs_overlay else frame)
+
+    def _needs_overlay(self, boxes):
+        """이번 프레임의 픽셀을 바꿔야 하는지 (반전/회전, ROI 외곽선, 탐지 박스)"""
+        manager = self.manager
+        flip = manager.flip_settings
+        if flip['horizontal'] or flip['vertical'] or flip['rotation']:
+            return True
+        if manager.show_roi and not manager.get_roi(self.index).is_full_frame:
+            return True
+        return bool(boxes['yolo'] or boxes['opencv'])
+
+    def _apply_flip(self, frame):
+        """설정 화면의 좌우/상하 반전과 회전을 적용합니다 (탐지와 스트리밍 모두 같은 방향)"""
+        flip = self.manager.flip_settings
+        if flip['horizontal'] and flip['vertical']:
+            frame = cv2.flip(frame, -1)
+        elif flip['horizontal']:
+            frame = cv2.flip(frame, 1)
+        elif flip['vertical']:
+            frame = cv2.flip(frame, 0)
+        rotation = flip['rotation']
+        if rotation == 90:
+            frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
+        elif rotation == 180:
+            frame = cv2.rotate(frame, cv2.ROTATE_180)
+        elif rotation == 270:
+            frame = cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
+        return frame
+
+    def reconfigure_source(self):
+        """
+        해상도가 바뀌었을 때 프레임 소스만 다시 엽니다.
+        - 캡처 스레드, 추론 워커, 스트림 구독자는 그대로 유지되어 시청자 연결이 끊기지 않습니다.
+        - 캡처 루프는 lock을 기다리는 동안만(소스를 다시 여는 시간) 멈춥니다.
+        """
+        manager = self.manager
+        with self.lock:
+            if not self.is_running:
+                return False
+            print(f"🔁 카메라 {self.index} 해상도 변경: {manager.target_width}x{manager.target_height}")
+            self.source.release()
+            self.source.configure(manager.target_width, manager.target_height, manager.target_fps)
+            if not self.source.open():
+                print(f"❌ 에러: 카메라 {self.index}를 새 해상도로 다시 열 수 없습니다.")
+                self.cap = None
+                self.is_running = False
+                return False
+            self.cap = self.source
+            # 이전 해상도 좌표의 탐지/추적 결과는 버립니다.
+            self.trackers = {'yolo': IouTracker(), 'opencv': IouTracker()}
+            for source in ('yolo', 'opencv'):
+                self.detection_results[source] = {'boxes': [], 'timestamp': 0}
+            print(f"   -> 카메라에 설정 적용 완료. ({self.source.width}x{self.source.height} @ {self.source.fps}fps)")
+            return True
+
+    def _detection_due(self, current_time):
+        """
+        이번 프레임에 탐지를 요청할 차례인지 확인합니다 (프레임 카운터 증가 포함)
+        - 모델이 아직 로딩 중이거나 두 탐지가 모두 꺼져 있으면 False
+        """
+        manager = self.manager
+        # === [석이님 아이디어] 프레임별 검출 빈도 제어 ===
+        self.frame_count += 1
+        should_detect = (self.frame_count % manager.current_detection_interval() == 0)
+
+        # 디버그: 5초마다 검출 상태 출력
+        if hasattr(self, '_last_debug_time'):
+            if current_time - self._last_debug_time > 5:
+                yolo_count = len(self.detection_results['yolo']['boxes'])
+                opencv_count = len(self.detection_results['opencv']['boxes'])
+                print(f"🔍 [카메라 {self.index}] 검출 상태 - YOLO: {yolo_count}개, OpenCV: {opencv_count}개")
+                self._last_debug_time = current_time
+        else:
+            self._last_debug_time = current_time
+
+        # 모델이 아직 로딩 중이면 스트리밍만 하고 탐지는 건너뜁니다.
+        return should_detect and manager.models_ready.is_set() and (manager.yolo_enabled or manager.opencv_enabled)
+
+    def _process_frame(self, frame, current_time, detect, boxes):
+        """
+        캡처된 프레임의 탐지를 워커에 요청하고 최근 결과를 그립니다 (프레임을 직접 수정)
+        current_time: 프레임 소스가 붙인 캡처 시각 (탐지/추적 타임스탬프로 사용)
+        detect: 이번 프레임에 탐지를 요청할지 (_detection_due 결과)
+        boxes: 그릴 박스 {'yolo': [...], 'opencv': [...]} (_boxes_to_draw 결과)
+        """
+        manager = self.manager
+        try:
+            # 새로운 검출 요청 (3프레임마다)
+            # 추론은 별도 워커가 수행하고, 여기서는 가장 최근 결과만 그립니다.
+            if detect:
+                # 움직임이 없으면 YOLO를 건너뜁니다. 단, 직전 탐지에 객체가 있었으면 계속 추적합니다.
+                has_objects = bool(self.detection_results['yolo']['boxes'] or self.detection_results['opencv']['boxes'])
+                run_detection, motion_box = self.motion_gate.check(frame, force=has_objects)
+                if run_detection:
+                    self.inference_worker.submit(frame.copy(), current_time, motion_box=motion_box)
+
+            # === 검출 결과 그리기 ===
+            # 추적이 켜져 있으면 예측 위치를, 꺼져 있으면 마지막 결과를 5초간 그대로 그립니다.
+            draw_start = time.perf_counter()
+            # ROI 외곽선 (설정된 경우에만)
+            if manager.show_roi:
+                manager.get_roi(self.index).draw(frame)
+
+            # YOLO 결과 그리기
+            for box_info in boxes['yolo']:
+                x1, y1, x2, y2 = box_info['coords']
+                color = (255, 191, 0)  # 파란색 (BGR)
+                cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+                label = f'YOLO{self._track_label(box_info)}: {box_info["class_name"]} {box_info["conf"]:.2f}'
+                manager.put_text_safe(frame, label, (x1, y1 - 10), color=color)
+
+            # OpenCV 결과 그리기
+            for box_info in boxes['opencv']:
+                x1, y1, x2, y2 = box_info['coords']
+                color = (0, 0, 255)  # 빨간색 (BGR)
+                cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+                label = f'OpenCV{self._track_label(box_info)}: {box_info["class_name"]} {box_info["conf"]:.2f}'
+                manager.put_text_safe(frame, label, (x1, y2 + 20), color=color)
+            self._draw_seconds.observe(time.perf_counter() - draw_start)
+
+        except Exception as e:
+            print(f"탐지/그리기 중 오류 발생: {e}")
+
+    def _boxes_to_draw(self, source, current_time):
+        """
+        이번 프레임에 그릴 박스 목록
+        source: 'yolo' 또는 'opencv'
+        """
+        if self.manager.tracking_enabled:
+            return self.trackers[source].predict(current_time)
+
+        result = self.detection_results[source]  # 워커가 교체해도 일관된 스냅샷 사용
+        if current_time - result['timestamp'] < self.manager.result_keep_time:
+            return result['boxes']
+        return []
+
+    def _track_label(self, box_info):
+        track_id = box_info.get('track_id')
+        return f' #{track_id}' if track_id is not None else ''
+
+    def _run_detection(self, frame, timestamp, motion_box=None):
+        """
+        추론 워커 스레드에서 실행되는 탐지 함수
+        frame: 탐지할 프레임 (워커 전용 복사본)
+        timestamp: 프레임 캡처 시각
+        motion_box: 움직임 게이트가 찾은 변화 영역 (x1, y1, x2, y2) 또는 None
+        - 결과 딕셔너리를 통째로 교체하므로 그리기 쪽에서 lock 없이 읽어도 안전합니다.
+        """
+        manager = self.manager
+
+        # 0. 이번 탐지를 일으킨 움직임 영역 기록 (디버그/상태 확인용)
+        self.detection_results['motion'] = {
+            'box': motion_box,
+            'timestamp': timestamp
+        }
+
+        # ROI가 설정되어 있으면 도로 주변을 덮는 영역만 잘라서 탐지합니다.
+        # 잘라낸 이미지 객체를 두 탐지 경로가 공유하므로 모델 레지스트리 캐시도 그대로 동작합니다.
+        roi = manager.get_roi(self.index)
+        crops = roi.crops(frame)
+
+        # 1. YOLO 탐지 (파란색)
+        if manager.yolo_enabled and manager.yolo is not None and manager.yolo.model:
+            yolo_boxes = []
+            has_results = False
+            detect_start = time.perf_counter()
+            for crop, offset in crops:
+                results = manager.yolo.detect(crop)
+                if results:
+                    has_results = True
+                    boxes = manager.extract_boxes(results, manager.yolo.model.names, 'YOLO', '🦌')
+                    yolo_boxes.extend(roi.to_full_frame(boxes, offset, frame.shape))
+            # 실제 추론 지연 시간을 검출 간격 컨트롤러에 전달합니다.
+            manager.interval_controller.record(time.perf_counter() - detect_start)
+            if has_results:
+                # 검출 결과 저장 (전체 프레임 좌표)
+                self.detection_results['yolo'] = {
+                    'boxes': yolo_boxes,
+                    'timestamp': timestamp
+                }
+                track_ids = self.trackers['yolo'].update(yolo_boxes, timestamp)
+                if manager.events_enabled and yolo_boxes:
+                    event_store.record(self.index, 'yolo', yolo_boxes, timestamp, track_ids)
+                if yolo_boxes:
+                    self.clip_recorder.trigger(timestamp, {box['class_name'] for box in yolo_boxes})
+                    self._publish_detection('yolo', yolo_boxes, timestamp, track_ids)
+                self._detections['yolo'].inc(len(yolo_boxes))
+
+        # 2. OpenCV 탐지 (빨간색)
+        if manager.opencv_enabled and manager.opencv is not None and manager.opencv.yolo_model:
+            opencv_boxes = []
+            has_results = False
+            for crop, offset in crops:
+                opencv_results = manager.opencv.detect_yolo_objects(crop)
+                if opencv_results:
+                    has_results = True
+                    boxes = manager.extract_boxes(opencv_results, manager.opencv.yolo_model.names, 'OpenCV', '🔴')
+                    opencv_boxes.extend(roi.to_full_frame(boxes, offset, frame.shape))
+            if has_results:
+                # 검출 결과 저장 (전체 프레임 좌표)
+                self.detection_results['opencv'] = {
+                    'boxes': opencv_boxes,
+                    'timestamp': timestamp
+                }
+                track_ids = self.trackers['opencv'].update(opencv_boxes, timestamp)
+                if manager.events_enabled and opencv_boxes:
+                    event_store.record(self.index, 'opencv', opencv_boxes, timestamp, track_ids)
+                if opencv_boxes:
+                    self.clip_recorder.trigger(timestamp, {box['class_name'] for box in opencv_boxes})
+                    self._publish_detection('opencv', opencv_boxes, timestamp, track_ids)
+                self._detections['opencv'].inc(len(opencv_boxes))
+
+    def _publish_detection(self, source, boxes, timestamp, track_ids):
+        """탐지 결과를 /events 구독자에게 바로 보냅니다 (대시보드 갱신용, 좌표 제외)"""
+        event_bus.publish('detection', {
+            "camera": self.index,
+            "source": source,
+            "timestamp": timestamp,
+            "objects": [
+                {"class_name": box['class_name'], "conf": round(box['conf'], 3), "track_id": track_id}
+                for box, track_id in zip(boxes, track_ids)
+            ]
+        })
+
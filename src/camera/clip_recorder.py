@@ -0,0 +1,254 @@
+# /home/pi/autocarz/src/camera/clip_recorder.py
+# 탐지 전후 몇 초를 MJPEG 클립으로 저장하는 녹화기 (스트리밍용 JPEG 바이트를 그대로 재사용)
+
+import os
+import json
+import time
+import queue
+import threading
+from collections import deque
+from datetime import datetime
+
+import psutil
+
+from camera.stream_profile import default_profile
+
+# 사용 가능한 메모리 중 클립 버퍼가 쓸 수 있는 최대 비율 (카메라 전체 합계가 아니라 카메라 1대 기준)
+MEMORY_FRACTION_LIMIT = 0.05
+
+class ClipRecorder:
+    def __init__(self, broadcaster, camera_index, output_dir, pre_seconds=5.0, post_seconds=5.0,
+                 max_clip_seconds=60.0, fps=10, max_buffer_mb=16):
+        """
+        카메라 1대의 탐지 클립 녹화기
+        broadcaster: 카메라의 FrameBroadcaster (인코딩된 JPEG를 구독)
+        camera_index: 카메라 인덱스 (파일 이름에 사용)
+        output_dir: 클립 저장 폴더
+        pre_seconds / post_seconds: 탐지 전/후 저장 구간(초)
+        max_clip_seconds: 탐지가 계속 이어져도 클립 1개가 넘지 않는 최대 길이(초)
+        fps: 버퍼에 보관할 최대 FPS
+        max_buffer_mb: 사전 버퍼 최대 메모리(MB) - 사용 가능 메모리의 5%를 넘지 않게 더 줄어들 수 있음
+        - 버퍼에는 프레임(numpy)이 아니라 JPEG bytes만 보관하므로 메모리가 작습니다.
+        - 기본 시청자 프로필(전체 해상도, 설정 화면 quality)의 JPEG를 그대로 가져오므로 시청자가 있으면 추가 인코딩이 없습니다.
+          시청자가 없으면 fps만큼 전체 해상도 인코딩이 일어납니다 (MJPEG 패스스루 중에는 카메라 JPEG를 그대로 사용).
+        - 파일 쓰기는 별도 스레드에서 하므로 SD카드가 느려도 버퍼링/스트리밍이 멈추지 않습니다.
+        """
+        self.broadcaster = broadcaster
+        self.camera_index = camera_index
+        self.output_dir = output_dir
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.max_clip_seconds = max_clip_seconds
+        self.fps = fps
+
+        available = psutil.virtual_memory().available
+        self.max_buffer_bytes = int(min(max_buffer_mb * 1024 * 1024, available * MEMORY_FRACTION_LIMIT))
+
+        # 사전 버퍼: (캡처 시각, JPEG bytes) - 시간(pre_seconds)과 메모리(max_buffer_bytes) 둘 다로 제한
+        self._lock = threading.Lock()
+        self._buffer = deque()
+        self._buffer_bytes = 0
+
+        # 녹화 중인 클립 (None이면 대기 상태)
+        self._clip = None
+
+        # 파일 쓰기 대기열 - 열기/프레임/닫기 순서를 지키도록 하나의 큐를 쓰되, 크기 제한은 프레임에만 둡니다.
+        # 열기/닫기 메시지는 버리면 안 되고 _lock을 잡은 채 기다려서도 안 되므로 제한 없이 넣고,
+        # 프레임은 쓰기가 밀려 max_pending_frames를 넘으면 버려 메모리가 늘지 않게 합니다.
+        self._write_queue = queue.Queue()
+        self.max_pending_frames = int(fps * (pre_seconds + post_seconds)) + 2
+        self._pending_frames = 0
+        self._pending_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._buffer_thread = None
+        self._writer_thread = None
+
+        # 상태 확인용 통계
+        self.clip_count = 0
+        self.dropped_frames = 0
+        self.last_clip = None
+
+    # --- 시작/정지 ---
+
+    def start(self):
+        if self._buffer_thread is not None:
+            return
+        self._stop.clear()
+        self._writer_thread = threading.Thread(
+            target=self._writer_loop, name=f"clip-writer-{self.camera_index}", daemon=True)
+        self._buffer_thread = threading.Thread(
+            target=self._buffer_loop, name=f"clip-buffer-{self.camera_index}", daemon=True)
+        self._writer_thread.start()
+        self._buffer_thread.start()
+
+    def stop(self):
+        """버퍼링을 멈추고, 녹화 중인 클립은 지금까지의 프레임으로 마무리합니다."""
+        if self._buffer_thread is None:
+            return
+        self._stop.set()
+        self._buffer_thread.join(timeout=2.0)
+        self._buffer_thread = None
+        with self._lock:
+            if self._clip is not None:
+                self._finish_clip_locked()
+            self._buffer.clear()
+            self._buffer_bytes = 0
+        self._write_queue.put(None)
+        self._writer_thread.join(timeout=5.0)
+        self._writer_thread = None
+
+    # --- 버퍼링 ---
+
+    def _buffer_loop(self):
+        min_gap = 1.0 / self.fps if self.fps > 0 else 0.0
+        last_seq = 0
+        last_buffered = 0.0
+        for seq, frame in self.broadcaster.subscribe(timeout=0.5):
+            if self._stop.is_set():
+                return
+            now = time.time()
+            encoded = None
+            if frame is not None and now - last_buffered >= min_gap:
+                # 설정 화면에서 quality를 바꾸면 다음 프레임부터 바뀐 시청자 프로필의 JPEG를 공유합니다.
+                encoded = self.broadcaster.get_encoded(seq, frame, default_profile())
+                if encoded is not None and encoded.seq != last_seq:
+                    last_seq = encoded.seq
+                    last_buffered = now
+                else:
+                    encoded = None
+            with self._lock:
+                if encoded is not None:
+                    self._append_locked(now, encoded.jpeg)
+                if self._clip is not None and now >= self._clip['until']:
+                    self._finish_clip_locked()
+
+    def _append_locked(self, timestamp, jpeg):
+        self._buffer.append((timestamp, jpeg))
+        self._buffer_bytes += len(jpeg)
+        while self._buffer and (self._buffer_bytes > self.max_buffer_bytes or
+                                timestamp - self._buffer[0][0] > self.pre_seconds):
+            _, old = self._buffer.popleft()
+            self._buffer_bytes -= len(old)
+
+        if self._clip is not None:
+            self._enqueue(('frame', self._clip['path'], timestamp, jpeg))
+
+    def _enqueue(self, item):
+        # 프레임 전용 - 쓰기 스레드가 밀려 있으면 기다리지 않고 버립니다.
+        with self._pending_lock:
+            if self._pending_frames >= self.max_pending_frames:
+                self.dropped_frames += 1
+                return
+            self._pending_frames += 1
+        self._write_queue.put_nowait(item)
+
+    # --- 탐지 트리거 ---
+
+    def trigger(self, timestamp, class_names=()):
+        """
+        탐지가 발생했음을 알립니다 (추론 워커에서 호출, 즉시 반환)
+        timestamp: 탐지한 프레임의 캡처 시각 (클립 정보 파일에 기록)
+        class_names: 탐지된 클래스 이름들 (클립 정보 파일에 기록)
+        - 녹화 중이면 새 클립을 만들지 않고 종료 시각만 늘립니다 (max_clip_seconds까지).
+        """
+        if self._buffer_thread is None:
+            return
+        now = time.time()
+        with self._lock:
+            clip = self._clip
+            if clip is None:
+                started = datetime.fromtimestamp(now).strftime('%Y%m%d_%H%M%S')
+                path = os.path.join(self.output_dir, f"cam{self.camera_index}_{started}.mjpeg")
+                clip = self._clip = {
+                    'path': path,
+                    'trigger_time': timestamp,
+                    'start': self._buffer[0][0] if self._buffer else now,
+                    'until': now + self.post_seconds,
+                    'classes': set()
+                }
+                # 열기/닫기는 프레임 제한을 받지 않으므로 추론 스레드가 잠금을 잡은 채 기다리지 않습니다.
+                self._write_queue.put_nowait(('open', path))
+                # 사전 버퍼는 bytes 참조만 넘기므로 복사 비용이 없습니다.
+                for frame_time, jpeg in self._buffer:
+                    self._enqueue(('frame', path, frame_time, jpeg))
+                print(f"🎬 [카메라 {self.camera_index}] 탐지 클립 녹화 시작: {os.path.basename(path)}")
+            else:
+                clip['until'] = min(now + self.post_seconds, clip['start'] + self.max_clip_seconds)
+            clip['classes'].update(class_names)
+
+    def _finish_clip_locked(self):
+        clip = self._clip
+        self._clip = None
+        self._write_queue.put_nowait(('close', clip['path'], {
+            "camera": self.camera_index,
+            "trigger_time": clip['trigger_time'],
+            "classes": sorted(clip['classes'])
+        }))
+
+    # --- 파일 쓰기 (별도 스레드) ---
+
+    def _writer_loop(self):
+        files = {}  # {클립 경로: {'file', 'times'}}
+        while True:
+            item = self._write_queue.get()
+            if item is None:
+                break
+            if item[0] == 'frame':
+                with self._pending_lock:
+                    self._pending_frames -= 1
+            try:
+                kind, path = item[0], item[1]
+                if kind == 'open':
+                    os.makedirs(self.output_dir, exist_ok=True)
+                    # 다 쓰기 전에는 .part로 두어 덜 쓴 파일을 완성된 클립으로 착각하지 않게 합니다.
+                    files[path] = {'file': open(path + '.part', 'wb'), 'times': []}
+                elif kind == 'frame' and path in files:
+                    files[path]['file'].write(item[3])
+                    files[path]['times'].append(item[2])
+                elif kind == 'close' and path in files:
+                    self._close_file(path, files.pop(path), item[2])
+            except OSError as e:
+                print(f"❌ [카메라 {self.camera_index}] 클립 저장 실패: {e}")
+                entry = files.pop(item[1], None)
+                if entry is not None:
+                    entry['file'].close()
+
+        for entry in files.values():
+            entry['file'].close()
+
+    def _close_file(self, path, entry, meta):
+        entry['file'].close()
+        os.replace(path + '.part', path)
+        times = entry['times']
+        duration = times[-1] - times[0] if len(times) > 1 else 0.0
+        meta.update({
+            "file": os.path.basename(path),
+            "frames": len(times),
+            "start_time": times[0] if times else None,
+            "duration_sec": round(duration, 2),
+            "fps": round((len(times) - 1) / duration, 2) if duration > 0 else 0.0,
+            # MJPEG에는 시간 정보가 없으므로 프레임별 캡처 시각을 함께 저장합니다.
+            "frame_times": [round(t, 3) for t in times]
+        })
+        with open(os.path.splitext(path)[0] + '.json', 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        self.clip_count += 1
+        self.last_clip = meta['file']
+        print(f"💾 [카메라 {self.camera_index}] 탐지 클립 저장: {meta['file']} ({meta['frames']}프레임, {meta['duration_sec']}초)")
+
+    def get_stats(self):
+        """상태 API용 통계"""
+        with self._lock:
+            buffered_frames = len(self._buffer)
+            buffer_bytes = self._buffer_bytes
+            recording = self._clip is not None
+        return {
+            "recording": recording,
+            "buffered_frames": buffered_frames,
+            "buffer_mb": round(buffer_bytes / (1024 * 1024), 2),
+            "max_buffer_mb": round(self.max_buffer_bytes / (1024 * 1024), 2),
+            "clips_saved": self.clip_count,
+            "dropped_frames": self.dropped_frames,
+            "pending_frames": self._pending_frames,
+            "last_clip": self.last_clip
+        }
@@ -0,0 +1,211 @@
+# /home/pi/autocarz/src/camera/frame_broadcaster.py
+# 캡처 스레드가 만든 최신 프레임을 모든 스트림 클라이언트에게 나눠주는 브로드캐스터
+
+import time
+import threading
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from camera.stream_profile import DEFAULT_PROFILE
+from utils.metrics import stage_seconds
+
+# /metrics 단계별 시간 (축소 + cv2.imencode)
+_encode_seconds = stage_seconds.labels('encode')
+
+# 한 번 인코딩된 JPEG 프레임 (모든 구독자가 같은 bytes 객체를 공유)
+# seq: 프레임 번호, jpeg: JPEG 바이트, part: MJPEG multipart 조각 (헤더 포함)
+EncodedFrame = namedtuple('EncodedFrame', ['seq', 'jpeg', 'part'])
+
+# 카메라가 보낸 JPEG를 다시 인코딩하지 않고 그대로 내보낼 최소 요청 품질
+# (UVC 카메라의 MJPEG은 보통 품질 80~90 수준 - 더 낮은 품질을 원하는 시청자에게만 다시 인코딩)
+PASSTHROUGH_MIN_QUALITY = 80
+
+class JpegFrame:
+    """
+    카메라가 보낸 JPEG를 디코딩하지 않은 채 담아 두는 프레임 (MJPEG 패스스루)
+    - 전체 해상도 스트림에는 jpeg를 그대로 보내고, 축소/저화질 프로필이 처음 요청할 때만 한 번 디코딩합니다.
+    """
+    __slots__ = ('jpeg', '_image', '_lock')
+
+    def __init__(self, jpeg, image=None):
+        self.jpeg = jpeg
+        self._image = image
+        self._lock = threading.Lock()
+
+    def decode(self):
+        """return: BGR 프레임 (디코딩 실패 시 None) - 구독자는 절대 수정하면 안 됨"""
+        with self._lock:
+            if self._image is None:
+                self._image = cv2.imdecode(np.frombuffer(self.jpeg, np.uint8), cv2.IMREAD_COLOR)
+            return self._image
+
+def build_mjpeg_part(jpeg):
+    """JPEG 바이트를 multipart/x-mixed-replace 조각으로 감쌉니다."""
+    return b'--frame\r\n' b'Content-Type: image/jpeg\r\n\r\n' + jpeg + b'\r\n'
+
+class FrameBroadcaster:
+    def __init__(self):
+        """
+        최신 프레임 1장만 보관하는 1:N 브로드캐스터
+        - 캡처 스레드는 publish()로 프레임을 올리기만 하고 기다리지 않습니다.
+        - 각 클라이언트는 subscribe()로 받은 제너레이터에서 최신 프레임만 가져갑니다.
+        - 느린 클라이언트는 중간 프레임을 건너뛸 뿐, 다른 클라이언트나 캡처를 늦추지 않습니다.
+        """
+        self._cond = threading.Condition()
+        self._frame = None
+        self._seq = 0
+        self.subscriber_count = 0
+
+        # (해상도 배율, 품질)별 JPEG 캐시: 같은 프로필의 구독자가 몇 명이든 프레임당 인코딩은 1번만 수행합니다.
+        # 프로필마다 잠금을 따로 두어 고화질/저화질 인코딩이 서로를 기다리지 않게 합니다.
+        self._encode_lock = threading.Lock()
+        self._encoded = {}          # {(scale, quality): EncodedFrame}
+        self._profile_locks = {}    # {(scale, quality): Lock}
+        self.encode_count = 0
+        self.encode_counts = {}     # {"scale@quality": 인코딩 횟수, "passthrough": 재인코딩 없이 보낸 횟수} - 상태 확인용
+
+    @property
+    def seq(self):
+        return self._seq
+
+    def publish(self, frame):
+        """
+        새 프레임을 등록하고 기다리는 모든 구독자를 깨웁니다.
+        frame: 공유되는 프레임 (구독자는 절대 수정하면 안 됨) 또는 JpegFrame (MJPEG 패스스루)
+        """
+        with self._cond:
+            self._frame = frame
+            self._seq += 1
+            self._cond.notify_all()
+
+    def latest(self):
+        """
+        가장 최근 프레임을 즉시 반환합니다.
+        return: (seq, frame) - 아직 프레임이 없으면 (0, None)
+        """
+        with self._cond:
+            return self._seq, self._frame
+
+    def wait_for_frame(self, last_seq, timeout=1.0):
+        """
+        last_seq 이후의 새 프레임이 올라올 때까지 기다립니다.
+        last_seq: 구독자가 마지막으로 받은 프레임 번호
+        timeout: 최대 대기 시간(초)
+        return: (seq, frame) - 시간 초과 또는 프레임이 비워진 경우 frame은 None
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq != last_seq, timeout)
+            if self._seq == last_seq:
+                return last_seq, None
+            return self._seq, self._frame
+
+    def subscribe(self, timeout=1.0):
+        """
+        새 프레임이 나올 때마다 (seq, frame)을 내보내는 제너레이터
+        - 시간 초과 시에는 (seq, None)을 내보내 호출자가 연결 상태를 확인할 수 있게 합니다.
+        """
+        with self._cond:
+            self.subscriber_count += 1
+        try:
+            last_seq = 0
+            while True:
+                seq, frame = self.wait_for_frame(last_seq, timeout)
+                last_seq = seq
+                yield seq, frame
+        finally:
+            with self._cond:
+                self.subscriber_count -= 1
+
+    def _profile_lock(self, key):
+        with self._encode_lock:
+            lock = self._profile_locks.get(key)
+            if lock is None:
+                lock = self._profile_locks[key] = threading.Lock()
+            return lock
+
+    def get_encoded(self, seq, frame, profile=DEFAULT_PROFILE):
+        """
+        seq 프레임의 JPEG 인코딩 결과를 반환합니다 (프로필별로 처음 요청한 구독자만 인코딩)
+        seq: 프레임 번호
+        frame: 인코딩할 프레임 (캐시가 없을 때만 사용) 또는 JpegFrame
+        profile: StreamProfile (해상도 배율, JPEG 품질)
+        return: EncodedFrame 또는 None (인코딩 실패 시)
+        - JpegFrame이고 전체 해상도 + 충분한 품질을 요청하면 카메라 JPEG를 그대로 사용합니다.
+        """
+        key = (profile.scale, profile.quality)
+        encoded = self._encoded.get(key)
+        if encoded is not None and encoded.seq == seq:
+            return encoded
+
+        with self._profile_lock(key):
+            # 다른 구독자가 기다리는 동안 이미 인코딩했을 수 있습니다.
+            encoded = self._encoded.get(key)
+            if encoded is not None and encoded.seq == seq:
+                return encoded
+            if encoded is not None and encoded.seq > seq:
+                # 더 최신 프레임이 이미 인코딩되어 있으면 오래된 프레임은 건너뜁니다.
+                return encoded
+
+            if isinstance(frame, JpegFrame):
+                if profile.scale >= 1.0 and profile.quality >= PASSTHROUGH_MIN_QUALITY:
+                    encoded = EncodedFrame(seq, frame.jpeg, build_mjpeg_part(frame.jpeg))
+                    self._encoded[key] = encoded
+                    self.encode_counts['passthrough'] = self.encode_counts.get('passthrough', 0) + 1
+                    return encoded
+
+            encode_start = time.perf_counter()
+            image = frame
+            if isinstance(frame, JpegFrame):
+                image = frame = frame.decode()
+                if frame is None:
+                    return None
+            if profile.scale < 1.0:
+                height, width = frame.shape[:2]
+                size = (max(1, int(width * profile.scale)), max(1, int(height * profile.scale)))
+                image = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+            (flag, encodedImage) = cv2.imencode(".jpg", image, [int(cv2.IMWRITE_JPEG_QUALITY), profile.quality])
+            _encode_seconds.observe(time.perf_counter() - encode_start)
+            if not flag:
+                return None
+            jpeg = encodedImage.tobytes()
+            encoded = EncodedFrame(seq, jpeg, build_mjpeg_part(jpeg))
+            self._encoded[key] = encoded
+            self.encode_count += 1
+            name = f"{profile.scale}@{profile.quality}"
+            self.encode_counts[name] = self.encode_counts.get(name, 0) + 1
+            return encoded
+
+    def subscribe_encoded(self, timeout=1.0, profile=DEFAULT_PROFILE, client=None):
+        """
+        새 프레임이 나올 때마다 공유 JPEG(EncodedFrame)를 내보내는 제너레이터
+        profile: StreamProfile - max_fps가 있으면 그보다 빠른 프레임은 인코딩하지 않고 건너뜁니다.
+        client: StreamClient (있으면 max_fps로 건너뛴 프레임 수를 기록)
+        - 시간 초과 시에는 None을 내보냅니다.
+        - 구독자별 대기 프레임은 최대 1장(최신 프레임)뿐이라 느린 클라이언트는 중간 프레임을 건너뜁니다.
+        """
+        min_gap = 1.0 / profile.max_fps if profile.max_fps > 0 else 0.0
+        last_seq = 0
+        last_sent = 0.0
+        for seq, frame in self.subscribe(timeout):
+            if frame is None:
+                yield None
+                continue
+            if min_gap and time.monotonic() - last_sent < min_gap:
+                if client is not None:
+                    client.throttled += 1
+                continue
+            encoded = self.get_encoded(seq, frame, profile)
+            if encoded is None or encoded.seq == last_seq:
+                continue
+            last_seq = encoded.seq
+            last_sent = time.monotonic()
+            yield encoded
+
+    def clear(self):
+        """보관 중인 프레임을 비웁니다 (카메라 정지 시 사용)"""
+        with self._cond:
+            self._frame = None
+        with self._encode_lock:
+            self._encoded = {}
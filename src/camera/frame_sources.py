@@ -0,0 +1,511 @@
+# /home/pi/autocarz/src/camera/frame_sources.py
+# 프레임 소스 추상화 - USB 카메라 / 녹화 영상 / 이미지 폴더 / 합성 패턴
+# CameraPipeline은 어떤 소스든 같은 방식(open → read_frame → release)으로 사용합니다.
+
+import os
+import time
+import platform
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+class FrameSource:
+    """
+    프레임 소스 공통 인터페이스
+    - configure(): 파이프라인이 원하는 해상도/FPS를 알려줍니다 (open 전에 호출)
+    - open() / release(): 자원 확보/해제 (release 후 다시 open 가능)
+    - read_frame(): (frame, timestamp) 반환, 더 이상 프레임이 없으면 (None, None)
+    - self_paced: True면 소스가 정한 FPS(time_until_next())에 맞춰 파이프라인이 기다립니다.
+      False면(USB 카메라) 파이프라인이 target_fps로 제한합니다.
+    - passthrough: True면 read_jpeg()로 카메라가 압축한 JPEG를 디코딩 없이 받을 수 있습니다.
+    - cv2.VideoCapture와 같은 read()/isOpened()/get()/set()도 제공합니다 (기존 코드 호환)
+    """
+    kind = 'base'
+    self_paced = False
+    passthrough = False
+
+    def __init__(self):
+        self.width = 0
+        self.height = 0
+        self.fps = 0.0
+        self.frames_read = 0
+        self.exhausted = False
+
+    def configure(self, width, height, fps):
+        self.width, self.height = int(width), int(height)
+        if not self.fps:
+            self.fps = float(fps)
+
+    def open(self):
+        raise NotImplementedError
+
+    def isOpened(self):
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+    def read_frame(self):
+        raise NotImplementedError
+
+    def read_jpeg(self):
+        """(jpeg bytes, timestamp) 반환 - passthrough 소스만 지원"""
+        raise NotImplementedError
+
+    def time_until_next(self):
+        """다음 프레임을 읽을 때까지 기다려야 하는 시간(초) - 자체 속도 조절 소스만 사용"""
+        return 0.0
+
+    def read(self):
+        frame, _ = self.read_frame()
+        return frame is not None, frame
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self.width = int(value)
+        elif prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.height = int(value)
+        elif prop == cv2.CAP_PROP_FPS:
+            self.fps = float(value)
+        return True
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        return 0.0
+
+    def describe(self):
+        """상태 API용 소스 정보"""
+        return {
+            "kind": self.kind,
+            "resolution": f"{self.width}x{self.height}",
+            "fps": self.fps,
+            "frames_read": self.frames_read
+        }
+
+    def _resize(self, frame):
+        if self.width and self.height and (frame.shape[1], frame.shape[0]) != (self.width, self.height):
+            return cv2.resize(frame, (self.width, self.height), interpolation=cv2.INTER_AREA)
+        return frame
+
+class UsbCameraSource(FrameSource):
+    kind = 'usb'
+    self_paced = False  # 카메라 드라이버가 프레임 속도를 정하고, 파이프라인이 target_fps로 제한합니다.
+
+    def __init__(self, index, passthrough=False):
+        """
+        USB/V4L2 카메라 소스
+        index: 카메라 인덱스 (/dev/videoN)
+        passthrough: True면 카메라에 MJPG 포맷을 요청하고 압축된 JPEG를 그대로 받습니다 (MJPEG 패스스루)
+          - 드라이버가 압축 데이터를 넘겨주지 않으면 open() 때 일반 모드로 되돌아갑니다.
+        """
+        super().__init__()
+        self.index = index
+        self.mjpeg_requested = passthrough
+        self.passthrough = False
+        self._cap = None
+
+    def configure(self, width, height, fps):
+        self.width, self.height, self.fps = int(width), int(height), float(fps)
+
+    def open(self):
+        if platform.system().lower() == "windows":
+            # Windows에서는 DirectShow 사용
+            self._cap = cv2.VideoCapture(self.index, cv2.CAP_DSHOW)
+        else:
+            # Linux/라즈베리파이에서는 기본 백엔드 사용
+            self._cap = cv2.VideoCapture(self.index)
+        if not self._cap.isOpened():
+            self._cap = None
+            return False
+        if self.mjpeg_requested:
+            # 해상도보다 먼저 지정해야 드라이버가 MJPG 모드에서 지원하는 해상도를 고릅니다.
+            self._cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+        # === [차이점 2] CameraManager에서 미리 정해둔 설정값을 가져와 사용합니다 ===
+        if self.width and self.height:
+            self._cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        if self.fps:
+            self._cap.set(cv2.CAP_PROP_FPS, self.fps)
+        self.passthrough = self.mjpeg_requested and self._enable_passthrough()
+        return True
+
+    def _enable_passthrough(self):
+        """
+        디코딩 없이 압축된 JPEG를 받도록 전환합니다.
+        return: 첫 프레임이 실제로 JPEG 바이트로 들어오면 True, 아니면 일반 모드로 되돌리고 False
+        """
+        self._cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+        ret, buffer = self._cap.read()
+        # 압축 데이터는 1행짜리 uint8 버퍼로, 드라이버가 이미 디코딩했다면 (높이, 너비, 3) 이미지로 들어옵니다.
+        if ret and buffer is not None and (buffer.ndim == 1 or buffer.shape[0] == 1) and \
+                buffer.tobytes()[:2] == b'\xff\xd8':
+            print(f"   -> 🎞️ 카메라 {self.index}: MJPEG 패스스루 사용 (카메라 JPEG를 그대로 스트리밍)")
+            return True
+        self._cap.set(cv2.CAP_PROP_CONVERT_RGB, 1)
+        print(f"   -> ⚠️ 카메라 {self.index}: 드라이버가 MJPEG 원본을 주지 않아 일반 모드로 동작합니다.")
+        return False
+
+    def isOpened(self):
+        return self._cap is not None and self._cap.isOpened()
+
+    def read_frame(self):
+        if self.passthrough:
+            jpeg, timestamp = self.read_jpeg()
+            if jpeg is None:
+                return None, None
+            return cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR), timestamp
+        if self._cap is None:
+            return None, None
+        ret, frame = self._cap.read()
+        if not ret or frame is None:
+            return None, None
+        self.frames_read += 1
+        # 드라이버 버퍼 시각은 장치마다 기준이 달라서 읽은 직후의 시스템 시각을 사용합니다.
+        return frame, time.time()
+
+    def read_jpeg(self):
+        if self._cap is None:
+            return None, None
+        ret, buffer = self._cap.read()
+        if not ret or buffer is None:
+            return None, None
+        jpeg = buffer.tobytes()
+        if jpeg[:2] != b'\xff\xd8':
+            # 전송 중 깨진 프레임은 시청자에게 보내지 않고 버립니다.
+            return None, None
+        self.frames_read += 1
+        return jpeg, time.time()
+
+    def set(self, prop, value):
+        return self._cap.set(prop, value) if self._cap is not None else False
+
+    def get(self, prop):
+        return self._cap.get(prop) if self._cap is not None else 0.0
+
+    def describe(self):
+        info = super().describe()
+        info["index"] = self.index
+        info["mjpeg_passthrough"] = self.passthrough
+        return info
+
+    def release(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+class _PacedSource(FrameSource):
+    self_paced = True
+
+    def __init__(self, fps=None, loop=True):
+        """
+        스스로 FPS를 맞추는 재생형 소스 공통 부분
+        fps: 재생 FPS (None이면 소스 기본값, 0이면 기다리지 않고 최대 속도)
+        loop: 끝까지 재생하면 처음부터 다시 재생할지 여부
+        - 타임스탬프는 '시작 시각 + 프레임 번호 / FPS'로 정해지므로 처리 속도와 관계없이 일정한 간격입니다.
+        """
+        super().__init__()
+        self.requested_fps = fps
+        self.loop = loop
+        self._t0 = None
+        self._index = 0
+
+    def configure(self, width, height, fps):
+        # 재생 소스는 자체 FPS를 유지하고, 해상도만 파이프라인 설정을 따릅니다.
+        self.width, self.height = int(width), int(height)
+
+    def _start_clock(self):
+        self._t0 = time.time()
+        self._index = 0
+
+    def time_until_next(self):
+        """
+        다음 프레임 예정 시각까지 남은 시간(초)
+        - 파이프라인은 이 시간만큼 (정지 신호로 깨어날 수 있게) 기다린 뒤 read_frame()을 호출합니다.
+        - 그래서 대기 시간이 캡처(read) 지연 시간 지표에 섞이지 않습니다.
+        """
+        if self._t0 is None:
+            self._start_clock()
+        if not self.fps or self.fps <= 0:
+            return 0.0
+        wait = self._t0 + self._index / self.fps - time.time()
+        if wait < -1.0:
+            # 1초 이상 밀렸으면(일시 정지 등) 시계를 다시 맞춰 한꺼번에 몰아서 내보내지 않습니다.
+            self._t0 = time.time() - self._index / self.fps
+            return 0.0
+        return wait
+
+    def _next_timestamp(self):
+        if self._t0 is None:
+            self._start_clock()
+        if self.fps and self.fps > 0:
+            timestamp = self._t0 + self._index / self.fps
+        else:
+            timestamp = time.time()
+        self._index += 1
+        return timestamp
+
+    def read_frame(self):
+        frame = self._next_frame()
+        if frame is None:
+            self.exhausted = True
+            return None, None
+        self.frames_read += 1
+        return self._resize(frame), self._next_timestamp()
+
+    def _next_frame(self):
+        raise NotImplementedError
+
+class VideoFileSource(_PacedSource):
+    kind = 'video'
+
+    def __init__(self, path, fps=None, loop=True):
+        """
+        녹화 영상 파일 재생 소스
+        path: 영상 파일 경로 (mp4, avi 등 OpenCV가 읽을 수 있는 형식)
+        fps: 재생 FPS (None이면 파일의 FPS, 0이면 최대 속도)
+        """
+        super().__init__(fps, loop)
+        self.path = path
+        self._cap = None
+
+    def open(self):
+        self._cap = cv2.VideoCapture(self.path)
+        if not self._cap.isOpened():
+            self._cap = None
+            return False
+        file_fps = float(self._cap.get(cv2.CAP_PROP_FPS) or 0)
+        self.fps = self.requested_fps if self.requested_fps is not None else (file_fps or 30.0)
+        if not (self.width and self.height):
+            self.width = int(self._cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            self.height = int(self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.exhausted = False
+        self._start_clock()
+        return True
+
+    def isOpened(self):
+        return self._cap is not None and self._cap.isOpened()
+
+    def _next_frame(self):
+        if self._cap is None:
+            return None
+        ret, frame = self._cap.read()
+        if not ret and self.loop:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self._cap.read()
+        return frame if ret else None
+
+    def describe(self):
+        info = super().describe()
+        info["path"] = self.path
+        return info
+
+    def release(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+class ImageFolderSource(_PacedSource):
+    kind = 'images'
+
+    def __init__(self, folder, fps=10.0, loop=True, max_cached=300):
+        """
+        이미지 폴더 재생 소스 (파일 이름 순서)
+        folder: 이미지 폴더 경로
+        fps: 재생 FPS (0이면 최대 속도)
+        max_cached: 메모리에 디코딩해 둘 최대 장수 (넘으면 매번 파일에서 읽음)
+        """
+        super().__init__(fps if fps is not None else 10.0, loop)
+        self.folder = folder
+        self.max_cached = max_cached
+        self._paths = []
+        self._cache = None
+        self._position = 0
+        self._unreadable = set()
+        self.skipped = 0
+
+    def open(self):
+        if not os.path.isdir(self.folder):
+            return False
+        self._paths = [
+            os.path.join(self.folder, name) for name in sorted(os.listdir(self.folder))
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        ]
+        if not self._paths:
+            return False
+        self._cache = {} if len(self._paths) <= self.max_cached else None
+        self._position = 0
+        self._unreadable = set()
+        self.skipped = 0
+        self.fps = self.requested_fps
+        if not (self.width and self.height):
+            for position in range(len(self._paths)):
+                first = self._load(position)
+                if first is not None:
+                    self.height, self.width = first.shape[:2]
+                    break
+        self.exhausted = False
+        self._start_clock()
+        return True
+
+    def isOpened(self):
+        return bool(self._paths)
+
+    def _load(self, position):
+        if self._cache is not None and position in self._cache:
+            return self._cache[position]
+        frame = cv2.imread(self._paths[position])
+        if self._cache is not None and frame is not None:
+            self._cache[position] = frame
+        return frame
+
+    def _next_frame(self):
+        """
+        다음 이미지를 반환합니다.
+        - 읽을 수 없는 파일(깨진 이미지, 복사 중인 파일 등)은 건너뛰고 다음 파일을 읽습니다.
+        - None은 실제로 끝에 도달했거나(loop=False) 읽을 수 있는 파일이 하나도 없을 때만 반환합니다.
+        """
+        if not self._paths:
+            return None
+        # 한 바퀴를 다 돌아도 읽을 수 있는 파일이 없으면 포기합니다.
+        for _ in range(len(self._paths)):
+            if self._position >= len(self._paths):
+                if not self.loop:
+                    return None
+                self._position = 0
+            position = self._position
+            self._position += 1
+            frame = self._load(position)
+            if frame is not None:
+                # 캐시된 원본을 그리기 단계가 수정하지 않도록 복사본을 내보냅니다.
+                return frame.copy()
+            self.skipped += 1
+            if position not in self._unreadable:
+                self._unreadable.add(position)
+                print(f"⚠️ 이미지를 읽을 수 없어 건너뜁니다: {self._paths[position]}")
+        return None
+
+    def describe(self):
+        info = super().describe()
+        info["folder"] = self.folder
+        info["skipped"] = self.skipped
+        return info
+
+    def release(self):
+        self._paths = []
+        self._cache = None
+
+class SyntheticSource(_PacedSource):
+    kind = 'synthetic'
+
+    def __init__(self, width=None, height=None, fps=15.0, num_objects=2, seed=0):
+        """
+        합성 패턴 소스 (카메라 없는 CI/개발 PC에서 서버 전체 실행 및 부하 테스트용)
+        width, height: 해상도 (None이면 파이프라인 설정 해상도를 따름)
+        fps: 생성 FPS (0이면 최대 속도)
+        num_objects: 화면을 가로지르는 사각형 수 (움직임 게이트/추적이 동작하도록)
+        seed: 난수 시드 - 같은 시드면 항상 같은 프레임 순서
+        """
+        super().__init__(fps, loop=True)
+        self.fixed_size = (width, height) if width and height else None
+        self.width, self.height = self.fixed_size or (640, 480)
+        self.num_objects = num_objects
+        self.seed = seed
+        self._background = None
+        self._objects = []
+
+    def configure(self, width, height, fps):
+        if self.fixed_size is None:
+            super().configure(width, height, fps)
+        self._background = None
+
+    def open(self):
+        self.fps = self.requested_fps
+        rng = np.random.default_rng(self.seed)
+        # 사각형마다 (시작 위치, 속도 px/프레임, 크기, 색상)
+        self._objects = [
+            (rng.uniform(0, 1, 2), rng.uniform(-4, 4, 2), rng.uniform(0.08, 0.2), tuple(int(c) for c in rng.integers(60, 255, 3)))
+            for _ in range(self.num_objects)
+        ]
+        self._background = None
+        self.exhausted = False
+        self._start_clock()
+        return True
+
+    def isOpened(self):
+        return self._t0 is not None
+
+    def _build_background(self):
+        # 세로 그라데이션 배경 (해상도가 바뀔 때만 다시 만듭니다)
+        column = np.linspace(40, 160, self.height, dtype=np.uint8)
+        background = np.repeat(column[:, None], self.width, axis=1)
+        self._background = cv2.merge([background, background, background])
+
+    def _next_frame(self):
+        if self._background is None or self._background.shape[:2] != (self.height, self.width):
+            self._build_background()
+        frame = self._background.copy()
+        n = self._index
+        for start, velocity, size, color in self._objects:
+            box_w, box_h = int(self.width * size), int(self.height * size)
+            # 화면 끝에서 튕기는 등속 운동 (프레임 번호만으로 위치가 정해짐)
+            x = int(start[0] * self.width + velocity[0] * n) % (2 * max(1, self.width - box_w))
+            y = int(start[1] * self.height + velocity[1] * n) % (2 * max(1, self.height - box_h))
+            x = x if x < self.width - box_w else 2 * (self.width - box_w) - x
+            y = y if y < self.height - box_h else 2 * (self.height - box_h) - y
+            cv2.rectangle(frame, (x, y), (x + box_w, y + box_h), color, -1)
+        cv2.putText(frame, f"SYNTHETIC #{n}", (10, self.height - 12), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+        return frame
+
+    def _resize(self, frame):
+        # 이미 목표 해상도로 그렸으므로 크기 변환이 필요 없습니다.
+        return frame
+
+    def release(self):
+        self._t0 = None
+
+def create_frame_source(spec, fps=None, loop=True):
+    """
+    문자열 설정으로 프레임 소스를 만듭니다.
+    spec 예:
+      0, "usb:0"               → USB 카메라 0번
+      "video:../videos/a.mp4"  → 영상 파일 (경로만 써도 됨)
+      "images:../samples"      → 이미지 폴더 (폴더 경로만 써도 됨)
+      "synthetic", "synthetic:1280x720" → 합성 패턴
+    fps: 재생 소스의 FPS (None이면 소스 기본값, 0이면 최대 속도)
+    loop: 재생 소스를 반복할지 여부
+    return: FrameSource
+    """
+    if isinstance(spec, int):
+        return UsbCameraSource(spec)
+    spec = str(spec).strip()
+    kind, _, value = spec.partition(':')
+    if spec.isdigit():
+        return UsbCameraSource(int(spec))
+    if kind == 'usb':
+        return UsbCameraSource(int(value))
+    if kind == 'synthetic':
+        width, height = (None, None)
+        if value:
+            width, height = (int(v) for v in value.lower().split('x'))
+        return SyntheticSource(width, height, fps=15.0 if fps is None else fps)
+    if kind == 'video':
+        return VideoFileSource(value, fps=fps, loop=loop)
+    if kind == 'images':
+        return ImageFolderSource(value, fps=fps, loop=loop)
+    return open_replay_source(spec, fps=fps, loop=loop)
+
+def open_replay_source(path, fps=None, loop=True):
+    """
+    경로에 맞는 재생 소스를 만듭니다.
+    path: 이미지 폴더 또는 영상 파일 경로
+    return: VideoFileSource / ImageFolderSource
+    """
+    if os.path.isdir(path):
+        return ImageFolderSource(path, fps=fps, loop=loop)
+    return VideoFileSource(path, fps=fps, loop=loop)
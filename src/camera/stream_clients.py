@@ -0,0 +1,122 @@
+# /home/pi/autocarz/src/camera/stream_clients.py
+# 스트림 시청자(MJPEG/WebSocket) 목록과 클라이언트별 전송/드롭 통계
+
+import time
+import itertools
+import threading
+from utils.metrics import frames_dropped
+from utils.settings_manager import load_config
+
+class StreamClient:
+    def __init__(self, client_id, camera_index, profile, transport, remote_addr):
+        """
+        스트림 시청자 1명의 통계
+        - 클라이언트는 항상 최신 프레임만 받으므로, 느린 클라이언트는 대기열이 쌓이지 않고 중간 프레임을 건너뜁니다.
+        - dropped: 클라이언트가 느려서 건너뛴 프레임 수 (max_fps 제한으로 일부러 건너뛴 프레임은 throttled)
+        """
+        self.client_id = client_id
+        self.camera_index = camera_index
+        self.profile = profile
+        self.transport = transport
+        self.remote_addr = remote_addr
+        self.connected_at = time.time()
+
+        self.sent = 0
+        self.bytes_sent = 0
+        self.skipped = 0      # 건너뛴 전체 프레임 수 (seq 간격)
+        self.throttled = 0    # max_fps 제한으로 건너뛴 프레임 수
+        self.last_seq = 0
+        self.last_send_ms = 0.0
+        self._reported_dropped = 0
+        self._dropped_counter = frames_dropped.labels('main' if camera_index is None else str(camera_index), 'stream_client')
+
+    @property
+    def dropped(self):
+        return max(0, self.skipped - self.throttled)
+
+    def record_sent(self, encoded, send_time):
+        """
+        프레임 1장을 보낸 뒤 호출합니다.
+        encoded: 보낸 EncodedFrame
+        send_time: 전송(쓰기)에 걸린 시간(초)
+        """
+        if self.last_seq and encoded.seq > self.last_seq:
+            self.skipped += encoded.seq - self.last_seq - 1
+            # max_fps 제한으로 건너뛴 프레임은 /metrics 드롭에서 제외하고, 늘어난 만큼만 더합니다.
+            dropped = self.dropped
+            if dropped > self._reported_dropped:
+                self._dropped_counter.inc(dropped - self._reported_dropped)
+                self._reported_dropped = dropped
+        self.last_seq = encoded.seq
+        self.sent += 1
+        self.bytes_sent += len(encoded.jpeg)
+        self.last_send_ms = send_time * 1000
+
+    def reset_sequence(self):
+        """파이프라인이 바뀌어 프레임 번호가 처음부터 다시 시작될 때 호출합니다."""
+        self.last_seq = 0
+
+    def to_dict(self):
+        total = self.sent + self.skipped
+        return {
+            "id": self.client_id,
+            "camera_index": self.camera_index,
+            "transport": self.transport,
+            "remote_addr": self.remote_addr,
+            "profile": self.profile._asdict(),
+            "connected_sec": round(time.time() - self.connected_at, 1),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "throttled": self.throttled,
+            "drop_rate": round(self.dropped / total, 3) if total else 0.0,
+            "bytes_sent": self.bytes_sent,
+            "last_send_ms": round(self.last_send_ms, 1)
+        }
+
+class StreamClientRegistry:
+    def __init__(self, max_clients=0):
+        """
+        현재 연결된 스트림 시청자 목록
+        max_clients: 동시 스트림 시청자 최대 수 (0이면 제한 없음)
+        - 스트림 1개가 서버 작업 스레드 1개를 계속 차지하므로, 제한이 없으면 API 요청을 처리할 스레드가 남지 않습니다.
+        """
+        self.max_clients = max_clients
+        self.rejected_count = 0
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._ids = itertools.count(1)
+
+    def register(self, camera_index, profile, transport='mjpeg', remote_addr=None):
+        """
+        시청자를 등록합니다.
+        return: StreamClient 또는 None (최대 시청자 수 초과)
+        """
+        with self._lock:
+            if self.max_clients and len(self._clients) >= self.max_clients:
+                self.rejected_count += 1
+                print(f"🚫 스트림 시청자 수 제한({self.max_clients}명) 초과 - {remote_addr} 연결 거부")
+                return None
+            client = StreamClient(next(self._ids), camera_index, profile, transport, remote_addr)
+            self._clients[client.client_id] = client
+        print(f"👀 스트림 클라이언트 #{client.client_id} 연결 ({transport}, {remote_addr}, 카메라 {camera_index})")
+        return client
+
+    def unregister(self, client):
+        """시청자 등록을 해제합니다 (여러 번 호출해도 한 번만 처리)"""
+        with self._lock:
+            if self._clients.pop(client.client_id, None) is None:
+                return
+        print(f"👋 스트림 클라이언트 #{client.client_id} 연결 종료 (전송 {client.sent}, 드롭 {client.dropped})")
+
+    def count(self):
+        with self._lock:
+            return len(self._clients)
+
+    def snapshot(self):
+        with self._lock:
+            return [client.to_dict() for client in self._clients.values()]
+
+# 전역 스트림 클라이언트 목록 (config.ini [SERVER] MAX_STREAM_CLIENTS)
+stream_clients = StreamClientRegistry(
+    max_clients=load_config().getint('SERVER', 'MAX_STREAM_CLIENTS', fallback=8)
+)
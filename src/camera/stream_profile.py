@@ -0,0 +1,57 @@
+# /home/pi/autocarz/src/camera/stream_profile.py
+# 시청자별 스트림 프로필 (해상도 배율, JPEG 품질, 최대 FPS)
+
+from collections import namedtuple
+
+# scale: 해상도 배율 (1.0 = 원본), quality: JPEG 품질 (10~95), max_fps: 최대 전송 FPS (0 = 제한 없음)
+StreamProfile = namedtuple('StreamProfile', ['scale', 'quality', 'max_fps'])
+
+DEFAULT_JPEG_QUALITY = 85   # 템플릿 detection_settings의 quality 기본값과 동일
+DEFAULT_PROFILE = StreamProfile(1.0, DEFAULT_JPEG_QUALITY, 0)
+
+# 쿼리 파라미터 이름으로 고를 수 있는 미리 정의된 프로필
+PRESET_PROFILES = {
+    'full': DEFAULT_PROFILE,
+    'lte': StreamProfile(0.5, 50, 5),     # 원격 모니터링(약한 LTE 회선)용
+    'low': StreamProfile(0.25, 40, 2)
+}
+
+def set_default_quality(quality):
+    """
+    쿼리 파라미터가 없는 시청자(profile=full)의 기본 JPEG 품질을 바꿉니다 (설정 화면의 quality)
+    - 다음 /video_feed 연결부터 적용됩니다.
+    """
+    quality = int(round(_clamp(int(quality), 10, 95) / 5) * 5)
+    PRESET_PROFILES['full'] = StreamProfile(1.0, quality, 0)
+
+def default_profile(max_fps=0):
+    """
+    지금 기본 시청자(profile=full)와 같은 배율/품질의 프로필 (클립 녹화기처럼 시청자 JPEG를 재사용할 때)
+    max_fps: 최대 FPS - 인코딩 캐시 키는 (배율, 품질)뿐이므로 FPS가 달라도 같은 JPEG를 공유합니다.
+    """
+    full = PRESET_PROFILES['full']
+    return StreamProfile(full.scale, full.quality, max_fps)
+
+def _clamp(value, low, high):
+    return max(low, min(high, value))
+
+def parse_stream_profile(args):
+    """
+    요청 쿼리 파라미터로 스트림 프로필을 만듭니다.
+    args: request.args (예: ?scale=0.5&quality=50&fps=5 또는 ?profile=lte)
+    return: StreamProfile
+    - 값은 구간 단위로 맞춰서(scale 0.05, quality 5) 비슷한 요청이 같은 인코딩 결과를 공유하도록 합니다.
+    - 잘못된 값은 ValueError를 발생시킵니다.
+    """
+    base = PRESET_PROFILES.get(args.get('profile', 'full'))
+    if base is None:
+        raise ValueError(f"알 수 없는 프로필입니다: {args.get('profile')} (사용 가능: {', '.join(PRESET_PROFILES)})")
+
+    scale = float(args.get('scale', base.scale))
+    quality = int(args.get('quality', base.quality))
+    max_fps = float(args.get('fps', base.max_fps))
+
+    scale = round(_clamp(scale, 0.1, 1.0) * 20) / 20
+    quality = int(round(_clamp(quality, 10, 95) / 5) * 5)
+    max_fps = round(_clamp(max_fps, 0, 60), 1)
+    return StreamProfile(scale, quality, max_fps)
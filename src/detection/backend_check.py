@@ -0,0 +1,143 @@
+# /home/pi/autocarz/src/detection/backend_check.py
+# 시작 시 pytorch 모델과 변환 모델(ONNX/OpenVINO)의 정확도/지연 시간을 비교
+
+import os
+import time
+import cv2
+import numpy as np
+from detection.model_registry import model_registry
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+def load_sample_frames(sample_dir, max_frames=5, size=(640, 480)):
+    """
+    비교용 샘플 프레임을 불러옵니다.
+    sample_dir: 샘플 이미지 폴더
+    max_frames: 최대 사용 장수
+    size: 샘플이 없을 때 만들 임의 프레임 크기 (지연 시간 비교만 의미 있음)
+    return: (프레임 리스트, 실제 이미지 여부)
+    """
+    frames = []
+    if sample_dir and os.path.isdir(sample_dir):
+        for name in sorted(os.listdir(sample_dir)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                frame = cv2.imread(os.path.join(sample_dir, name))
+                if frame is not None:
+                    frames.append(frame)
+            if len(frames) >= max_frames:
+                break
+    if frames:
+        return frames, True
+
+    rng = np.random.default_rng(0)
+    width, height = size
+    return [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(max_frames)], False
+
+def _boxes(results):
+    boxes = []
+    for r in results:
+        for box in r.boxes:
+            boxes.append((int(box.cls[0]), float(box.conf[0]), [float(v) for v in box.xyxy[0]]))
+    return boxes
+
+def _iou(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+def _run(model_path, frames):
+    # 첫 추론(워밍업)은 지연 시간 측정에서 제외합니다.
+    model_registry.predict(model_path, frames[0])
+    latencies, outputs = [], []
+    for frame in frames:
+        # 레지스트리 캐시에 걸리지 않도록 매번 새 배열로 추론합니다.
+        start = time.perf_counter()
+        results = model_registry.predict(model_path, frame.copy())
+        latencies.append(time.perf_counter() - start)
+        outputs.append(_boxes(results))
+    return latencies, outputs
+
+def _supports_dynamic_input(model_path, frames):
+    """
+    배치 추론과 다른 크기 입력(ROI 잘라낸 영역)이 되는지 확인합니다.
+    - 예전에 입력 크기를 고정(1x3x640x640)해서 변환한 모델은 여기서 실패합니다.
+    """
+    try:
+        model_registry.predict_batch(model_path, [frame.copy() for frame in frames[:2]])
+        height, width = frames[0].shape[:2]
+        model_registry.predict(model_path, frames[0][:height // 2, :width // 2].copy())
+        return True
+    except Exception:
+        return False
+
+def compare_backends(reference_path, candidate_path, frames, iou_threshold=0.5):
+    """
+    두 모델의 탐지 결과 일치율과 지연 시간을 비교합니다.
+    reference_path: 기준 모델 (best.pt)
+    candidate_path: 비교 모델 (best.onnx 등)
+    frames: 샘플 프레임 리스트
+    iou_threshold: 같은 객체로 볼 최소 IoU
+    return: 비교 결과 딕셔너리
+    """
+    model_registry.get_model(reference_path)
+    model_registry.get_model(candidate_path)
+
+    ref_latencies, ref_outputs = _run(reference_path, frames)
+    cand_latencies, cand_outputs = _run(candidate_path, frames)
+
+    matched, total, conf_diffs = 0, 0, []
+    for ref_boxes, cand_boxes in zip(ref_outputs, cand_outputs):
+        total += max(len(ref_boxes), len(cand_boxes))
+        used = set()
+        for cls_id, conf, coords in ref_boxes:
+            for j, (c_cls, c_conf, c_coords) in enumerate(cand_boxes):
+                if j in used or c_cls != cls_id:
+                    continue
+                if _iou(coords, c_coords) >= iou_threshold:
+                    used.add(j)
+                    matched += 1
+                    conf_diffs.append(abs(conf - c_conf))
+                    break
+
+    return {
+        "reference": reference_path,
+        "candidate": candidate_path,
+        "frames": len(frames),
+        "agreement": round(matched / total, 3) if total else 1.0,
+        "mean_conf_diff": round(float(np.mean(conf_diffs)), 4) if conf_diffs else 0.0,
+        "reference_latency_ms": round(float(np.median(ref_latencies)) * 1000, 1),
+        "candidate_latency_ms": round(float(np.median(cand_latencies)) * 1000, 1),
+        "speedup": round(float(np.median(ref_latencies) / np.median(cand_latencies)), 2) if cand_latencies else 0.0,
+        "dynamic_input": _supports_dynamic_input(candidate_path, frames)
+    }
+
+def run_startup_check(reference_path, candidate_path, sample_dir=None, unload_reference=True):
+    """
+    시작 시 백엔드 비교를 실행하고 결과를 출력합니다.
+    unload_reference: 비교가 끝나면 기준 모델(best.pt)을 메모리에서 내립니다 (라즈베리파이 메모리 절약)
+    return: compare_backends() 결과 (실패 시 None)
+    """
+    if os.path.abspath(reference_path) == os.path.abspath(candidate_path):
+        return None
+    try:
+        frames, real_images = load_sample_frames(sample_dir)
+        report = compare_backends(reference_path, candidate_path, frames)
+        report["real_images"] = real_images
+        print(f"📏 백엔드 비교 ({len(frames)}장): 일치율 {report['agreement'] * 100:.1f}%, "
+              f"지연 {report['reference_latency_ms']}ms → {report['candidate_latency_ms']}ms "
+              f"(x{report['speedup']})")
+        if not report['dynamic_input']:
+            print("   ⚠️ 변환 모델이 배치/다른 크기 입력을 받지 못합니다. 변환 파일을 지우고 다시 실행해 dynamic 모델로 변환하세요.")
+        if not real_images:
+            print("   ⚠️ 샘플 이미지가 없어 임의 프레임으로 비교했습니다 (지연 시간만 참고하세요).")
+        elif report['agreement'] < 0.9:
+            print("   ⚠️ 탐지 결과 일치율이 90% 미만입니다. INT8 설정이나 변환 모델을 확인해주세요.")
+        return report
+    except Exception as e:
+        print(f"❌ 백엔드 비교 실패: {e}")
+        return None
+    finally:
+        if unload_reference:
+            model_registry.unload(reference_path)
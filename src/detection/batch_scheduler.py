@@ -0,0 +1,122 @@
+# /home/pi/autocarz/src/detection/batch_scheduler.py
+# 여러 카메라의 추론 요청을 짧은 시간 창 안에서 모아 한 번의 배치로 실행하는 스케줄러
+
+import time
+import threading
+from detection.model_registry import model_registry
+
+class _BatchRequest:
+    def __init__(self, frame):
+        self.frame = frame
+        self.results = None
+        self.error = None
+        self.done = threading.Event()
+
+class BatchInferenceScheduler:
+    def __init__(self, model_path, batch_window=0.02, max_batch_size=4, expected_batch_fn=None):
+        """
+        카메라 간 배치 추론 스케줄러
+        model_path: model_registry에 로드된 모델 경로
+        batch_window: 첫 요청 이후 다른 카메라의 요청을 기다리는 최대 시간(초)
+        max_batch_size: 한 배치에 넣을 최대 프레임 수
+        expected_batch_fn: 현재 활성 카메라 수를 반환하는 함수 (그 수만큼 모이면 즉시 실행)
+        - 카메라별 추론 워커는 detect()에서 결과가 나올 때까지 기다리고,
+          결과는 각 워커를 통해 해당 카메라의 detection_results로 돌아갑니다.
+        """
+        self.model_path = model_path
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.expected_batch_fn = expected_batch_fn
+
+        self._cond = threading.Condition()
+        self._queue = []
+        self._thread = None
+
+        # 상태 확인용 통계
+        self.batch_count = 0
+        self.frame_count = 0
+        self.last_batch_size = 0
+        self.last_batch_latency = 0.0
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="batch-inference", daemon=True)
+        self._thread.start()
+
+    def _target_batch_size(self):
+        target = self.max_batch_size
+        if self.expected_batch_fn is not None:
+            try:
+                target = min(target, max(1, int(self.expected_batch_fn())))
+            except Exception:
+                pass
+        return target
+
+    def detect(self, frame, timeout=10.0):
+        """
+        프레임을 배치 큐에 넣고 결과가 나올 때까지 기다립니다.
+        frame: 입력 이미지 (BGR numpy 배열)
+        timeout: 최대 대기 시간(초)
+        return: YOLO 탐지 결과 리스트 (YoloDetector.detect()와 같은 형태) 또는 None
+        """
+        request = _BatchRequest(frame)
+        with self._cond:
+            self._ensure_started()
+            self._queue.append(request)
+            self._cond.notify_all()
+
+        if not request.done.wait(timeout):
+            print("⚠️ 배치 추론 대기 시간 초과")
+            return None
+        if request.error is not None:
+            raise request.error
+        return request.results
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: len(self._queue) > 0)
+
+                # 첫 요청 이후 batch_window 동안 다른 카메라의 요청을 기다립니다.
+                # 활성 카메라 수만큼 모이면 창이 끝나기 전에 바로 실행합니다.
+                target = self._target_batch_size()
+                deadline = time.monotonic() + self.batch_window
+                while len(self._queue) < target:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                batch = self._queue[:self.max_batch_size]
+                del self._queue[:len(batch)]
+
+            start_time = time.perf_counter()
+            try:
+                if len(batch) == 1:
+                    per_frame = [model_registry.predict(self.model_path, batch[0].frame)]
+                else:
+                    per_frame = model_registry.predict_batch(self.model_path, [r.frame for r in batch])
+                for request, results in zip(batch, per_frame):
+                    request.results = results
+            except Exception as e:
+                print(f"❌ 배치 추론 중 오류: {e}")
+                for request in batch:
+                    request.error = e
+            finally:
+                self.last_batch_latency = time.perf_counter() - start_time
+                self.last_batch_size = len(batch)
+                self.batch_count += 1
+                self.frame_count += len(batch)
+                for request in batch:
+                    request.done.set()
+
+    def get_stats(self):
+        """배치 추론 통계 (상태 API용)"""
+        return {
+            "batch_count": self.batch_count,
+            "frame_count": self.frame_count,
+            "avg_batch_size": round(self.frame_count / self.batch_count, 2) if self.batch_count else 0,
+            "last_batch_size": self.last_batch_size,
+            "last_batch_latency_ms": round(self.last_batch_latency * 1000, 1)
+        }
@@ -0,0 +1,90 @@
+# /home/pi/autocarz/src/detection/inference_worker.py
+# 스트리밍 루프와 분리된 추론 전용 워커 (항상 가장 최신 프레임만 처리)
+
+import time
+import threading
+
+class InferenceWorker:
+    def __init__(self, infer_fn, name="inference-worker", on_drop=None):
+        """
+        최신 프레임 우선(latest-frame-wins) 추론 워커
+        infer_fn: 추론 함수 infer_fn(frame, timestamp, **context) - 결과 저장까지 직접 처리
+        name: 스레드 이름 (디버그용)
+        on_drop: 대기 프레임이 새 프레임으로 교체(버려짐)될 때 호출할 함수 (지표 수집용)
+        - 대기 슬롯은 1개뿐이라, 추론 중에 새 프레임이 들어오면 이전 대기 프레임은 버려집니다.
+        - 캡처/스트리밍 루프는 submit()만 호출하고 절대 기다리지 않습니다.
+        """
+        self._infer_fn = infer_fn
+        self._on_drop = on_drop
+        self._name = name
+        self._cond = threading.Condition()
+        self._pending = None
+        self._thread = None
+        self._stop = False
+        self._busy = False
+
+        # 상태 확인용 통계
+        self.submitted_count = 0
+        self.processed_count = 0
+        self.dropped_count = 0
+        self.last_latency = 0.0
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop = False
+            self._pending = None
+            self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=2.0):
+        with self._cond:
+            self._stop = True
+            self._pending = None
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    @property
+    def is_busy(self):
+        return self._busy or self._pending is not None
+
+    def submit(self, frame, timestamp=None, **context):
+        """
+        추론할 프레임을 등록합니다 (즉시 반환)
+        frame: 추론할 프레임 (워커가 읽는 동안 호출자가 수정하면 안 됨)
+        timestamp: 프레임 캡처 시각 (기본값: 현재 시각)
+        context: infer_fn에 그대로 전달할 추가 정보 (예: 움직임 영역)
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        with self._cond:
+            if self._pending is not None:
+                self.dropped_count += 1
+                if self._on_drop is not None:
+                    self._on_drop()
+            self._pending = (frame, timestamp, context)
+            self.submitted_count += 1
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or self._stop)
+                if self._stop:
+                    return
+                frame, timestamp, context = self._pending
+                self._pending = None
+                self._busy = True
+
+            start_time = time.perf_counter()
+            try:
+                self._infer_fn(frame, timestamp, **context)
+            except Exception as e:
+                print(f"❌ 추론 워커 오류: {e}")
+            finally:
+                self.last_latency = time.perf_counter() - start_time
+                self.processed_count += 1
+                self._busy = False
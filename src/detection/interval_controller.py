@@ -0,0 +1,162 @@
+# /home/pi/autocarz/src/detection/interval_controller.py
+# 추론이 차지하는 CPU 시간(듀티 사이클)에 맞춰 검출 간격(detection_interval)을 자동으로 조절하는 컨트롤러
+
+import math
+import time
+import threading
+from collections import deque
+
+# 시스템 CPU 사용률이 이 값(%)을 넘으면 추론 예산을 줄입니다.
+CPU_OVERLOAD_PERCENT = 85.0
+# 장면에 움직임/객체가 없을 때 쓰는 예산 비율 (지연 목표를 지키는 범위에서 CPU를 아낌)
+IDLE_BUDGET_RATIO = 0.5
+
+class DetectionIntervalController:
+    def __init__(self, initial_interval, target_fps, latency_target, cpu_budget=0.5,
+                 min_interval=1, max_interval=15, window_size=20, adjust_period=1.0,
+                 cpu_percent_fn=None, scene_active_fn=None, camera_count_fn=None):
+        """
+        추론 듀티 사이클 기반 검출 간격 컨트롤러
+        initial_interval: 시작 검출 간격 (플랫폼별 기본값)
+        target_fps: 캡처 목표 FPS (프레임 예산 = 1 / target_fps)
+        latency_target: 목표 탐지 지연(초) - 객체가 나타난 뒤 탐지되기까지의 시간 (검출 주기 + 추론 시간)
+        cpu_budget: 추론이 차지해도 되는 시간 비율 (0~1, 카메라 전체 합계)
+        min_interval, max_interval: 검출 간격 하한/상한 (프레임)
+        window_size: 이동 평균에 사용할 최근 측정 개수
+        adjust_period: 간격을 다시 계산하는 최소 주기(초) - 너무 자주 흔들리지 않게 합니다.
+        cpu_percent_fn: 현재 시스템 CPU 사용률(%)을 반환하는 함수 (없거나 None을 반환하면 무시)
+        scene_active_fn: 장면에 움직임/객체가 있으면 True를 반환하는 함수
+        camera_count_fn: 추론을 나눠 쓰는 카메라 수를 반환하는 함수
+        - 검출 간격이 바꿀 수 있는 값은 추론 1회 시간이 아니라 추론 빈도이므로,
+          듀티 사이클 = 평균 추론 시간 × target_fps × 카메라 수 / 간격 이 예산 안에 들도록 간격을 정합니다.
+        - 장면이 조용하면 지연 목표를 넘지 않는 가장 큰 간격으로 CPU를 아끼고,
+          움직임/객체가 있으면 예산이 허용하는 가장 작은 간격으로 자주 탐지합니다.
+        """
+        self.interval = int(initial_interval)
+        self.target_fps = target_fps
+        self.latency_target = latency_target
+        self.cpu_budget = cpu_budget
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.adjust_period = adjust_period
+        self.cpu_percent_fn = cpu_percent_fn
+        self.scene_active_fn = scene_active_fn
+        self.camera_count_fn = camera_count_fn
+        self.enabled = True
+
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window_size)
+        self._last_adjust_time = 0.0
+        self.last_reason = "초기값"
+        self._inputs = {"cpu_percent": None, "scene_active": True, "cameras": 1, "budget": cpu_budget}
+
+    @property
+    def frame_budget(self):
+        return 1.0 / self.target_fps
+
+    def record(self, latency):
+        """
+        YoloDetector.detect() 1회의 소요 시간을 기록하고 필요하면 간격을 조정합니다.
+        latency: 추론 소요 시간(초)
+        """
+        with self._lock:
+            self._latencies.append(latency)
+            now = time.monotonic()
+            if self.enabled and now - self._last_adjust_time >= self.adjust_period:
+                self._last_adjust_time = now
+                self._adjust()
+
+    def _rolling_latency(self):
+        if not self._latencies:
+            return 0.0
+        return sum(self._latencies) / len(self._latencies)
+
+    def _call(self, fn, default):
+        if fn is None:
+            return default
+        try:
+            value = fn()
+        except Exception:
+            return default
+        return default if value is None else value
+
+    def duty_cycle(self, interval, avg_latency=None, cameras=None):
+        """간격 interval로 검출할 때 추론이 차지하는 시간 비율"""
+        if avg_latency is None:
+            avg_latency = self._rolling_latency()
+        if cameras is None:
+            cameras = self._inputs["cameras"]
+        return avg_latency * self.target_fps * cameras / max(1, interval)
+
+    def _interval_for_budget(self, avg_latency, cameras, budget):
+        """듀티 사이클이 budget 이하가 되는 가장 작은 간격"""
+        return math.ceil(avg_latency * self.target_fps * cameras / budget) if budget > 0 else self.max_interval
+
+    def _adjust(self):
+        avg_latency = self._rolling_latency()
+        cpu_percent = self._call(self.cpu_percent_fn, None)
+        scene_active = bool(self._call(self.scene_active_fn, True))
+        cameras = max(1, int(self._call(self.camera_count_fn, 1)))
+
+        budget = self.cpu_budget
+        if cpu_percent is not None and cpu_percent > CPU_OVERLOAD_PERCENT:
+            # 다른 작업(인코딩, 여러 시청자 등)으로 CPU가 이미 바쁘면 추론 몫을 줄입니다.
+            budget *= 0.5
+        self._inputs = {"cpu_percent": cpu_percent, "scene_active": scene_active, "cameras": cameras, "budget": budget}
+
+        # 추론 1회가 검출 주기보다 오래 걸리면 워커가 따라가지 못하므로 이 값이 최소 간격입니다.
+        floor_interval = max(self.min_interval, math.ceil(avg_latency / self.frame_budget))
+        budget_interval = self._interval_for_budget(avg_latency, cameras, budget)
+        if budget_interval < self.interval:
+            # 경계값에서 간격이 오르내리지 않도록 줄일 때는 예산의 85%까지만 씁니다.
+            budget_interval = max(budget_interval, min(self.interval, self._interval_for_budget(avg_latency, cameras, budget * 0.85)))
+        new_interval = max(floor_interval, budget_interval)
+        reason = "CPU 예산"
+        if new_interval == floor_interval and floor_interval > budget_interval:
+            reason = "추론 시간이 프레임 예산 초과"
+
+        if not scene_active:
+            # 조용한 장면: 지연 목표(검출 주기 + 추론 시간)를 넘지 않는 가장 큰 간격으로 CPU를 아낍니다.
+            latency_interval = int((self.latency_target - avg_latency) * self.target_fps)
+            idle_interval = self._interval_for_budget(avg_latency, cameras, budget * IDLE_BUDGET_RATIO)
+            relaxed = min(latency_interval, idle_interval)
+            if relaxed > new_interval:
+                new_interval = relaxed
+                reason = "장면 정지 - 지연 목표 안에서 절약"
+
+        new_interval = min(self.max_interval, max(self.min_interval, new_interval))
+        if avg_latency + new_interval / self.target_fps > self.latency_target and reason == "CPU 예산":
+            reason = "CPU 예산 우선 (지연 목표 초과)"
+
+        if new_interval != self.interval:
+            print(f"🎚️ 검출 간격 조정: {self.interval} → {new_interval}프레임 "
+                  f"(평균 추론 {avg_latency * 1000:.0f}ms, 듀티 {self.duty_cycle(new_interval, avg_latency, cameras) * 100:.0f}%"
+                  f"/예산 {budget * 100:.0f}%, {reason})")
+            self.interval = new_interval
+        self.last_reason = reason
+
+    def get_state(self):
+        """현재 판단 상태 (상태 API용)"""
+        with self._lock:
+            avg_latency = self._rolling_latency()
+            latencies = sorted(self._latencies)
+            inputs = dict(self._inputs)
+        p90 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.9))] if latencies else 0.0
+        return {
+            "adaptive": self.enabled,
+            "detection_interval": self.interval,
+            "detection_fps": round(self.target_fps / self.interval, 2),
+            "avg_latency_ms": round(avg_latency * 1000, 1),
+            "p90_latency_ms": round(p90 * 1000, 1),
+            "latency_target_ms": round(self.latency_target * 1000, 1),
+            "expected_detection_delay_ms": round((avg_latency + self.interval / self.target_fps) * 1000, 1),
+            "frame_budget_ms": round(self.frame_budget * 1000, 1),
+            "duty_cycle": round(self.duty_cycle(self.interval, avg_latency, inputs["cameras"]), 3),
+            "cpu_budget": round(inputs["budget"], 3),
+            "cpu_percent": inputs["cpu_percent"],
+            "scene_active": inputs["scene_active"],
+            "cameras": inputs["cameras"],
+            "min_interval": self.min_interval,
+            "max_interval": self.max_interval,
+            "last_reason": self.last_reason
+        }
@@ -0,0 +1,70 @@
+# /home/pi/autocarz/src/detection/model_export.py
+# best.pt를 CPU 최적화 백엔드(ONNX Runtime / OpenVINO)용 모델로 변환하고 선택
+
+import os
+
+SUPPORTED_BACKENDS = ('pytorch', 'onnx', 'openvino')
+
+def _int8_onnx_path(onnx_path):
+    root, ext = os.path.splitext(onnx_path)
+    return f"{root}.int8{ext}"
+
+def _export_onnx(pt_path, onnx_path, imgsz):
+    from ultralytics import YOLO
+    print(f"🔄 ONNX 모델로 변환합니다: {pt_path} → {onnx_path}")
+    # dynamic=True: 배치 추론(최대 4장), ROI 잘라낸 영역, 실행 중 imgsz 변경처럼
+    # 1x3x640x640이 아닌 입력도 받을 수 있도록 입력 크기를 고정하지 않습니다.
+    exported = YOLO(pt_path).export(format='onnx', imgsz=imgsz, simplify=True, dynamic=True)
+    if os.path.abspath(exported) != os.path.abspath(onnx_path):
+        os.replace(exported, onnx_path)
+    return onnx_path
+
+def _quantize_onnx(onnx_path, int8_path):
+    # ultralytics의 ONNX 내보내기는 INT8을 지원하지 않으므로 ONNX Runtime 동적 양자화를 사용합니다.
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    print(f"🔄 ONNX INT8 양자화: {onnx_path} → {int8_path}")
+    quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QUInt8)
+    return int8_path
+
+def prepare_backend_model(pt_path, backend='pytorch', onnx_path=None, int8=False, imgsz=640):
+    """
+    설정된 백엔드에 맞는 모델 경로를 반환합니다 (필요하면 한 번만 변환)
+    pt_path: 원본 PyTorch 모델 경로 (예: models/best.pt)
+    backend: 'pytorch' / 'onnx' / 'openvino'
+    onnx_path: ONNX 모델 경로 (None이면 pt_path 옆에 best.onnx)
+    int8: INT8 양자화 모델 사용 여부
+    imgsz: 변환 시 입력 크기 (학습 설정과 동일하게 640)
+    return: model_registry.get_model()에 넘길 경로 (실패 시 pt_path로 되돌아감)
+    - 변환 모델은 입력 크기를 고정하지 않습니다 (dynamic). 예전에 고정 크기로 변환한 파일은
+      지우면 다음 실행 때 다시 변환됩니다.
+    """
+    backend = (backend or 'pytorch').lower()
+    if backend not in SUPPORTED_BACKENDS:
+        print(f"⚠️ 알 수 없는 백엔드 '{backend}' - pytorch를 사용합니다.")
+        return pt_path
+    if backend == 'pytorch':
+        return pt_path
+
+    try:
+        if backend == 'onnx':
+            onnx_path = onnx_path or os.path.splitext(pt_path)[0] + '.onnx'
+            if not os.path.exists(onnx_path):
+                _export_onnx(pt_path, onnx_path, imgsz)
+            if int8:
+                int8_path = _int8_onnx_path(onnx_path)
+                if not os.path.exists(int8_path):
+                    _quantize_onnx(onnx_path, int8_path)
+                return int8_path
+            return onnx_path
+
+        # OpenVINO: ultralytics가 best_openvino_model/ (INT8은 best_int8_openvino_model/) 폴더를 만듭니다.
+        root = os.path.splitext(pt_path)[0]
+        openvino_dir = f"{root}_int8_openvino_model" if int8 else f"{root}_openvino_model"
+        if not os.path.exists(openvino_dir):
+            from ultralytics import YOLO
+            print(f"🔄 OpenVINO 모델로 변환합니다: {pt_path} → {openvino_dir}")
+            openvino_dir = YOLO(pt_path).export(format='openvino', imgsz=imgsz, int8=int8, dynamic=True)
+        return openvino_dir
+    except Exception as e:
+        print(f"❌ {backend} 모델 준비 실패, pytorch로 되돌아갑니다: {e}")
+        return pt_path
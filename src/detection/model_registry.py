@@ -0,0 +1,138 @@
+# /home/pi/autocarz/src/detection/model_registry.py
+# 모델 가중치 파일을 한 번만 로드해서 여러 탐지기가 공유하도록 관리
+
+import os
+import threading
+from collections import deque
+
+class ModelRegistry:
+    def __init__(self):
+        """
+        모델 공유 레지스트리
+        - 같은 가중치 파일은 프로세스 전체에서 한 번만 로드합니다.
+        - 같은 모델 + 같은 프레임 요청은 한 번만 추론하고 결과를 재사용합니다.
+          (YoloDetector와 OpenCVCascadeDetector가 같은 best.pt를 쓰는 경우)
+        """
+        self._lock = threading.Lock()
+        self._models = {}
+        self._model_locks = {}
+        # 모델별 최근 추론 결과 (배치 추론 시 카메라 수만큼 보관)
+        self._recent_results = {}
+        # 모델별 기본 추론 옵션 (conf, iou, imgsz - 설정 화면에서 실행 중에 변경)
+        self._predict_options = {}
+
+        # 상태 확인용 통계
+        self.inference_count = 0
+        self.cache_hit_count = 0
+
+    def _key(self, model_path):
+        return os.path.abspath(model_path)
+
+    def get_model(self, model_path):
+        """
+        공유 모델 인스턴스를 반환합니다 (처음 요청 시에만 로드)
+        model_path: 모델 파일 경로 (예: models/best.pt)
+        return: ultralytics YOLO 모델 (로드 실패 시 예외 발생)
+        """
+        key = self._key(model_path)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                print(f"♻️ 이미 로드된 모델을 재사용합니다: {model_path}")
+                return model
+
+            # ultralytics(torch) import 자체가 수 초 걸리므로 실제로 모델이 필요할 때 가져옵니다.
+            from ultralytics import YOLO
+
+            # 변환 모델(.onnx, OpenVINO 폴더)은 작업 종류를 알 수 없으므로 detect로 지정합니다.
+            if model_path.endswith('.pt'):
+                model = YOLO(model_path)
+            else:
+                model = YOLO(model_path, task='detect')
+            self._models[key] = model
+            self._model_locks[key] = threading.Lock()
+            self._recent_results[key] = deque(maxlen=8)
+            print(f"✅ 모델 로드 완료 (공유): {model_path}")
+            return model
+
+    def unload(self, model_path):
+        """
+        더 이상 쓰지 않는 모델을 레지스트리에서 제거해 메모리를 돌려줍니다.
+        """
+        key = self._key(model_path)
+        with self._lock:
+            if self._models.pop(key, None) is not None:
+                self._model_locks.pop(key, None)
+                self._recent_results.pop(key, None)
+                print(f"🗑️ 모델 언로드: {model_path}")
+
+    def set_predict_options(self, model_path, **options):
+        """
+        모델의 기본 추론 옵션을 바꿉니다 (모델을 다시 로드하지 않음)
+        options: ultralytics 추론 옵션 (conf, iou, imgsz) - None 값은 제외
+        - 모든 탐지기(YOLO/OpenCV/배치)가 같은 옵션을 쓰므로 같은 프레임의 결과 캐시도 계속 공유됩니다.
+        """
+        self._predict_options[self._key(model_path)] = {k: v for k, v in options.items() if v is not None}
+
+    def _options(self, key, kwargs):
+        return {**self._predict_options.get(key, {}), **kwargs}
+
+    def predict(self, model_path, frame, **kwargs):
+        """
+        공유 모델로 추론합니다. 최근에 추론한 프레임 객체라면 캐시된 결과를 반환합니다.
+        model_path: get_model()로 로드한 모델 경로
+        frame: 입력 이미지 (BGR numpy 배열)
+        kwargs: ultralytics 추론 옵션 (conf, iou, imgsz 등)
+        return: YOLO 탐지 결과 리스트
+        """
+        key = self._key(model_path)
+        model = self._models[key]
+        kwargs = self._options(key, kwargs)
+        cache_key = tuple(sorted(kwargs.items()))
+
+        # ultralytics predictor는 스레드 안전하지 않으므로 모델별로 직렬화합니다.
+        # 같은 프레임을 기다리던 두 번째 요청은 lock을 얻은 뒤 캐시를 그대로 받습니다.
+        with self._model_locks[key]:
+            cached = self._find_cached(key, frame, cache_key)
+            if cached is not None:
+                self.cache_hit_count += 1
+                return cached
+
+            results = model(frame, verbose=False, **kwargs)
+            self._recent_results[key].append((frame, cache_key, results))
+            self.inference_count += 1
+            return results
+
+    def predict_batch(self, model_path, frames, **kwargs):
+        """
+        여러 프레임(여러 카메라)을 한 번의 배치로 추론합니다.
+        model_path: get_model()로 로드한 모델 경로
+        frames: 입력 이미지 리스트 (BGR numpy 배열)
+        kwargs: ultralytics 추론 옵션
+        return: 프레임별 결과 리스트 (각 항목은 predict()와 같은 형태의 리스트)
+        """
+        key = self._key(model_path)
+        model = self._models[key]
+        kwargs = self._options(key, kwargs)
+        cache_key = tuple(sorted(kwargs.items()))
+
+        with self._model_locks[key]:
+            batch_results = model(list(frames), verbose=False, **kwargs)
+            per_frame = []
+            for frame, result in zip(frames, batch_results):
+                results = [result]
+                # 같은 프레임에 대한 다른 탐지 경로(OpenCV)가 재사용할 수 있도록 보관합니다.
+                self._recent_results[key].append((frame, cache_key, results))
+                per_frame.append(results)
+            self.inference_count += 1
+            return per_frame
+
+    def _find_cached(self, key, frame, cache_key):
+        # 캐시에 프레임 참조를 보관하므로 id 재사용 없이 'is' 비교가 안전합니다.
+        for cached_frame, cached_key, results in self._recent_results[key]:
+            if cached_frame is frame and cached_key == cache_key:
+                return results
+        return None
+
+# 전역 모델 레지스트리 인스턴스
+model_registry = ModelRegistry()
@@ -0,0 +1,100 @@
+# /home/pi/autocarz/src/detection/motion_gate.py
+# YOLO 실행 전에 화면 변화(움직임)를 싸게 확인하는 사전 단계
+
+import time
+import cv2
+import numpy as np
+
+class MotionGate:
+    def __init__(self, downscale_width=160, pixel_threshold=25, min_changed_ratio=0.003,
+                 blur_size=5, max_skip_time=2.0):
+        """
+        축소 흑백 프레임 차분 기반 움직임 게이트
+        downscale_width: 비교용으로 줄일 가로 크기 (픽셀)
+        pixel_threshold: 밝기 차이가 이 값보다 큰 픽셀을 '변화'로 간주
+        min_changed_ratio: 변화 픽셀 비율이 이 값 이상이면 탐지 실행
+        blur_size: 센서 노이즈 제거용 가우시안 블러 크기 (홀수)
+        max_skip_time: 움직임이 없어도 이 시간(초)마다 한 번은 탐지 실행 (조명 변화 등 대비)
+        - 정차 중처럼 장면이 변하지 않으면 YOLO를 건너뛰어 CPU 사용량을 줄입니다.
+        - 판정은 수 ms 이내라 고라니가 화면에 들어오는 순간의 탐지는 늦어지지 않습니다.
+        """
+        self.downscale_width = downscale_width
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_ratio = min_changed_ratio
+        self.blur_size = blur_size
+        self.max_skip_time = max_skip_time
+        self.enabled = True
+
+        self._prev_gray = None
+        self._last_pass_time = 0.0
+        self._kernel = np.ones((3, 3), np.uint8)
+
+        # 상태 확인용 통계
+        self.passed_count = 0
+        self.skipped_count = 0
+        self.last_changed_ratio = 0.0
+
+    def _prepare(self, frame):
+        height, width = frame.shape[:2]
+        scale = self.downscale_width / float(width)
+        small = cv2.resize(frame, (self.downscale_width, max(1, int(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        gray = cv2.GaussianBlur(gray, (self.blur_size, self.blur_size), 0)
+        return gray, scale
+
+    def check(self, frame, force=False):
+        """
+        프레임에 충분한 변화가 있는지 확인합니다.
+        frame: 캡처된 원본 프레임 (BGR)
+        force: True면 변화와 관계없이 탐지를 실행 (예: 직전 탐지에 객체가 있었던 경우)
+        return: (탐지 실행 여부, 변화 영역 박스 (x1, y1, x2, y2) 또는 None)
+        """
+        now = time.time()
+        if not self.enabled:
+            self.passed_count += 1
+            return True, None
+
+        gray, scale = self._prepare(frame)
+        prev_gray = self._prev_gray
+        self._prev_gray = gray
+
+        if prev_gray is None or prev_gray.shape != gray.shape:
+            # 첫 프레임(또는 해상도 변경 직후)은 비교 대상이 없으므로 항상 탐지
+            self._last_pass_time = now
+            self.passed_count += 1
+            return True, None
+
+        diff = cv2.absdiff(prev_gray, gray)
+        _, mask = cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY)
+        mask = cv2.dilate(mask, self._kernel, iterations=2)
+
+        changed = cv2.countNonZero(mask)
+        self.last_changed_ratio = changed / float(mask.size)
+
+        motion_box = None
+        if changed > 0:
+            x, y, w, h = cv2.boundingRect(cv2.findNonZero(mask))
+            # 축소 좌표를 원본 프레임 좌표로 되돌립니다.
+            motion_box = (int(x / scale), int(y / scale), int((x + w) / scale), int((y + h) / scale))
+
+        has_motion = self.last_changed_ratio >= self.min_changed_ratio
+        timed_out = now - self._last_pass_time >= self.max_skip_time
+        if has_motion or force or timed_out:
+            self._last_pass_time = now
+            self.passed_count += 1
+            return True, motion_box if has_motion else None
+
+        self.skipped_count += 1
+        return False, None
+
+    def get_stats(self):
+        """게이트 통계 (상태 API용)"""
+        total = self.passed_count + self.skipped_count
+        return {
+            "enabled": self.enabled,
+            "passed": self.passed_count,
+            "skipped": self.skipped_count,
+            "skip_ratio": round(self.skipped_count / total, 3) if total else 0.0,
+            "last_changed_ratio": round(self.last_changed_ratio, 4)
+        }
@@ -3,8 +3,13 @@
 
 import cv2
 import os
+import time
 import numpy as np
-from ultralytics import YOLO
+from detection.model_registry import model_registry
+from utils.metrics import stage_seconds
+
+# /metrics 단계별 시간 (detect_yolo_objects)
+_detect_seconds = stage_seconds.labels('opencv_detect')
 
 class OpenCVCascadeDetector:
     def __init__(self, cascade_dir=None, yolo_model_path=None):
@@ -15,11 +20,12 @@ class OpenCVCascadeDetector:
         """
         self.cascades = {}
         self.yolo_model = None
+        self.yolo_model_path = yolo_model_path
         
-        # 1. YOLO 모델 로드 (OpenCV도 같은 모델 사용)
+        # 1. YOLO 모델 로드 (OpenCV도 같은 모델 사용 - 레지스트리에서 공유 인스턴스를 받음)
         if yolo_model_path and os.path.exists(yolo_model_path):
             try:
-                self.yolo_model = YOLO(yolo_model_path)
+                self.yolo_model = model_registry.get_model(yolo_model_path)
                 print(f"✅ OpenCV용 YOLO 모델 로드 성공: {yolo_model_path}")
             except Exception as e:
                 print(f"❌ OpenCV용 YOLO 모델 로드 실패: {e}")
@@ -128,10 +134,13 @@ class OpenCVCascadeDetector:
         if self.yolo_model is None:
             return None
             
+        start = time.perf_counter()
         try:
-            # YOLO 모델로 탐지
-            results = self.yolo_model(frame, verbose=False)
+            # YOLO 모델로 탐지 (같은 프레임을 YoloDetector가 이미 추론했다면 결과 재사용)
+            results = model_registry.predict(self.yolo_model_path, frame)
             return results
         except Exception as e:
             print(f"❌ OpenCV YOLO 탐지 중 오류: {e}")
-            return None 
\ No newline at end of file
+            return None
+        finally:
+            _detect_seconds.observe(time.perf_counter() - start) 
\ No newline at end of file
@@ -0,0 +1,131 @@
+# /home/pi/autocarz/src/detection/roi.py
+# 카메라별 관심 영역(ROI) 다각형 관리 - 도로 주변만 잘라서 탐지
+
+import cv2
+import numpy as np
+
+class RoiMask:
+    def __init__(self, polygons=None, padding=0.02):
+        """
+        관심 영역 마스크
+        polygons: 다각형 리스트 [[[x, y], ...], ...] - 좌표는 0~1 정규화 값 (해상도와 무관)
+        padding: 잘라낼 영역 주변에 더할 여백 (프레임 크기 대비 비율)
+        - 다각형이 없으면 전체 프레임을 그대로 사용합니다.
+        """
+        self.padding = padding
+        self.polygons = []
+        self.set_polygons(polygons or [])
+
+    def set_polygons(self, polygons):
+        """
+        다각형을 검증하고 저장합니다.
+        polygons: [[[x, y], ...], ...] (0~1 정규화 좌표, 꼭짓점 3개 이상)
+        """
+        cleaned = []
+        for polygon in polygons:
+            points = [(float(x), float(y)) for x, y in polygon]
+            if len(points) < 3:
+                raise ValueError("ROI 다각형은 꼭짓점이 3개 이상이어야 합니다")
+            if any(not (0.0 <= v <= 1.0) for point in points for v in point):
+                raise ValueError("ROI 좌표는 0~1 사이의 정규화 값이어야 합니다")
+            cleaned.append(points)
+        self.polygons = cleaned
+        self._cache = None
+
+    @property
+    def is_full_frame(self):
+        return not self.polygons
+
+    def _pixel_polygons(self, frame_shape):
+        # 해상도나 다각형이 바뀔 때만 픽셀 좌표와 잘라낼 영역을 다시 계산합니다.
+        # 추론 스레드와 렌더링 스레드가 동시에 부르므로 캐시는 (다각형, 해상도, 픽셀 다각형, 영역)
+        # 튜플 하나로 한 번에 바꿔, 다른 해상도/이전 다각형의 결과를 섞어 읽지 않게 합니다.
+        polygons = self.polygons
+        shape = frame_shape[:2]
+        cache = self._cache
+        if cache is not None and cache[0] is polygons and cache[1] == shape:
+            return cache[2], cache[3]
+        height, width = shape
+        pixel_polygons = [
+            np.array([[int(x * width), int(y * height)] for x, y in polygon], dtype=np.int32)
+            for polygon in polygons
+        ]
+        regions = self._merge_regions([self._region(p, width, height) for p in pixel_polygons])
+        self._cache = (polygons, shape, pixel_polygons, regions)
+        return pixel_polygons, regions
+
+    def _region(self, pixel_polygon, width, height):
+        x, y, w, h = cv2.boundingRect(pixel_polygon)
+        pad_x, pad_y = int(width * self.padding), int(height * self.padding)
+        return (max(0, x - pad_x), max(0, y - pad_y), min(width, x + w + pad_x), min(height, y + h + pad_y))
+
+    def _merge_regions(self, regions):
+        # 겹치는 영역은 하나로 합쳐 같은 픽셀을 두 번 추론하지 않도록 합니다.
+        merged = []
+        for region in sorted(regions):
+            if merged:
+                last = merged[-1]
+                if region[0] <= last[2] and region[1] <= last[3] and region[3] >= last[1]:
+                    merged[-1] = (min(last[0], region[0]), min(last[1], region[1]),
+                                  max(last[2], region[2]), max(last[3], region[3]))
+                    continue
+            merged.append(region)
+        return merged
+
+    def crops(self, frame):
+        """
+        탐지할 잘라낸 이미지 목록을 반환합니다.
+        frame: 원본 프레임 (BGR)
+        return: [(crop, (offset_x, offset_y)), ...] - ROI가 없으면 [(frame, (0, 0))]
+        """
+        if self.is_full_frame:
+            return [(frame, (0, 0))]
+        _, regions = self._pixel_polygons(frame.shape)
+        return [
+            (np.ascontiguousarray(frame[y1:y2, x1:x2]), (x1, y1))
+            for x1, y1, x2, y2 in regions
+        ]
+
+    def to_full_frame(self, boxes, offset, frame_shape):
+        """
+        잘라낸 이미지 기준 박스를 전체 프레임 좌표로 옮기고, ROI 밖의 박스는 제거합니다.
+        boxes: CameraManager.extract_boxes() 결과 리스트
+        offset: crops()가 반환한 (offset_x, offset_y)
+        frame_shape: 원본 프레임 shape
+        return: 전체 프레임 좌표의 박스 리스트
+        """
+        offset_x, offset_y = offset
+        mapped = []
+        for box_info in boxes:
+            x1, y1, x2, y2 = box_info['coords']
+            full = dict(box_info)
+            full['coords'] = (x1 + offset_x, y1 + offset_y, x2 + offset_x, y2 + offset_y)
+            if self.contains_box(full['coords'], frame_shape):
+                mapped.append(full)
+        return mapped
+
+    def contains_box(self, coords, frame_shape):
+        """
+        박스가 ROI 안에 있는지 확인합니다 (중심점 또는 아래쪽 중앙점 기준 - 동물의 발 위치)
+        """
+        if self.is_full_frame:
+            return True
+        pixel_polygons, _ = self._pixel_polygons(frame_shape)
+        x1, y1, x2, y2 = coords
+        center_x = (x1 + x2) / 2.0
+        points = [(center_x, (y1 + y2) / 2.0), (center_x, float(y2))]
+        for polygon in pixel_polygons:
+            for point in points:
+                if cv2.pointPolygonTest(polygon, point, False) >= 0:
+                    return True
+        return False
+
+    def draw(self, frame, color=(0, 255, 255)):
+        """ROI 다각형 외곽선을 프레임에 그립니다 (얇은 노란색 선)"""
+        if self.is_full_frame:
+            return
+        pixel_polygons, _ = self._pixel_polygons(frame.shape)
+        cv2.polylines(frame, pixel_polygons, True, color, 1)
+
+    def to_dict(self):
+        return {"polygons": [[list(point) for point in polygon] for polygon in self.polygons]}
@@ -0,0 +1,134 @@
+# /home/pi/autocarz/src/detection/tracker.py
+# 탐지가 없는 프레임 사이를 이어주는 경량 IoU 다중 객체 추적기
+
+import itertools
+import threading
+
+def iou(a, b):
+    """두 박스 (x1, y1, x2, y2)의 IoU"""
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+class Track:
+    def __init__(self, track_id, box_info, timestamp):
+        self.track_id = track_id
+        self.state = [float(v) for v in box_info['coords']]
+        self.velocity = [0.0, 0.0, 0.0, 0.0]  # 좌표별 속도 (픽셀/초)
+        self.class_name = box_info['class_name']
+        self.conf = box_info['conf']
+        self.last_update = timestamp
+        self.hits = 1
+        self.misses = 0
+
+    def predict(self, timestamp, max_predict_time):
+        # 마지막 갱신 이후 너무 오래 지나면 더 이상 외삽하지 않고 그 위치에 멈춥니다.
+        dt = min(max(0.0, timestamp - self.last_update), max_predict_time)
+        return [s + v * dt for s, v in zip(self.state, self.velocity)]
+
+class IouTracker:
+    def __init__(self, iou_threshold=0.2, max_age=2.0, max_predict_time=1.0, max_misses=2, alpha=0.6, beta=0.3):
+        """
+        IoU 매칭 + 등속(알파-베타 필터) 예측 추적기
+        iou_threshold: 같은 객체로 매칭할 최소 IoU (예측 위치 기준)
+        max_age: 이 시간(초) 동안 매칭되지 않은 트랙은 삭제
+        max_predict_time: 마지막 탐지 이후 위치를 외삽하는 최대 시간(초)
+        max_misses: 연속으로 이 횟수만큼 탐지에서 빠지면 트랙 삭제 (화면을 벗어난 객체)
+        alpha: 위치 보정 비율 (1에 가까울수록 탐지 결과를 그대로 따름)
+        beta: 속도 보정 비율
+        - 탐지 프레임에서는 update(), 그 사이 프레임에서는 predict()로 현재 위치를 얻습니다.
+        - 트랙 ID는 객체가 화면에 있는 동안 유지됩니다.
+        """
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.max_predict_time = max_predict_time
+        self.max_misses = max_misses
+        self.alpha = alpha
+        self.beta = beta
+
+        self._lock = threading.Lock()
+        self._tracks = []
+        self._ids = itertools.count(1)
+
+    def update(self, boxes, timestamp):
+        """
+        새 탐지 결과로 트랙을 갱신합니다 (추론 워커 스레드에서 호출)
+        boxes: CameraManager.extract_boxes() 형식의 박스 리스트
+        timestamp: 탐지한 프레임의 캡처 시각
+        return: 박스별 트랙 ID 리스트 (boxes와 같은 순서)
+        """
+        track_ids = [None] * len(boxes)
+        with self._lock:
+            predicted = [track.predict(timestamp, self.max_predict_time) for track in self._tracks]
+
+            # IoU가 큰 쌍부터 같은 클래스끼리 탐욕적으로 매칭합니다 (객체 수가 적어 충분히 빠름)
+            pairs = []
+            for t, pred in enumerate(predicted):
+                for d, box_info in enumerate(boxes):
+                    if self._tracks[t].class_name != box_info['class_name']:
+                        continue
+                    score = iou(pred, box_info['coords'])
+                    if score >= self.iou_threshold:
+                        pairs.append((score, t, d))
+            pairs.sort(reverse=True)
+
+            matched_tracks, matched_boxes = set(), set()
+            for score, t, d in pairs:
+                if t in matched_tracks or d in matched_boxes:
+                    continue
+                matched_tracks.add(t)
+                matched_boxes.add(d)
+                self._correct(self._tracks[t], predicted[t], boxes[d], timestamp)
+                track_ids[d] = self._tracks[t].track_id
+
+            # 매칭되지 않은 트랙은 놓친 횟수를 늘리고, 매칭되지 않은 탐지는 새 트랙으로 추가합니다.
+            for t, track in enumerate(self._tracks):
+                if t not in matched_tracks:
+                    track.misses += 1
+            for d, box_info in enumerate(boxes):
+                if d not in matched_boxes:
+                    track = Track(next(self._ids), box_info, timestamp)
+                    self._tracks.append(track)
+                    track_ids[d] = track.track_id
+            self._tracks = [
+                track for track in self._tracks
+                if track.misses < self.max_misses and timestamp - track.last_update <= self.max_age
+            ]
+        return track_ids
+
+    def _correct(self, track, predicted, box_info, timestamp):
+        dt = timestamp - track.last_update
+        measured = [float(v) for v in box_info['coords']]
+        residual = [m - p for m, p in zip(measured, predicted)]
+        track.state = [p + self.alpha * r for p, r in zip(predicted, residual)]
+        if dt > 0:
+            track.velocity = [v + self.beta * r / dt for v, r in zip(track.velocity, residual)]
+        track.conf = box_info['conf']
+        track.last_update = timestamp
+        track.hits += 1
+        track.misses = 0
+
+    def predict(self, timestamp):
+        """
+        지금 시각의 예측 박스 목록을 반환합니다 (캡처 스레드에서 그리기용으로 호출)
+        return: [{'coords', 'conf', 'class_name', 'track_id'}, ...]
+        """
+        with self._lock:
+            results = []
+            for track in self._tracks:
+                if timestamp - track.last_update > self.max_age:
+                    continue
+                x1, y1, x2, y2 = track.predict(timestamp, self.max_predict_time)
+                results.append({
+                    'coords': (int(x1), int(y1), int(x2), int(y2)),
+                    'conf': track.conf,
+                    'class_name': track.class_name,
+                    'track_id': track.track_id
+                })
+            return results
+
+    def reset(self):
+        with self._lock:
+            self._tracks = []
@@ -1,16 +1,25 @@
 # /home/pi/autocarz/src/detection/yolo_detector.py
 # YOLO v8 기반 객체 인식 담당
 
-from ultralytics import YOLO
+import time
+from detection.model_registry import model_registry
+from detection.batch_scheduler import BatchInferenceScheduler
+from utils.metrics import stage_seconds
+
+# /metrics 단계별 시간 (YoloDetector.detect)
+_detect_seconds = stage_seconds.labels('yolo_detect')
 
 class YoloDetector:
     def __init__(self, model_path):
         """
         YOLO 모델을 불러와 초기화합니다.
         model_path: 학습된 모델 파일 경로 (예: models/best.pt)
+        - 모델은 model_registry를 통해 공유되므로 같은 파일은 한 번만 로드됩니다.
         """
+        self.model_path = model_path
+        self.scheduler = None
         try:
-            self.model = YOLO(model_path)
+            self.model = model_registry.get_model(model_path)
             print("[YOLO] 모델 로드 성공!")
         except Exception as e:
             print(f"[YOLO] 모델 로드 실패: {e}")
@@ -23,5 +32,28 @@ class YoloDetector:
         return: YOLO 탐지 결과 객체 또는 None
         """
         if self.model:
-            return self.model(frame, verbose=False)
-        return None 
\ No newline at end of file
+            start = time.perf_counter()
+            try:
+                if self.scheduler is not None:
+                    return self.scheduler.detect(frame)
+                return model_registry.predict(self.model_path, frame)
+            finally:
+                _detect_seconds.observe(time.perf_counter() - start)
+        return None
+
+    def enable_batching(self, expected_batch_fn=None, batch_window=0.02, max_batch_size=4):
+        """
+        여러 카메라의 detect() 호출을 모아 배치로 추론하도록 설정합니다.
+        expected_batch_fn: 현재 활성 카메라 수를 반환하는 함수
+        batch_window: 다른 카메라 요청을 기다리는 최대 시간(초)
+        max_batch_size: 한 배치의 최대 프레임 수
+        """
+        if self.model is None:
+            return
+        self.scheduler = BatchInferenceScheduler(
+            self.model_path,
+            batch_window=batch_window,
+            max_batch_size=max_batch_size,
+            expected_batch_fn=expected_batch_fn
+        )
+        print(f"[YOLO] 카메라 간 배치 추론 활성화 (대기 창 {batch_window * 1000:.0f}ms, 최대 {max_batch_size}장)") 
\ No newline at end of file
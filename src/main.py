@@ -3,13 +3,26 @@
 
 import os
 import sys
-import cv2
-import platform
-import time
+import argparse
+import signal
+import threading
 from datetime import datetime
 from flask import Flask, render_template, jsonify, request, Response
 # camera_manager는 별도의 파일에 정의되어 있다고 가정합니다.
+from utils.startup_timer import startup_timer
 from camera.camera_manager import camera_manager
+from camera.camera_discovery import camera_discovery
+from camera.stream_profile import parse_stream_profile
+from camera.stream_clients import stream_clients
+from routes.status_routes import status_bp
+from routes.settings_routes import settings_bp
+from routes.stream_routes import stream_bp, register_websocket_routes
+from routes.detection_routes import detections_bp
+from utils.event_store import event_store
+from utils.settings_manager import settings_store, load_config
+from utils.system_monitor import system_monitor
+from utils.event_bus import event_bus
+from routes.event_routes import events_bp
 
 # --- 카메라 정보 ---
 USB_CAMERA_NAME = "SC-FD110B PC Camera"
@@ -32,32 +45,37 @@ logger = SimpleLogger()
 # --- 카메라 제어 함수들 ---
 
 def find_available_camera_indices():
-    """시스템에 연결된 모든 사용 가능한 카메라의 인덱스 목록을 찾는 함수"""
+    """시스템에 연결된 모든 사용 가능한 카메라의 인덱스 목록을 찾는 함수 (병렬 탐색 + 성능 캐시)"""
     logger.log("INFO", "사용 가능한 카메라 탐색 시작...")
-    available_indices = []
-    for i in range(10):
-        try:
-            if platform.system().lower() == "windows":
-                cap = cv2.VideoCapture(i, cv2.CAP_DSHOW)
-            else:
-                cap = cv2.VideoCapture(i)
-            
-            if cap.isOpened():
-                available_indices.append(i)
-                cap.release()
-        except Exception:
-            continue
-    
+    available_indices = camera_discovery.discover()
     logger.log("INFO", f"사용 가능한 카메라 인덱스 목록: {available_indices}")
     return available_indices
 
-def start_camera_streaming(camera_index):
-    """지정된 인덱스의 카메라로 스트리밍을 '시작'하고 성공 여부를 반환하는 함수."""
-    logger.log("INFO", f"카메라 스트리밍 시작 시도 (대상 인덱스: {camera_index})")
+def on_cameras_changed(added, removed):
+    """핫플러그 감지 콜백 - 분리된 카메라의 파이프라인을 정리합니다."""
+    for index in removed:
+        if camera_manager.get_pipeline(index) is not None:
+            logger.log("WARNING", f"카메라 {index} 연결 해제 - 스트리밍을 정지합니다.")
+            camera_manager.stop_camera(index)
+    for index in added:
+        logger.log("INFO", f"새 카메라 {index} 연결됨 - /start_camera 로 시작할 수 있습니다.")
+    event_bus.publish('cameras', {
+        "available_cameras": camera_discovery.available_indices(),
+        "added": sorted(added),
+        "removed": sorted(removed)
+    }, retain=True)
+
+def start_camera_streaming(camera_index, source=None, pinned=False):
+    """
+    지정된 인덱스의 카메라로 스트리밍을 '시작'하고 성공 여부를 반환하는 함수.
+    source: USB 카메라 대신 사용할 프레임 소스 설정 (예: "synthetic", "video:../videos/a.mp4")
+    pinned: True면 /switch_camera로 메인 카메라를 바꿔도 정지하지 않음 (--cameras/--source로 지정한 카메라)
+    """
+    logger.log("INFO", f"카메라 스트리밍 시작 시도 (대상 인덱스: {camera_index}, 소스: {source or 'usb'})")
     try:
-        if camera_manager.start_camera(camera_index):
+        if camera_manager.start_camera(camera_index, source=source, pinned=pinned):
             logger.log("SUCCESS", f"✅ 카메라 {camera_index} 스트리밍 시작 성공!")
-            time.sleep(2) # 카메라 안정화 시간
+            # 안정화 대기(sleep) 없이 바로 진행 - 캡처 스레드가 첫 프레임이 나올 때까지 알아서 기다립니다.
             return True
         else:
             logger.log("ERROR", f"❌ 카메라 {camera_index} 스트리밍 시작 실패.")
@@ -66,17 +84,48 @@ def start_camera_streaming(camera_index):
         logger.log("ERROR", f"카메라 시작 중 예외 발생", e)
         return False
 
+def report_startup_when_ready():
+    """첫 프레임과 모델 준비가 모두 끝나면 시작 단계별 소요 시간을 출력하는 함수 (백그라운드)"""
+    pipeline = camera_manager.get_pipeline()
+    if pipeline is not None:
+        seq = 0
+        while seq == 0:
+            seq, _ = pipeline.broadcaster.wait_for_frame(0, timeout=1.0)
+        startup_timer.mark("첫 프레임")
+    camera_manager.models_ready.wait()
+    startup_timer.mark("첫 프레임 + 모델 준비 완료")
+    startup_timer.report()
+
 # --- Flask 앱 설정 ---
 
-# [수정] create_app 함수가 카메라 목록을 인자로 받도록 변경
-def create_app(available_cameras):
-    """Flask 앱을 생성하고 라우트를 설정하는 함수"""
+def create_app(debug=False, websocket=True):
+    """
+    Flask 앱을 생성하고 라우트를 설정하는 함수 (카메라 목록은 camera_discovery가 최신 상태로 유지)
+    debug: Flask 디버그 모드 (개발 서버 --dev에서만 사용)
+    websocket: WebSocket 스트림(/ws/video_feed) 등록 여부 - waitress는 WebSocket 업그레이드를 지원하지 않으므로 False
+    """
     app = Flask(
         __name__,
         template_folder=os.path.join(project_root, 'templates'),
         static_folder=os.path.join(project_root, 'static')
     )
-    app.config['DEBUG'] = True
+    app.config['DEBUG'] = debug
+
+    # 상태 API (/status) - 검출 간격 자동 조절 상태 등을 제공합니다.
+    app.register_blueprint(status_bp)
+    # 설정 API (검출 설정, 카메라별 ROI 등)
+    app.register_blueprint(settings_bp)
+    # 스트림 시청자 목록(/stream_clients)과 선택 기능인 WebSocket 스트림(/ws/video_feed)
+    app.register_blueprint(stream_bp)
+    if websocket:
+        register_websocket_routes(app)
+    else:
+        print("⚠️ waitress는 WebSocket 연결을 지원하지 않아 /ws/video_feed를 비활성화합니다. "
+              "(MJPEG /video_feed는 그대로 사용 가능 - WebSocket이 필요하면 [SERVER] WSGI_SERVER = werkzeug)")
+    # 탐지 이력 조회 API (/detections, /detections/summary)
+    app.register_blueprint(detections_bp)
+    # 실시간 상태/탐지 푸시 (/events, Server-Sent Events)
+    app.register_blueprint(events_bp)
     
     @app.route('/')
     def index():
@@ -87,44 +136,167 @@ def create_app(available_cameras):
         
         context = {
             "camera_info": { "name": f"Camera {current_camera_index}", "index": current_camera_index },
-            "detection_settings": { "resolution": "1280x720", "yolo_enabled": True, "opencv_enabled": True, "show_fps": True, "quality": 85, "fps_limit": 30 },
-            "flip_settings": { "horizontal": False, "vertical": False, "rotation": 0 },
+            "detection_settings": {
+                **settings_store.get_section('detection'),
+                "resolution": f"{camera_manager.target_width}x{camera_manager.target_height}",
+                "fps_limit": camera_manager.target_fps
+            },
+            "flip_settings": settings_store.get_section('flip'),
             "color_correction_settings": { "enabled": False, "red_reduction": 1.0, "green_boost": 1.0, "blue_boost": 1.0, "mode": "standard" },
-            "available_cameras": available_cameras, # [수정] 인자로 받은 카메라 목록을 사용
+            "available_cameras": camera_discovery.available_indices(),
             "yolo_status": "준비됨",
             "opencv_status": "준비됨"
         }
         
         return render_template('yolo_opencv.html', **context)
 
+    def parse_profile_or_error():
+        """쿼리 파라미터(?scale=&quality=&fps= 또는 ?profile=lte)로 스트림 프로필을 만듭니다."""
+        try:
+            return parse_stream_profile(request.args), None
+        except ValueError as e:
+            return None, (jsonify({"success": False, "message": f"잘못된 스트림 프로필: {e}"}), 400)
+
+    def stream_response(camera_index, profile):
+        """
+        시청자를 등록하고 MJPEG 응답을 만듭니다.
+        - 동시 시청자 수 제한(config.ini [SERVER] MAX_STREAM_CLIENTS)을 넘으면 503을 반환합니다.
+        - 스트림이 시작되기 전에 연결이 끊겨도 응답이 닫힐 때 등록을 해제합니다.
+        """
+        client = stream_clients.register(camera_index, profile, 'mjpeg', request.remote_addr)
+        if client is None:
+            return jsonify({
+                "success": False,
+                "message": f"동시 시청자 수 제한({stream_clients.max_clients}명)을 초과했습니다"
+            }), 503
+        response = Response(camera_manager.generate_frames(camera_index, profile=profile, client=client),
+                            mimetype='multipart/x-mixed-replace; boundary=frame')
+        response.call_on_close(lambda: stream_clients.unregister(client))
+        return response
+
     @app.route('/video_feed')
     def video_feed():
-        """비디오 스트림을 제공하는 엔드포인트"""
-        return Response(camera_manager.generate_frames(),
-                       mimetype='multipart/x-mixed-replace; boundary=frame')
+        """비디오 스트림을 제공하는 엔드포인트 (메인 카메라, 시청자별 해상도/품질/FPS 지정 가능)"""
+        profile, error = parse_profile_or_error()
+        if error:
+            return error
+        return stream_response(None, profile)
+
+    @app.route('/video_feed/<int:camera_index>')
+    def video_feed_camera(camera_index):
+        """지정한 카메라의 비디오 스트림을 제공하는 엔드포인트 (전방/후방 동시 시청용)"""
+        if camera_manager.get_pipeline(camera_index) is None:
+            return jsonify({
+                "success": False,
+                "message": f"카메라 {camera_index}가 실행 중이 아닙니다"
+            }), 404
+        profile, error = parse_profile_or_error()
+        if error:
+            return error
+        return stream_response(camera_index, profile)
 
     @app.route('/get_current_camera')
     def get_current_camera():
         """현재 카메라 정보를 반환하는 API"""
-        current_camera_index = camera_manager.camera_index if camera_manager.camera_index is not None else -1
         return jsonify({
-            "camera_index": current_camera_index,
-            "camera_name": f"Camera {current_camera_index}",
-            "is_running": camera_manager.is_running,
-            "available_cameras": available_cameras
+            **camera_manager.camera_state(),
+            "success": True,
+            "available_cameras": camera_discovery.available_indices()
         })
 
+    @app.route('/detect_cameras')
+    def detect_cameras():
+        """연결된 카메라 목록과 성능 정보를 반환하는 API (카메라를 열지 않고 캐시된 정보를 사용)"""
+        running = camera_manager.running_indices()
+        devices = []
+        for device in camera_discovery.get_devices():
+            width, height = device.get('default_resolution') or (0, 0)
+            devices.append({
+                **device,
+                "name": device.get('name') or f"Camera {device['index']}",
+                "resolution": f"{width}x{height}",
+                "in_use": device['index'] in running
+            })
+        return jsonify({
+            "available_cameras": devices,
+            "total_count": len(devices)
+        })
+
+    @app.route('/start_camera', methods=['POST'])
+    def start_camera():
+        """다른 카메라를 정지하지 않고 카메라를 추가로 시작하는 API"""
+        try:
+            data = request.get_json()
+            camera_index = data.get('camera_index', 0)
+
+            logger.log("INFO", f"카메라 추가 시작 요청: {camera_index}")
+
+            if camera_index not in camera_discovery.available_indices():
+                return jsonify({
+                    "success": False,
+                    "message": f"카메라 {camera_index}를 찾을 수 없습니다"
+                }), 404
+
+            # 메인 화면 카메라는 바꾸지 않고 파이프라인만 추가합니다.
+            main_index = camera_manager.camera_index
+            if not camera_manager.start_camera(camera_index, pinned=True):
+                return jsonify({
+                    "success": False,
+                    "message": f"카메라 {camera_index} 시작 실패"
+                }), 500
+            # 기존 메인 카메라가 없었다면 새로 시작한 카메라가 메인 카메라로 남습니다.
+            camera_manager.set_main_camera(main_index)
+
+            return jsonify({
+                "success": True,
+                "message": f"카메라 {camera_index} 시작 성공",
+                "camera_index": camera_index,
+                "running_cameras": camera_manager.running_indices()
+            })
+        except Exception as e:
+            logger.log("ERROR", f"카메라 시작 중 오류 발생", e)
+            return jsonify({
+                "success": False,
+                "message": f"카메라 시작 중 오류: {str(e)}"
+            }), 500
+
+    @app.route('/stop_camera', methods=['POST'])
+    def stop_camera():
+        """지정한 카메라 하나만 정지하는 API"""
+        try:
+            data = request.get_json()
+            camera_index = data.get('camera_index')
+            if camera_index is None:
+                return jsonify({
+                    "success": False,
+                    "message": "camera_index가 필요합니다"
+                }), 400
+
+            logger.log("INFO", f"카메라 정지 요청: {camera_index}")
+            camera_manager.stop_camera(camera_index)
+            return jsonify({
+                "success": True,
+                "message": f"카메라 {camera_index} 정지 완료",
+                "running_cameras": camera_manager.running_indices()
+            })
+        except Exception as e:
+            logger.log("ERROR", f"카메라 정지 중 오류 발생", e)
+            return jsonify({
+                "success": False,
+                "message": f"카메라 정지 중 오류: {str(e)}"
+            }), 500
+
     @app.route('/switch_camera', methods=['POST'])
     def switch_camera():
-        """카메라를 전환하는 API"""
+        """카메라를 전환하는 API (이전 메인 카메라는 /start_camera로 추가한 카메라가 아니면 정지)"""
         try:
             data = request.get_json()
             new_camera_index = data.get('camera_index', 0)
             
             logger.log("INFO", f"카메라 전환 요청: {new_camera_index}")
             
-            if new_camera_index in available_cameras:
-                if camera_manager.start_camera(new_camera_index):
+            if new_camera_index in camera_discovery.available_indices():
+                if camera_manager.switch_camera(new_camera_index):
                     return jsonify({
                         "success": True,
                         "message": f"카메라 {new_camera_index}로 전환 성공",
@@ -156,15 +328,121 @@ def create_app(available_cameras):
     return app
 
 
+# --- 서버 실행/종료 ---
+
+def shutdown_services():
+    """카메라를 해제하고 백그라운드 작업을 정리합니다 (진행 중인 클립과 탐지 이력은 마저 저장)"""
+    print("\n🧹 종료 중: 카메라와 백그라운드 작업을 정리합니다...")
+    camera_discovery.stop_monitor()
+    camera_manager.stop_camera()
+    event_store.stop()
+    system_monitor.stop()
+    print("👋 서버가 정상 종료되었습니다.")
+
+def _raise_keyboard_interrupt(signum, frame):
+    # SIGTERM(systemctl stop 등)도 Ctrl+C와 같은 정상 종료 경로를 타게 합니다.
+    raise KeyboardInterrupt
+
+def use_waitress(server_config):
+    """
+    운영 서버로 waitress를 쓸지 결정합니다.
+    - [SERVER] WSGI_SERVER = waitress(기본)이고 waitress가 설치되어 있을 때만 True
+    - werkzeug를 고르면 스레드/연결 수 제한은 없지만 WebSocket 스트림을 쓸 수 있습니다.
+    """
+    if server_config.get('WSGI_SERVER', fallback='waitress').lower() != 'waitress':
+        return False
+    try:
+        import waitress  # noqa: F401 - 설치 여부만 확인
+    except ImportError:
+        return False
+    return True
+
+def run_production_server(app, host, port, server_config, waitress=True):
+    """
+    운영용 서버로 앱을 실행합니다 (디버그 모드 꺼짐)
+    server_config: config.ini [SERVER] 섹션
+    waitress: True면 waitress (스레드 수/동시 연결 수 제한), False면 werkzeug 멀티스레드 서버 (use_waitress() 결과)
+    - MJPEG/SSE 연결은 끝날 때까지 작업 스레드 1개를 차지하므로
+      THREADS는 MAX_STREAM_CLIENTS + 열어 둘 대시보드(/events) 수 + API 여유분보다 커야 합니다.
+    """
+    threads = server_config.getint('THREADS', fallback=24)
+    connection_limit = server_config.getint('CONNECTION_LIMIT', fallback=100)
+    max_streams = stream_clients.max_clients
+    if max_streams and threads <= max_streams:
+        print(f"⚠️ THREADS({threads})가 MAX_STREAM_CLIENTS({max_streams})보다 작거나 같아 API 요청이 처리되지 못할 수 있습니다.")
+
+    if waitress:
+        from waitress.server import create_server
+        server = create_server(
+            app, host=host, port=port,
+            threads=threads,
+            connection_limit=connection_limit,
+            channel_timeout=server_config.getint('CHANNEL_TIMEOUT', fallback=120),
+            # 연결별 출력 버퍼를 프레임 2장 정도로 제한합니다. 기본값(16MB)이면 느린 시청자에게
+            # 몇 초 분량의 지난 프레임이 쌓이지만, 작게 두면 제너레이터가 막혀 최신 프레임만 보내고 중간 프레임은 건너뜁니다.
+            outbuf_high_watermark=server_config.getint('OUTBUF_HIGH_WATERMARK', fallback=262144),
+            ident='AutocarZ'
+        )
+        print(f"🌐 운영 서버(waitress) 시작: http://{host}:{port} (작업 스레드 {threads}, 최대 연결 {connection_limit}, 최대 스트림 {max_streams or '무제한'})")
+        try:
+            server.run()
+        finally:
+            server.close()
+    else:
+        from werkzeug.serving import make_server
+        server = make_server(host, port, app, threaded=True)
+        print(f"🌐 운영 서버(werkzeug 멀티스레드) 시작: http://{host}:{port} (최대 스트림 {max_streams or '무제한'})")
+        if server_config.get('WSGI_SERVER', fallback='waitress').lower() == 'waitress':
+            print("   💡 pip install waitress 로 설치하면 스레드/연결 수 제한이 있는 waitress를 사용합니다.")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+
 # --- 프로그램 메인 실행부 ---
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AutocarZ 서버")
+    parser.add_argument("--cameras", default="",
+                        help="동시에 실행할 카메라 인덱스 목록 (예: 0,2 - 전방/후방). 첫 번째가 메인 카메라")
+    parser.add_argument("--source", action="append", default=[],
+                        help="USB 카메라 대신 사용할 프레임 소스 (여러 번 지정 가능, 순서대로 인덱스 0, 1, ...): "
+                             "synthetic, synthetic:1280x720, video:../videos/a.mp4, images:../samples, usb:0")
+    parser.add_argument("--dev", action="store_true",
+                        help="Flask 개발 서버(디버그 모드)로 실행 - 운영 환경에서는 사용하지 마세요")
+    args = parser.parse_args()
+
+    # config.ini [SERVER] - 주소, 작업 스레드 수, 최대 연결 수
+    config = load_config()
+    if not config.has_section('SERVER'):
+        config.add_section('SERVER')
+    server_config = config['SERVER']
+    host = server_config.get('HOST', fallback='0.0.0.0')
+    port = server_config.getint('PORT', fallback=5000)
+
     print("="*40)
     print("AutocarZ 서버 시작 프로세스")
     print("="*40)
 
-    # [수정] 카메라 목록을 맨 처음에 딱 한 번만 찾아서 변수에 저장합니다.
-    available_indices = find_available_camera_indices()
+    # 모델 로딩/워밍업은 백그라운드에서 시작하고, 그동안 카메라 탐색과 열기를 진행합니다.
+    camera_manager.load_models_async()
+    # CPU/메모리/온도는 백그라운드에서 주기적으로 수집합니다 (요청 처리 중에 기다리지 않음)
+    system_monitor.start()
+
+    # 탐지 이력 저장소 (config.ini [EVENTS] ENABLED)
+    if camera_manager.events_enabled:
+        camera_manager.events_enabled = event_store.start()
+
+    # --source가 있으면 카메라 탐색 없이 지정한 소스로 실행합니다 (카메라 없는 CI/개발 PC용)
+    camera_sources = {}
+    if args.source:
+        camera_sources = dict(enumerate(args.source))
+        available_indices = list(camera_sources)
+        print(f"🎞️ 프레임 소스로 실행합니다: {camera_sources}")
+    else:
+        # [수정] 카메라 목록을 맨 처음에 딱 한 번만 찾아서 변수에 저장합니다.
+        with startup_timer.phase("카메라 탐색"):
+            available_indices = find_available_camera_indices()
     target_camera_index = -1
 
     if not available_indices:
@@ -174,15 +452,54 @@ if __name__ == "__main__":
         target_camera_index = available_indices[0]
         print(f"✅ 단일 카메라(인덱스 {target_camera_index})를 발견했습니다. 이 카메라를 사용합니다.")
     else:
-        target_camera_index = available_indices[-1]
+        # 인덱스 순서는 연결 순서에 따라 바뀌므로 sysfs의 연결 방식(USB 포트)으로 외부 웹캠을 고릅니다.
+        target_camera_index = camera_discovery.preferred_index(available_indices)
         print(f"✅ 여러 카메라({available_indices})를 발견했습니다.")
-        print(f"   ➡️ 외부 USB 웹캠으로 추정되는 마지막 인덱스({target_camera_index})의 카메라를 사용합니다.")
+        print(f"   ➡️ 외부 USB 웹캠으로 추정되는 카메라(인덱스 {target_camera_index})를 사용합니다.")
+
+    # --cameras 옵션이 있으면 지정한 카메라들을 모두 동시에 실행합니다 (첫 번째가 메인 카메라).
+    extra_camera_indices = []
+    if args.cameras:
+        requested = [int(i) for i in args.cameras.split(",") if i.strip()]
+        requested = [i for i in requested if i in available_indices]
+        if requested:
+            target_camera_index = requested[0]
+            extra_camera_indices = requested[1:]
 
-    if start_camera_streaming(target_camera_index):
-        print("\n🚀 메인 카메라 연결 및 실행 성공! 서버를 시작합니다.\n")
-        # [수정] 찾은 카메라 목록을 create_app 함수에 전달합니다.
-        app = create_app(available_indices)
-        app.run(host="0.0.0.0", port=5000, debug=True, use_reloader=False)
+    with startup_timer.phase("카메라 열기"):
+        if camera_sources:
+            target_camera_index = 0
+            extra_camera_indices = available_indices[1:]
+        # --cameras/--source로 여러 카메라를 지정했다면 모두 계속 실행되도록 고정합니다.
+        pin_cameras = bool(args.cameras or camera_sources)
+        camera_started = start_camera_streaming(target_camera_index, camera_sources.get(target_camera_index), pinned=pin_cameras)
+        if camera_started:
+            for extra_index in extra_camera_indices:
+                start_camera_streaming(extra_index, camera_sources.get(extra_index), pinned=True)
+            camera_manager.set_main_camera(target_camera_index)
+
+    if camera_started:
+        threading.Thread(target=report_startup_when_ready, name="startup-report", daemon=True).start()
+        print(f"\n🚀 카메라 {camera_manager.running_indices()} 연결 및 실행 성공! 서버를 시작합니다.\n")
+        # 카메라 연결/해제는 백그라운드에서 감지합니다 (실행 중인 카메라는 다시 열지 않음)
+        if not camera_sources:
+            camera_discovery.add_listener(on_cameras_changed)
+            camera_discovery.start_monitor(busy_fn=camera_manager.running_indices)
+        waitress = not args.dev and use_waitress(server_config)
+        with startup_timer.phase("Flask 앱 생성"):
+            app = create_app(debug=args.dev, websocket=not waitress)
+
+        signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+        try:
+            if args.dev:
+                print("⚠️ 개발 서버(디버그 모드)로 실행합니다. 운영 환경에서는 --dev 없이 실행하세요.")
+                app.run(host=host, port=port, debug=True, use_reloader=False, threaded=True)
+            else:
+                run_production_server(app, host, port, server_config, waitress=waitress)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            shutdown_services()
     else:
         print(f"\n🛑 카메라(인덱스 {target_camera_index})를 실행할 수 없어 서버를 시작하지 못했습니다.")
         print("   프로그램을 종료합니다. USB 연결을 확인하고 다시 시도해주세요.")
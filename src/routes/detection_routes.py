@@ -0,0 +1,78 @@
+# /home/pi/autocarz/src/routes/detection_routes.py
+# 탐지 이력 조회 라우트 담당 (/detections, /detections/summary)
+# 산양이 언제, 어느 카메라에서, 몇 번 탐지되었는지 SQLite 이력에서 조회합니다.
+
+from datetime import datetime
+from flask import Blueprint, jsonify, request
+from utils.event_store import event_store
+
+detections_bp = Blueprint('detections', __name__)
+
+MAX_LIMIT = 1000  # 한 번에 반환할 최대 행 수 (라즈베리파이 메모리 보호)
+
+def _parse_time(value):
+    """epoch 초(예: 1718000000) 또는 ISO 시각(예: 2024-06-10T09:00:00)을 epoch 초로 변환"""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+def _parse_filters(args):
+    """
+    쿼리 파라미터를 저장소 필터로 변환합니다.
+    start, end: 조회 구간 (epoch 초 또는 ISO 시각, end는 포함하지 않음)
+    class: 클래스 이름 (쉼표로 여러 개)
+    camera, source(yolo/opencv), min_conf: 추가 조건
+    """
+    camera = args.get("camera")
+    min_conf = args.get("min_conf")
+    return {
+        "start": _parse_time(args.get("start")),
+        "end": _parse_time(args.get("end")),
+        "class_name": args.get("class") or None,
+        "camera": int(camera) if camera not in (None, "") else None,
+        "source": args.get("source") or None,
+        "min_conf": float(min_conf) if min_conf not in (None, "") else None
+    }
+
+@detections_bp.route("/detections")
+def get_detections():
+    """
+    탐지 이력 조회 라우트 (최신순, 페이지 단위)
+    예: /detections?class=goat&start=2024-06-10T00:00:00&limit=100
+    - next_offset으로 다음 페이지를 요청합니다 (마지막 페이지면 null).
+    """
+    try:
+        filters = _parse_filters(request.args)
+        limit = min(max(int(request.args.get("limit", 100)), 1), MAX_LIMIT)
+        offset = max(int(request.args.get("offset", 0)), 0)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": f"잘못된 조회 조건: {e}"}), 400
+
+    if not event_store.is_running:
+        return jsonify({"status": "error", "message": "탐지 이력 저장소가 꺼져 있습니다"}), 503
+
+    result = event_store.query(limit=limit, offset=offset, **filters)
+    next_offset = offset + len(result["items"])
+    result["limit"] = limit
+    result["offset"] = offset
+    result["next_offset"] = next_offset if next_offset < result["total"] else None
+    return jsonify(result)
+
+@detections_bp.route("/detections/summary")
+def get_detections_summary():
+    """
+    클래스별 탐지 수 요약 라우트 (/detections와 같은 필터 사용)
+    - tracks: 서로 다른 추적 ID 수 (같은 개체가 여러 프레임에 걸쳐 잡힌 것을 한 번으로 셈)
+    """
+    try:
+        filters = _parse_filters(request.args)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": f"잘못된 조회 조건: {e}"}), 400
+
+    if not event_store.is_running:
+        return jsonify({"status": "error", "message": "탐지 이력 저장소가 꺼져 있습니다"}), 503
+
+    return jsonify({"classes": event_store.summary(**filters)})
@@ -0,0 +1,45 @@
+# /home/pi/autocarz/src/routes/event_routes.py
+# 실시간 이벤트 스트림 라우트 담당 (/events, Server-Sent Events)
+# 대시보드가 /status를 주기적으로 요청하지 않아도 변경 사항을 바로 받습니다.
+
+from flask import Blueprint, Response, stream_with_context
+from utils.event_bus import event_bus, format_sse
+from routes.status_routes import get_status
+
+events_bp = Blueprint('events', __name__)
+
+KEEPALIVE_INTERVAL = 15.0   # 이벤트가 없을 때 연결 유지용 주석을 보내는 간격(초)
+RETRY_MS = 3000             # 연결이 끊기면 브라우저가 다시 연결하기까지 기다릴 시간(ms)
+
+@events_bp.route("/events")
+def events():
+    """
+    Server-Sent Events 스트림 라우트
+    - 접속 직후: status(전체 상태 1회), camera/cameras/system(마지막 상태)
+    - 이후: camera(메인 카메라/실행 중인 카메라 변경), cameras(핫플러그), detection(탐지 결과), system(2초마다)
+    - 이벤트가 없으면 15초마다 주석 줄을 보내 끊긴 연결을 정리합니다.
+    """
+    subscription = event_bus.subscribe()
+
+    def generate():
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            yield format_sse(0, 'status', get_status())
+            while True:
+                event = subscription.get(timeout=KEEPALIVE_INTERVAL)
+                if event is None:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(*event)
+        finally:
+            subscription.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            # 프록시(nginx)가 이벤트를 모아서 보내지 않도록 합니다.
+            'X-Accel-Buffering': 'no'
+        }
+    )
@@ -3,14 +3,33 @@
 # 프론트엔드에서 설정 변경 요청을 받아 처리
 
 from flask import Blueprint, request, jsonify
-from utils.settings_manager import save_flip_settings, save_detection_settings
+from utils.settings_manager import save_flip_settings, save_detection_settings, settings_store
+from camera.camera_manager import camera_manager
 
 settings_bp = Blueprint('settings', __name__)
 
+@settings_bp.route("/settings", methods=["GET"])
+def get_settings():
+    """
+    현재 적용 중인 설정 조회 라우트 (config.ini 기본값 + 화면에서 저장한 값)
+    """
+    return jsonify({
+        "success": True,
+        "detection": settings_store.get_section('detection'),
+        "flip": settings_store.get_section('flip'),
+        "camera": {
+            "width": camera_manager.target_width,
+            "height": camera_manager.target_height,
+            "fps": camera_manager.target_fps
+        }
+    })
+
 @settings_bp.route("/update_settings", methods=["POST"])
+@settings_bp.route("/update_flip_settings", methods=["POST"])
 def update_settings():
     """
     카메라 반전/회전 등 설정 변경 라우트
+    - 프론트엔드(applySettings)는 /update_flip_settings로 요청합니다.
     - 프론트엔드에서 JSON으로 설정값 전달
     - 성공/실패 여부와 메시지 반환
     """
@@ -25,6 +44,7 @@ def update_settings():
 def update_detection_settings():
     """
     AI(객체 인식) 관련 설정 변경 라우트
+    - confidence/iou/imgsz는 모델을 다시 로드하지 않고 다음 추론부터, resolution은 카메라 소스만 다시 열어 적용합니다.
     - 프론트엔드에서 JSON으로 설정값 전달
     - 성공/실패 여부와 메시지 반환
     """
@@ -33,4 +53,30 @@ def update_detection_settings():
         result = save_detection_settings(data)
         return jsonify(result)
     except Exception as e:
-        return jsonify({"success": False, "message": f"검출 설정 적용 실패: {str(e)}"}) 
\ No newline at end of file
+        return jsonify({"success": False, "message": f"검출 설정 적용 실패: {str(e)}"})
+
+@settings_bp.route("/roi/<int:camera_index>", methods=["GET"])
+def get_roi(camera_index):
+    """
+    카메라별 관심 영역(ROI) 조회 라우트
+    - 좌표는 0~1 정규화 값 (해상도와 무관)
+    """
+    roi = camera_manager.get_roi(camera_index)
+    return jsonify({"success": True, "camera_index": camera_index, **roi.to_dict()})
+
+@settings_bp.route("/roi/<int:camera_index>", methods=["POST"])
+def update_roi(camera_index):
+    """
+    카메라별 관심 영역(ROI) 변경 라우트
+    - 프론트엔드에서 {"polygons": [[[x, y], ...], ...]} 형태로 전달 (0~1 정규화 좌표)
+    - 빈 리스트를 보내면 전체 프레임 탐지로 돌아갑니다.
+    - settings.json에 저장되어 재시작 후에도 유지됩니다.
+    """
+    try:
+        data = request.get_json() or {}
+        roi = camera_manager.set_roi(camera_index, data.get("polygons", []))
+        return jsonify({"success": True, "message": f"카메라 {camera_index} ROI 저장 및 적용 완료", "camera_index": camera_index, **roi.to_dict()})
+    except (TypeError, ValueError) as e:
+        return jsonify({"success": False, "message": f"잘못된 ROI 값: {str(e)}"}), 400
+    except Exception as e:
+        return jsonify({"success": False, "message": f"ROI 적용 실패: {str(e)}"})
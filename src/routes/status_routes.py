@@ -2,8 +2,14 @@
 # 시스템 상태 확인 라우트 담당
 # 현재 카메라/AI/설정 등 시스템 상태를 JSON으로 반환
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, Response, request
 from camera.camera_manager import camera_manager
+from camera.stream_clients import stream_clients
+from utils.startup_timer import startup_timer
+from utils.metrics import metrics
+from utils.event_store import event_store
+from utils.system_monitor import system_monitor
+from utils.event_bus import event_bus
 import platform
 from datetime import datetime
 
@@ -17,10 +23,75 @@ def get_status():
         "camera_connected": camera_manager.is_running and camera_manager.cap is not None,
         "streaming": camera_manager.is_running,
         "camera_index": camera_manager.camera_index,
+        "running_cameras": camera_manager.running_indices(),
         "os_type": platform.system().lower(),
         "last_checked": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "available_cameras": []  # 간단하게 빈 배열로 설정
     }
+
+    # 모델 준비 여부와 시작 단계별 소요 시간
+    status["models_ready"] = camera_manager.models_ready.is_set()
+    status["startup"] = startup_timer.as_dict()
+
+    # 추론 백엔드와 시작 시 비교 결과
+    status["inference_backend"] = {
+        "backend": camera_manager.backend,
+        "model_path": camera_manager.model_path,
+        "startup_check": camera_manager.backend_report
+    }
+
+    # 검출 간격 자동 조절 상태 (현재 간격, 평균 지연 시간, 조정 사유)
+    status["detection_control"] = camera_manager.interval_controller.get_state()
+
+    # 카메라별 프레임 소스 (usb / video / images / synthetic)
+    status["camera_sources"] = {
+        str(index): pipeline.source.describe()
+        for index, pipeline in list(camera_manager.pipelines.items())
+    }
+
+    # 탐지 이력 저장소 (대기열 길이, 기록/버린 행 수, 마지막 일괄 쓰기 시간)
+    status["event_store"] = event_store.get_stats()
+
+    # 카메라별 탐지 클립 녹화 상태 (사전 버퍼 메모리, 저장한 클립 수)
+    status["clip_recorder"] = {
+        str(index): pipeline.clip_recorder.get_stats()
+        for index, pipeline in list(camera_manager.pipelines.items())
+    }
+
+    # 카메라별 움직임 게이트 통계 (건너뛴 추론 횟수 등)
+    status["motion_gate"] = {
+        str(index): pipeline.motion_gate.get_stats()
+        for index, pipeline in list(camera_manager.pipelines.items())
+    }
+
+    # 카메라별 스트림 프로필(배율@품질)별 JPEG 인코딩 횟수 - 프로필당 프레임 1번만 인코딩되는지 확인용
+    # (MJPEG 패스스루 중에는 재인코딩 없이 보낸 프레임이 "passthrough"로 집계됨)
+    status["stream_encoding"] = {
+        str(index): {
+            "subscribers": pipeline.broadcaster.subscriber_count,
+            "frames": pipeline.broadcaster.seq,
+            "mjpeg_passthrough": pipeline.source.passthrough,
+            "encodes": dict(pipeline.broadcaster.encode_counts)
+        }
+        for index, pipeline in list(camera_manager.pipelines.items())
+    }
+
+    # 연결된 스트림 시청자 수 (클라이언트별 드롭 통계는 /stream_clients)
+    status["stream_clients"] = stream_clients.count()
+
+    # /events 실시간 이벤트 구독자 수와 느린 구독자 때문에 버린 이벤트 수
+    status["event_stream"] = event_bus.get_stats()
+
+    # 시스템 상태 (백그라운드 샘플러의 마지막 값 - 요청 중에 기다리지 않음)
+    status["system"] = {
+        **system_monitor.latest(),
+        "platform": platform.system(),
+        "python_version": platform.python_version()
+    }
+
+    # 카메라 간 배치 추론 통계
+    if camera_manager.yolo is not None and camera_manager.yolo.scheduler is not None:
+        status["batch_inference"] = camera_manager.yolo.scheduler.get_stats()
     
     return status
 
@@ -30,4 +101,26 @@ def status():
     시스템 상태 반환 라우트
     - 카메라 연결 상태 등 get_status() 결과를 JSON으로 반환
     """
-    return jsonify(get_status()) 
\ No newline at end of file
+    return jsonify(get_status())
+
+@status_bp.route("/system_stats")
+def system_stats():
+    """
+    시스템 상태 시계열 반환 라우트 (CPU/코어별 사용률, 메모리, 디스크, SoC 온도, 프로세스 RSS)
+    - ?seconds=60 으로 최근 구간만 요청할 수 있습니다.
+    """
+    seconds = request.args.get("seconds", type=float)  # 숫자가 아니면 None (전체)
+    return jsonify({
+        "interval": system_monitor.interval,
+        "latest": system_monitor.latest(),
+        "history": system_monitor.history(seconds)
+    })
+
+@status_bp.route("/metrics")
+def prometheus_metrics():
+    """
+    파이프라인 지표 반환 라우트 (Prometheus 텍스트 형식)
+    - 단계별 처리 시간 히스토그램: capture / yolo_detect / opencv_detect / draw / encode
+    - 캡처/드롭/탐지 카운터
+    """
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,84 @@
+# /home/pi/autocarz/src/routes/stream_routes.py
+# 스트림 시청자 목록(/stream_clients)과 WebSocket 영상 스트림(/ws/video_feed) 라우트 담당
+
+import time
+from flask import Blueprint, jsonify, request
+from camera.camera_manager import camera_manager
+from camera.stream_clients import stream_clients
+from camera.stream_profile import parse_stream_profile
+
+# WebSocket은 선택 기능입니다 (pip install flask-sock 설치 시에만 활성화)
+try:
+    from flask_sock import Sock
+    WEBSOCKET_AVAILABLE = True
+except ImportError:
+    Sock = None
+    WEBSOCKET_AVAILABLE = False
+
+stream_bp = Blueprint('stream', __name__)
+
+@stream_bp.route("/stream_clients")
+def get_stream_clients():
+    """
+    연결된 스트림 시청자 목록과 클라이언트별 전송/드롭 통계 반환 라우트
+    - dropped: 클라이언트가 느려서 건너뛴 프레임 수 (대기열 없이 최신 프레임으로 건너뜀)
+    - throttled: 요청한 max_fps 때문에 건너뛴 프레임 수
+    """
+    clients = stream_clients.snapshot()
+    return jsonify({
+        "clients": clients,
+        "total_count": len(clients),
+        "max_clients": stream_clients.max_clients,
+        "rejected_count": stream_clients.rejected_count,
+        "websocket_available": WEBSOCKET_AVAILABLE
+    })
+
+def _stream_websocket(ws, camera_index):
+    """
+    WebSocket으로 JPEG 바이트를 바이너리 메시지 1개씩 보냅니다.
+    - ws.send()가 막히는 동안 쌓이는 프레임은 없고, 다음에는 최신 프레임을 보냅니다.
+    """
+    try:
+        profile = parse_stream_profile(request.args)
+    except ValueError as e:
+        ws.close(reason=1008, message=f"잘못된 스트림 프로필: {e}")
+        return
+
+    client = stream_clients.register(camera_index, profile, 'websocket', request.remote_addr)
+    if client is None:
+        # 1013: Try Again Later
+        ws.close(reason=1013, message=f"동시 시청자 수 제한({stream_clients.max_clients}명)을 초과했습니다")
+        return
+    try:
+        for encoded in camera_manager.iter_encoded(camera_index, profile, client):
+            start = time.perf_counter()
+            ws.send(encoded.jpeg)
+            client.record_sent(encoded, time.perf_counter() - start)
+    except Exception as e:
+        # 클라이언트가 연결을 끊으면 send()에서 예외가 발생합니다.
+        print(f"ℹ️ WebSocket 스트림 종료 (클라이언트 #{client.client_id}): {e}")
+    finally:
+        stream_clients.unregister(client)
+
+def register_websocket_routes(app):
+    """
+    WebSocket 영상 스트림 라우트를 등록합니다 (flask-sock이 없으면 건너뜀)
+    - /ws/video_feed, /ws/video_feed/<camera_index>
+    - MJPEG와 같은 프로필 쿼리(?scale=&quality=&fps=)를 지원합니다.
+    return: 등록 여부
+    """
+    if not WEBSOCKET_AVAILABLE:
+        print("ℹ️ flask-sock이 설치되지 않아 WebSocket 스트림(/ws/video_feed)은 비활성화됩니다.")
+        return False
+
+    sock = Sock(app)
+
+    @sock.route('/ws/video_feed')
+    def ws_video_feed(ws):
+        _stream_websocket(ws, None)
+
+    @sock.route('/ws/video_feed/<int:camera_index>')
+    def ws_video_feed_camera(ws, camera_index):
+        _stream_websocket(ws, camera_index)
+
+    return True
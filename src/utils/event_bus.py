@@ -0,0 +1,110 @@
+# /home/pi/autocarz/src/utils/event_bus.py
+# 카메라 상태 변경, 탐지, 시스템 상태를 구독자(/events SSE 연결)에게 밀어주는 이벤트 버스
+
+import json
+import queue
+import threading
+import itertools
+
+class EventSubscription:
+    def __init__(self, bus, max_queue):
+        """구독자 1명의 대기열 (가득 차면 가장 오래된 이벤트부터 버림)"""
+        self._bus = bus
+        self._queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def _offer(self, event):
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                # 느린 구독자가 게시자(캡처/추론 스레드)를 막지 않도록 오래된 이벤트를 버립니다.
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """
+        다음 이벤트를 기다립니다.
+        return: (id, 이벤트 종류, 데이터) 또는 시간 초과 시 None
+        """
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._bus._unsubscribe(self)
+
+class EventBus:
+    def __init__(self, max_queue=100):
+        """
+        1:N 이벤트 버스
+        max_queue: 구독자별 최대 대기 이벤트 수
+        - publish()는 구독자 수와 관계없이 기다리지 않습니다.
+        - 종류별 마지막 이벤트를 보관해 새 구독자가 접속하자마자 현재 상태를 받을 수 있습니다.
+        """
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._retained = {}
+        self._ids = itertools.count(1)
+        self.published_count = 0
+
+    def publish(self, event_type, data, retain=False):
+        """
+        이벤트를 모든 구독자에게 보냅니다.
+        event_type: 이벤트 종류 ('camera', 'cameras', 'detection', 'system' 등)
+        data: JSON으로 변환 가능한 값
+        retain: True면 새 구독자에게도 마지막 값을 보냅니다 (상태성 이벤트)
+        """
+        event = (next(self._ids), event_type, data)
+        with self._lock:
+            if retain:
+                self._retained[event_type] = event
+            subscribers = list(self._subscribers)
+            self.published_count += 1
+        for subscription in subscribers:
+            subscription._offer(event)
+
+    def subscribe(self):
+        """
+        새 구독을 만듭니다 (보관 중인 상태 이벤트가 먼저 들어 있음)
+        return: EventSubscription - 끝나면 반드시 close()
+        """
+        subscription = EventSubscription(self, self.max_queue)
+        with self._lock:
+            for event in sorted(self._retained.values()):
+                subscription._offer(event)
+            self._subscribers.append(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def get_stats(self):
+        """상태 API용 통계"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        return {
+            "subscribers": len(subscribers),
+            "published": self.published_count,
+            "dropped": sum(s.dropped for s in subscribers)
+        }
+
+def format_sse(event_id, event_type, data):
+    """이벤트를 text/event-stream 형식 조각으로 만듭니다."""
+    payload = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    return f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n"
+
+# 전역 이벤트 버스
+event_bus = EventBus()
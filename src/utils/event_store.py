@@ -0,0 +1,278 @@
+# /home/pi/autocarz/src/utils/event_store.py
+# 탐지 이력 저장소 (SQLite WAL + 백그라운드 일괄 쓰기) - 산양 출현 기록 조회용
+
+import os
+import time
+import queue
+import atexit
+import sqlite3
+import threading
+from utils.settings_manager import load_config, resolve_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS detections (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    camera INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    class_name TEXT NOT NULL,
+    conf REAL NOT NULL,
+    x1 INTEGER NOT NULL,
+    y1 INTEGER NOT NULL,
+    x2 INTEGER NOT NULL,
+    y2 INTEGER NOT NULL,
+    track_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_detections_ts ON detections (ts);
+CREATE INDEX IF NOT EXISTS idx_detections_class_ts ON detections (class_name, ts);
+"""
+
+INSERT_SQL = (
+    "INSERT INTO detections (ts, camera, source, class_name, conf, x1, y1, x2, y2, track_id) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+COLUMNS = ('id', 'ts', 'camera', 'source', 'class_name', 'conf', 'x1', 'y1', 'x2', 'y2', 'track_id')
+
+class DetectionEventStore:
+    def __init__(self, db_path, batch_size=200, flush_interval=1.0, max_queue=10000, track_record_interval=5.0):
+        """
+        추가 전용(append-only) 탐지 이력 저장소
+        db_path: SQLite 파일 경로
+        batch_size: 한 번에 묶어서 쓸 최대 행 수
+        flush_interval: 행이 적어도 이 시간(초)마다 디스크에 씁니다
+        max_queue: 쓰기 대기열 최대 길이 (디스크가 느려 넘치면 새 기록을 버리고 dropped_count 증가)
+        track_record_interval: 같은 추적 객체를 다시 기록하기까지의 최소 간격(초, 0이면 매번 기록)
+        - record()는 대기열에 넣기만 하므로 추론 워커/캡처 루프가 디스크를 기다리지 않습니다.
+        - 추적 ID가 있는 박스는 새 트랙이 생기거나 클래스가 바뀔 때, 그리고 그 뒤로는 간격마다 한 번만 기록합니다.
+          (머물러 있는 산양 한 마리가 탐지 주기마다 행을 쌓지 않도록)
+        - WAL 모드라 쓰는 동안에도 /detections 조회가 막히지 않습니다.
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.track_record_interval = track_record_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._stop = threading.Event()
+        self._started = False
+        self._start_lock = threading.Lock()
+
+        # 트랙별 마지막 기록: {(카메라, 소스, 트랙 ID): (기록 시각, 클래스)} - 여러 카메라의 추론 워커가 함께 사용
+        self._track_lock = threading.Lock()
+        self._last_recorded = {}
+
+        # 상태 확인용 통계
+        self.written_count = 0
+        self.dropped_count = 0
+        self.skipped_count = 0
+        self.batch_count = 0
+        self.last_flush_ms = 0.0
+
+    # --- 연결/시작 ---
+
+    def _connect(self):
+        connection = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def start(self):
+        """
+        DB 파일과 테이블을 준비하고 백그라운드 쓰기 스레드를 시작합니다.
+        return: 성공 여부
+        """
+        with self._start_lock:
+            if self._started:
+                return True
+            try:
+                directory = os.path.dirname(self.db_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                connection = self._connect()
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.executescript(SCHEMA)
+                connection.close()
+            except sqlite3.Error as e:
+                print(f"❌ 탐지 이력 DB 준비 실패 ({self.db_path}): {e}")
+                return False
+
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._writer_loop, name="event-store-writer", daemon=True)
+            self._thread.start()
+            self._started = True
+            # 종료 시 대기열에 남은 기록을 마저 씁니다.
+            atexit.register(self.stop)
+            print(f"🗃️ 탐지 이력 저장소 시작: {self.db_path}")
+            return True
+
+    def stop(self, timeout=5.0):
+        """쓰기 스레드를 멈추고 남은 기록을 모두 씁니다."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+        self._started = False
+
+    @property
+    def is_running(self):
+        return self._started
+
+    # --- 기록 ---
+
+    def record(self, camera_index, source, boxes, timestamp, track_ids=None):
+        """
+        탐지 결과를 쓰기 대기열에 넣습니다 (즉시 반환)
+        camera_index: 카메라 인덱스
+        source: 'yolo' 또는 'opencv'
+        boxes: CameraManager.extract_boxes() 형식의 박스 리스트 (전체 프레임 좌표)
+        timestamp: 프레임 캡처 시각 (epoch 초)
+        track_ids: 박스별 추적 ID 리스트 (없으면 None - 모든 박스를 기록)
+        """
+        for i, box_info in enumerate(boxes):
+            track_id = track_ids[i] if track_ids else None
+            if track_id is not None and not self._should_record(camera_index, source, track_id,
+                                                                box_info['class_name'], timestamp):
+                self.skipped_count += 1
+                continue
+            x1, y1, x2, y2 = box_info['coords']
+            row = (float(timestamp), int(camera_index), source, box_info['class_name'], float(box_info['conf']),
+                   int(x1), int(y1), int(x2), int(y2), track_id)
+            try:
+                self._queue.put_nowait(row)
+            except queue.Full:
+                self.dropped_count += 1
+
+    def _should_record(self, camera_index, source, track_id, class_name, timestamp):
+        # 새 트랙, 클래스가 바뀐 트랙, 마지막 기록 후 track_record_interval이 지난 트랙만 기록합니다.
+        key = (camera_index, source, track_id)
+        with self._track_lock:
+            last = self._last_recorded.get(key)
+            if last is not None and last[1] == class_name and timestamp - last[0] < self.track_record_interval:
+                return False
+            self._last_recorded[key] = (timestamp, class_name)
+            if len(self._last_recorded) > 1000:
+                # 끝난 트랙 정리 (트랙 ID는 재사용되지 않으므로 오래된 항목은 다시 쓰이지 않음)
+                cutoff = timestamp - max(self.track_record_interval, 60.0)
+                self._last_recorded = {k: v for k, v in self._last_recorded.items() if v[0] >= cutoff}
+            return True
+
+    def _writer_loop(self):
+        connection = self._connect()
+        # WAL에서는 NORMAL로도 DB가 깨지지 않으며, 커밋마다 fsync를 기다리지 않습니다.
+        connection.execute("PRAGMA synchronous=NORMAL")
+        try:
+            while not self._stop.is_set() or not self._queue.empty():
+                batch = self._collect_batch()
+                if batch:
+                    self._flush(connection, batch)
+        finally:
+            connection.close()
+
+    def _collect_batch(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+            if self._stop.is_set() and self._queue.empty():
+                break
+        return batch
+
+    def _flush(self, connection, batch):
+        start = time.perf_counter()
+        try:
+            with connection:
+                connection.executemany(INSERT_SQL, batch)
+            self.written_count += len(batch)
+            self.batch_count += 1
+        except sqlite3.Error as e:
+            self.dropped_count += len(batch)
+            print(f"❌ 탐지 이력 쓰기 실패 ({len(batch)}건): {e}")
+        self.last_flush_ms = (time.perf_counter() - start) * 1000
+
+    # --- 조회 ---
+
+    def _where(self, start=None, end=None, class_name=None, camera=None, source=None, min_conf=None):
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(float(start))
+        if end is not None:
+            clauses.append("ts < ?")
+            params.append(float(end))
+        if class_name:
+            names = [name for name in class_name.split(',') if name]
+            clauses.append(f"class_name IN ({','.join('?' * len(names))})")
+            params.extend(names)
+        if camera is not None:
+            clauses.append("camera = ?")
+            params.append(int(camera))
+        if source:
+            clauses.append("source = ?")
+            params.append(source)
+        if min_conf is not None:
+            clauses.append("conf >= ?")
+            params.append(float(min_conf))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, limit=100, offset=0, **filters):
+        """
+        탐지 이력을 최신순으로 조회합니다.
+        limit, offset: 페이지 크기와 시작 위치
+        filters: start, end (epoch 초), class_name (쉼표로 여러 개), camera, source, min_conf
+        return: {"total", "items": [...]}
+        """
+        where, params = self._where(**filters)
+        connection = self._connect()
+        try:
+            total = connection.execute(f"SELECT COUNT(*) FROM detections{where}", params).fetchone()[0]
+            rows = connection.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM detections{where} ORDER BY ts DESC, id DESC LIMIT ? OFFSET ?",
+                params + [int(limit), int(offset)]
+            ).fetchall()
+        finally:
+            connection.close()
+        return {"total": total, "items": [dict(row) for row in rows]}
+
+    def summary(self, **filters):
+        """
+        클래스별 탐지 수/최대 신뢰도/처음·마지막 시각 요약
+        filters: query()와 같은 필터
+        """
+        where, params = self._where(**filters)
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT class_name, COUNT(*) AS count, MAX(conf) AS max_conf, MIN(ts) AS first_ts, MAX(ts) AS last_ts, "
+                f"COUNT(DISTINCT track_id) AS tracks FROM detections{where} GROUP BY class_name ORDER BY count DESC",
+                params
+            ).fetchall()
+        finally:
+            connection.close()
+        return [dict(row) for row in rows]
+
+    def get_stats(self):
+        """상태 API용 통계"""
+        return {
+            "db_path": self.db_path,
+            "running": self._started,
+            "queued": self._queue.qsize(),
+            "written": self.written_count,
+            "dropped": self.dropped_count,
+            "skipped_repeats": self.skipped_count,
+            "batches": self.batch_count,
+            "last_flush_ms": round(self.last_flush_ms, 2)
+        }
+
+# 전역 탐지 이력 저장소 (config.ini [EVENTS] DB_PATH, TRACK_RECORD_INTERVAL - 파일은 start() 호출 시 생성)
+_config = load_config()
+event_store = DetectionEventStore(
+    resolve_path(_config.get('EVENTS', 'DB_PATH', fallback='../data/detections.db')),
+    track_record_interval=_config.getfloat('EVENTS', 'TRACK_RECORD_INTERVAL', fallback=5.0)
+)
@@ -0,0 +1,211 @@
+# /home/pi/autocarz/src/utils/metrics.py
+# 파이프라인 단계별 시간/카운터 수집 + Prometheus 텍스트 형식 출력 (/metrics)
+
+import bisect
+import threading
+from collections import deque
+
+# 단계별 처리 시간 구간 (초) - 라즈베리파이의 느린 추론(수백 ms)까지 포함
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+def _format_value(value):
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _CounterChild:
+    __slots__ = ('_lock', 'value')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+class _HistogramChild:
+    __slots__ = ('_lock', '_bounds', 'buckets', 'sum', 'count', 'samples')
+
+    def __init__(self, bounds, sample_limit=0):
+        self._lock = threading.Lock()
+        self._bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)   # 마지막 칸은 +Inf (누적은 출력할 때 계산)
+        self.sum = 0.0
+        self.count = 0
+        # 원본 값 보관 (벤치마크의 정확한 백분위 계산용, 평소에는 꺼져 있음)
+        self.samples = deque(maxlen=sample_limit) if sample_limit else None
+
+    def observe(self, value):
+        index = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self.buckets[index] += 1
+            self.sum += value
+            self.count += 1
+            if self.samples is not None:
+                self.samples.append(value)
+
+    def drain_samples(self):
+        """보관된 원본 값을 꺼내고 비웁니다."""
+        with self._lock:
+            if self.samples is None:
+                return []
+            values = list(self.samples)
+            self.samples.clear()
+            return values
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children = {}
+
+    def labels(self, *labelvalues, **labelkwargs):
+        """
+        레이블 값에 해당하는 하위 지표를 반환합니다.
+        - 뜨거운 루프에서는 한 번 받아 둔 하위 지표를 재사용하면 조회 비용도 없습니다.
+        """
+        if labelkwargs:
+            labelvalues = tuple(labelkwargs[name] for name in self.labelnames)
+        key = tuple(str(v) for v in labelvalues)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name}: 레이블 {self.labelnames} 값이 필요합니다")
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._children[key] = self._new_child()
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _items(self):
+        with self._lock:
+            return sorted(self._children.items())
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._render_samples())
+        return lines
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        """레이블이 없는 카운터용"""
+        self.labels().inc(amount)
+
+    def _render_samples(self):
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+            for key, child in self._items()
+        ]
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.bounds = tuple(sorted(buckets))
+        self.sample_limit = 0
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds, self.sample_limit)
+
+    def enable_samples(self, limit=100000):
+        """
+        구간 집계와 별도로 최근 원본 값을 보관합니다 (벤치마크에서 백분위 계산용)
+        limit: 하위 지표별 최대 보관 개수
+        """
+        with self._lock:
+            self.sample_limit = limit
+            for child in self._children.values():
+                with child._lock:
+                    child.samples = deque(child.samples or (), maxlen=limit)
+
+    def drain_samples(self):
+        """
+        모든 하위 지표의 원본 값을 꺼내고 비웁니다.
+        return: {레이블 값 튜플: [값, ...]}
+        """
+        return {key: child.drain_samples() for key, child in self._items()}
+
+    def observe(self, value):
+        """레이블이 없는 히스토그램용"""
+        self.labels().observe(value)
+
+    def _render_samples(self):
+        lines = []
+        for key, child in self._items():
+            with child._lock:
+                buckets, total, count = list(child.buckets), child.sum, child.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.bounds + (float('inf'),), buckets):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ('le', _format_value(float(bound))))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        """지표 목록 (이름 순서대로 /metrics에 출력)"""
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"이미 등록된 지표입니다: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self):
+        """Prometheus 텍스트 형식(version 0.0.4)으로 모든 지표를 출력합니다."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+# 전역 지표 레지스트리
+metrics = MetricsRegistry()
+
+# --- 파이프라인 공통 지표 ---
+# stage: capture(cap.read) / decode(MJPEG 패스스루 프레임 디코딩) / yolo_detect(YoloDetector.detect) / opencv_detect(detect_yolo_objects) / draw / encode
+stage_seconds = metrics.histogram(
+    'autocarz_stage_seconds', '파이프라인 단계별 처리 시간(초)', ['stage'])
+frames_captured = metrics.counter(
+    'autocarz_frames_captured_total', '카메라에서 읽은 프레임 수', ['camera'])
+# reason: read_failed(카메라 읽기 실패) / inference_busy(추론 중이라 대기 프레임 교체) / stream_client(느린 시청자가 건너뜀)
+frames_dropped = metrics.counter(
+    'autocarz_frames_dropped_total', '버려진 프레임 수', ['camera', 'reason'])
+detections = metrics.counter(
+    'autocarz_detections_total', '탐지된 객체 수', ['camera', 'source'])
@@ -1,21 +1,251 @@
 # /home/pi/autocarz/src/utils/settings_manager.py
 # 설정 파일 로드/저장, flip/detection 세팅 관리 담당
-# 실제 구현 필요(TODO) 부분 명확히 표시
+# config.ini는 기본값, 화면에서 바꾼 값은 settings.json에 저장하고 실행 중인 CameraManager에 바로 적용합니다.
+
+import os
+import json
+import threading
+import configparser
+
+# src/ 폴더와 프로젝트 루트 경로
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_ROOT = os.path.dirname(SRC_DIR)
+CONFIG_PATH = os.path.join(PROJECT_ROOT, 'config.ini')
+# 화면에서 변경한 설정 (config.ini의 주석을 지우지 않도록 따로 저장)
+SETTINGS_PATH = os.path.join(PROJECT_ROOT, 'settings.json')
+
+def load_config(path=CONFIG_PATH):
+    """
+    config.ini를 읽어 ConfigParser 객체로 반환합니다.
+    path: 설정 파일 경로 (기본값: 프로젝트 루트의 config.ini)
+    - 값 뒤에 붙은 '# 설명' 주석은 자동으로 제거됩니다.
+    """
+    config = configparser.ConfigParser(inline_comment_prefixes=('#',))
+    config.read(path, encoding='utf-8')
+    return config
+
+def resolve_path(path):
+    """
+    설정 파일의 상대 경로를 실제 경로로 바꿉니다.
+    - 현재 작업 폴더 기준으로 먼저 찾고, 없으면 src/ 기준(예: ../models/best.pt)으로 해석합니다.
+    """
+    if not path or os.path.isabs(path) or os.path.exists(path):
+        return path
+    return os.path.normpath(os.path.join(SRC_DIR, path))
+
+def _to_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+def _range(cast, low, high):
+    def convert(value):
+        value = cast(value)
+        if not low <= value <= high:
+            raise ValueError(f"{low}~{high} 범위여야 합니다")
+        return value
+    return convert
+
+def _imgsz(value):
+    value = _range(int, 160, 1280)(value)
+    if value % 32:
+        raise ValueError("32의 배수여야 합니다")
+    return value
+
+def _quality(value):
+    """JPEG 품질 - 범위를 벗어나면 거절하지 않고 10~95로 맞추고, 스트림 프로필처럼 5 단위로 반올림"""
+    value = max(10, min(95, int(value)))
+    return int(round(value / 5) * 5)
+
+def _resolution(value):
+    """'1280x720' 형식 (빈 문자열이면 플랫폼 기본 해상도)"""
+    value = str(value).strip().lower()
+    if not value:
+        return ""
+    width, height = (int(v) for v in value.split('x'))
+    if not (160 <= width <= 3840 and 120 <= height <= 2160):
+        raise ValueError("160x120 ~ 3840x2160 범위여야 합니다")
+    return f"{width}x{height}"
+
+def _rotation(value):
+    value = int(value)
+    if value not in (0, 90, 180, 270):
+        raise ValueError("0, 90, 180, 270 중 하나여야 합니다")
+    return value
+
+# 카메라별 ROI 다각형을 저장하는 settings.json 섹션 ({"카메라 인덱스": [[[x, y], ...], ...]})
+# 항목이 카메라 수만큼 늘어나므로 SETTINGS_SCHEMA 대신 get_roi()/set_roi()로 다룹니다.
+ROI_SECTION = 'roi'
+
+# 섹션별 설정 항목: {이름: (변환/검사 함수, config.ini 위치(섹션, 키), 기본값)}
+SETTINGS_SCHEMA = {
+    'detection': {
+        'yolo_enabled': (_to_bool, None, True),
+        'opencv_enabled': (_to_bool, None, True),
+        'show_fps': (_to_bool, None, True),
+        'quality': (_quality, None, 85),                          # 기본 스트림 JPEG 품질 (10~95, 5 단위)
+        'fps_limit': (_range(int, 0, 60), ('CAMERA', 'FPS'), 0),   # 0이면 플랫폼 기본값
+        'resolution': (_resolution, ('CAMERA', 'RESOLUTION'), ""),  # 빈 값이면 플랫폼 기본값
+        'confidence': (_range(float, 0.01, 0.99), ('YOLO', 'CONFIDENCE_THRESHOLD'), 0.25),
+        'iou': (_range(float, 0.01, 0.99), ('YOLO', 'IOU_THRESHOLD'), 0.7),
+        'imgsz': (_imgsz, ('YOLO', 'IMGSZ'), 640)
+    },
+    'flip': {
+        'horizontal': (_to_bool, None, False),
+        'vertical': (_to_bool, None, False),
+        'rotation': (_rotation, None, 0)
+    }
+}
+
+class SettingsStore:
+    def __init__(self, config_path=CONFIG_PATH, settings_path=SETTINGS_PATH):
+        """
+        화면에서 바꾸는 설정 저장소
+        config_path: 기본값을 읽을 config.ini
+        settings_path: 변경한 값만 저장하는 JSON 파일
+        - 저장은 임시 파일에 쓴 뒤 교체(os.replace)하므로 전원이 나가도 파일이 반쯤 쓰인 채로 남지 않습니다.
+        - 값이 바뀌면 등록된 리스너(CameraManager.apply_settings)에 바뀐 항목만 알려줍니다.
+        """
+        self.config_path = config_path
+        self.settings_path = settings_path
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._overrides = {}
+        self._values = {}
+        self.load()
+
+    def load(self):
+        """config.ini 기본값 위에 settings.json의 변경값을 덮어 씁니다."""
+        config = load_config(self.config_path)
+        overrides = {}
+        if os.path.exists(self.settings_path):
+            try:
+                with open(self.settings_path, encoding='utf-8') as f:
+                    overrides = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ 설정 파일을 읽을 수 없어 config.ini 값을 사용합니다 ({self.settings_path}): {e}")
+
+        values = {}
+        for section, fields in SETTINGS_SCHEMA.items():
+            values[section] = {}
+            for name, (convert, ini_key, default) in fields.items():
+                value = default
+                if ini_key is not None and config.has_option(*ini_key):
+                    value = config.get(*ini_key)
+                if name in overrides.get(section, {}):
+                    value = overrides[section][name]
+                try:
+                    values[section][name] = convert(value)
+                except (TypeError, ValueError) as e:
+                    print(f"⚠️ 잘못된 설정값 {section}.{name}={value!r} ({e}) - 기본값 {default!r} 사용")
+                    values[section][name] = default
+        with self._lock:
+            self._overrides = {section: dict(items) for section, items in overrides.items()
+                               if section in SETTINGS_SCHEMA or section == ROI_SECTION}
+            self._values = values
+
+    def get(self, section, name):
+        return self._values[section][name]
+
+    def get_section(self, section):
+        return dict(self._values[section])
+
+    def get_roi(self, camera_index):
+        """저장된 카메라별 ROI 다각형 (없으면 빈 리스트 = 전체 프레임)"""
+        return self._overrides.get(ROI_SECTION, {}).get(str(camera_index), [])
+
+    def set_roi(self, camera_index, polygons):
+        """
+        카메라별 ROI 다각형을 저장합니다.
+        polygons: RoiMask로 검사한 정규화 좌표 (빈 리스트면 저장된 ROI를 지움)
+        """
+        with self._lock:
+            rois = self._overrides.setdefault(ROI_SECTION, {})
+            if polygons:
+                rois[str(camera_index)] = polygons
+            else:
+                rois.pop(str(camera_index), None)
+            self._save_locked()
+
+    def add_listener(self, callback):
+        """callback(section, changed): 설정이 바뀔 때마다 호출 (changed = {이름: 새 값})"""
+        self._listeners.append(callback)
+
+    def update(self, section, data):
+        """
+        설정을 검사해 저장하고 리스너에 알립니다.
+        section: 'detection' 또는 'flip'
+        data: {이름: 값} - 모르는 항목은 무시합니다.
+        return: 실제로 바뀐 항목 {이름: 새 값}
+        - 값이 잘못되면 아무것도 저장하지 않고 ValueError를 발생시킵니다.
+        """
+        fields = SETTINGS_SCHEMA.get(section)
+        if fields is None:
+            raise ValueError(f"알 수 없는 설정 섹션입니다: {section}")
+        if not isinstance(data, dict):
+            raise ValueError("설정값은 JSON 객체여야 합니다")
+
+        converted = {}
+        for name, value in data.items():
+            if name not in fields:
+                continue
+            try:
+                converted[name] = fields[name][0](value)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"{name}: {e}")
+
+        with self._lock:
+            changed = {name: value for name, value in converted.items() if self._values[section][name] != value}
+            if not changed:
+                return {}
+            self._values[section] = {**self._values[section], **changed}
+            self._overrides.setdefault(section, {}).update(changed)
+            self._save_locked()
+
+        for callback in list(self._listeners):
+            callback(section, changed)
+        return changed
+
+    def _save_locked(self):
+        directory = os.path.dirname(self.settings_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.settings_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._overrides, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.settings_path)
+
+# 전역 설정 저장소
+settings_store = SettingsStore()
+
+def _save_section(section, data, label):
+    try:
+        changed = settings_store.update(section, data)
+    except ValueError as e:
+        return {"success": False, "message": f"잘못된 {label} 값 - {e}"}
+    except OSError as e:
+        return {"success": False, "message": f"{label} 파일 저장 실패: {e}"}
+    if not changed:
+        return {"success": True, "message": f"{label} 변경 사항 없음", "changed": {}}
+    return {"success": True, "message": f"{label} 저장 및 적용 완료 ({', '.join(changed)})", "changed": changed}
 
 def save_flip_settings(data):
     """
     카메라 flip(반전/회전) 설정을 저장하는 함수
-    data: 프론트엔드에서 전달된 설정값(dict)
+    data: 프론트엔드에서 전달된 설정값(dict) - horizontal, vertical, rotation
     return: 저장 성공/실패 여부와 메시지(dict)
-    TODO: 실제 파일 저장/적용 로직 구현 필요
+    - 카메라를 다시 열지 않고 다음 프레임부터 적용됩니다.
     """
-    return {"success": True, "message": "설정 저장(임시)"}
+    return _save_section('flip', data, "카메라 설정")
 
 def save_detection_settings(data):
     """
     AI(객체 인식) 관련 설정을 저장하는 함수
-    data: 프론트엔드에서 전달된 설정값(dict)
+    data: 프론트엔드에서 전달된 설정값(dict) - yolo_enabled, opencv_enabled, show_fps, quality, fps_limit,
+          resolution, confidence, iou, imgsz
     return: 저장 성공/실패 여부와 메시지(dict)
-    TODO: 실제 파일 저장/적용 로직 구현 필요
+    - 모델을 다시 로드하지 않습니다. 해상도를 바꿀 때만 카메라를 다시 엽니다.
     """
-    return {"success": True, "message": "설정 저장(임시)"} 
\ No newline at end of file
+    return _save_section('detection', data, "검출 설정")
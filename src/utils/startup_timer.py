@@ -0,0 +1,59 @@
+# /home/pi/autocarz/src/utils/startup_timer.py
+# 서버 시작 단계별 소요 시간 측정 (워치독 재시작 후 첫 프레임까지의 시간 확인용)
+
+import time
+import threading
+from contextlib import contextmanager
+
+class StartupTimer:
+    def __init__(self):
+        """
+        시작 단계별 타이머
+        - 단계는 여러 스레드에서 동시에 진행될 수 있습니다 (모델 로딩 ∥ 카메라 열기)
+        - 각 단계의 시작/끝은 프로세스 시작 기준 경과 시간으로 기록됩니다.
+        """
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._phases = []
+        self._marks = {}
+
+    @contextmanager
+    def phase(self, name):
+        """
+        with startup_timer.phase("모델 로딩"): ... 형태로 단계 시간을 기록합니다.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self._phases.append((name, start - self._origin, end - self._origin, threading.current_thread().name))
+
+    def mark(self, name):
+        """특정 시점(예: 첫 프레임)을 기록합니다. 같은 이름은 처음 한 번만 기록됩니다."""
+        with self._lock:
+            self._marks.setdefault(name, time.perf_counter() - self._origin)
+
+    def as_dict(self):
+        """상태 API용 단계별 시간 (ms)"""
+        with self._lock:
+            return {
+                "phases": [
+                    {"name": name, "start_ms": round(start * 1000), "duration_ms": round((end - start) * 1000), "thread": thread}
+                    for name, start, end, thread in self._phases
+                ],
+                "marks_ms": {name: round(t * 1000) for name, t in self._marks.items()}
+            }
+
+    def report(self):
+        """단계별 시간표를 출력합니다."""
+        data = self.as_dict()
+        print("⏱️ 시작 단계별 소요 시간:")
+        for p in sorted(data["phases"], key=lambda p: p["start_ms"]):
+            print(f"   {p['start_ms']:>6}ms ~ +{p['duration_ms']:>5}ms  {p['name']} [{p['thread']}]")
+        for name, t in data["marks_ms"].items():
+            print(f"   {t:>6}ms  ▶ {name}")
+
+# 전역 시작 타이머 (모듈을 처음 import한 시점 기준)
+startup_timer = StartupTimer()
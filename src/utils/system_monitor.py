@@ -0,0 +1,128 @@
+# /home/pi/autocarz/src/utils/system_monitor.py
+# 시스템 상태(CPU, 메모리, 디스크, SoC 온도, 프로세스 메모리)를 백그라운드에서 주기적으로 수집
+
+import os
+import time
+import threading
+from collections import deque
+
+import psutil
+
+from utils.settings_manager import PROJECT_ROOT
+from utils.event_bus import event_bus
+
+# 라즈베리파이 SoC 온도 (밀리도 단위 정수)
+THERMAL_ZONE_PATH = '/sys/class/thermal/thermal_zone0/temp'
+
+class SystemMonitor:
+    def __init__(self, interval=2.0, history_size=300):
+        """
+        시스템 상태 샘플러
+        interval: 수집 주기(초)
+        history_size: 보관할 최근 샘플 수 (기본 300개 = 2초 주기로 10분)
+        - psutil.cpu_percent(interval=1)처럼 요청 처리 중에 기다리는 호출을 없애기 위해
+          백그라운드 스레드가 주기적으로 수집하고, 요청은 마지막 값을 바로 읽어 갑니다.
+        - 디스크는 OS 드라이브(C:\\)가 아니라 클립/탐지 이력이 저장되는 프로젝트 폴더의 디스크를 봅니다.
+        """
+        self.interval = interval
+        self.disk_path = PROJECT_ROOT
+        self._history = deque(maxlen=history_size)
+        self._latest = {}
+        self._process = psutil.Process()
+        self._thread = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        """수집 스레드를 시작합니다 (이미 실행 중이면 아무것도 하지 않음)"""
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            # cpu_percent(interval=None)은 직전 호출 이후의 사용률이므로 기준점을 먼저 잡아 둡니다.
+            psutil.cpu_percent(interval=None, percpu=True)
+            self._process.cpu_percent(interval=None)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="system-monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=self.interval + 1.0)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                sample = self._sample()
+            except Exception as e:
+                print(f"⚠️ 시스템 상태 수집 오류: {e}")
+                continue
+            # 딕셔너리를 통째로 교체하므로 읽는 쪽은 잠금 없이 일관된 값을 봅니다.
+            self._latest = sample
+            self._history.append(sample)
+            event_bus.publish('system', sample, retain=True)
+
+    def _sample(self):
+        per_core = psutil.cpu_percent(interval=None, percpu=True)
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage(self.disk_path)
+        sample = {
+            "timestamp": round(time.time(), 3),
+            "cpu_percent": round(sum(per_core) / len(per_core), 1) if per_core else 0.0,
+            "cpu_per_core": per_core,
+            "memory_percent": memory.percent,
+            "memory_available_mb": round(memory.available / (1024 * 1024), 1),
+            "swap_percent": psutil.swap_memory().percent,
+            "disk_percent": round(disk.used / disk.total * 100, 1) if disk.total else 0.0,
+            "disk_free_gb": round(disk.free / (1024 ** 3), 2),
+            "temperature_c": self._read_temperature(),
+            "process_rss_mb": round(self._process.memory_info().rss / (1024 * 1024), 1),
+            "process_cpu_percent": round(self._process.cpu_percent(interval=None), 1),
+            "process_threads": self._process.num_threads()
+        }
+        if hasattr(os, 'getloadavg'):
+            sample["load_average"] = [round(v, 2) for v in os.getloadavg()]
+        return sample
+
+    def _read_temperature(self):
+        """SoC 온도(°C) - 라즈베리파이는 sysfs, 그 외에는 psutil 센서 (없으면 None)"""
+        try:
+            with open(THERMAL_ZONE_PATH) as f:
+                return round(int(f.read().strip()) / 1000, 1)
+        except (OSError, ValueError):
+            pass
+        sensors = getattr(psutil, 'sensors_temperatures', None)
+        if sensors is None:
+            return None
+        try:
+            for entries in sensors().values():
+                if entries:
+                    return round(entries[0].current, 1)
+        except Exception:
+            pass
+        return None
+
+    def latest(self):
+        """
+        마지막 샘플을 즉시 반환합니다 (아직 수집 전이면 빈 딕셔너리)
+        - 처음 호출 시 수집 스레드가 꺼져 있으면 시작합니다.
+        """
+        if self._thread is None:
+            self.start()
+        return self._latest
+
+    def history(self, seconds=None):
+        """
+        최근 샘플 목록 (오래된 것부터)
+        seconds: 최근 몇 초만 반환할지 (None이면 보관 중인 전체)
+        """
+        samples = list(self._history)
+        if seconds is not None:
+            since = time.time() - seconds
+            samples = [s for s in samples if s["timestamp"] >= since]
+        return samples
+
+# 전역 시스템 상태 샘플러 (main.py에서 start() 호출)
+system_monitor = SystemMonitor()
@@ -289,17 +289,107 @@ function setupVideoErrorHandling() {
 // ===========================================
 // 상태 업데이트 및 모니터링
 // ===========================================
+// [수정] 주기적으로 요청(폴링)하지 않고 /events(Server-Sent Events)로 변경 사항을 바로 받습니다.
+// EventSource를 지원하지 않거나 연결이 계속 실패하면 기존 폴링 방식으로 돌아갑니다.
+let eventSource = null;
+let pollingTimers = [];
+
 function startStatusUpdates() {
-  // 5초마다 시스템 상태 체크
-  setInterval(checkSystemStatus, 5000);
+  if (!window.EventSource) {
+    startPolling();
+    return;
+  }
+
+  eventSource = new EventSource("/events");
+
+  eventSource.addEventListener("status", (e) => {
+    handleStatus(JSON.parse(e.data));
+  });
+  eventSource.addEventListener("camera", (e) => {
+    handleCameraState(JSON.parse(e.data));
+  });
+  eventSource.addEventListener("cameras", (e) => {
+    const data = JSON.parse(e.data);
+    console.log("카메라 목록 변경:", data.available_cameras);
+  });
+  eventSource.addEventListener("system", (e) => {
+    handleSystemStats(JSON.parse(e.data));
+  });
+  eventSource.addEventListener("detection", (e) => {
+    handleDetection(JSON.parse(e.data));
+  });
 
+  eventSource.onopen = () => {
+    // 다시 연결되면 폴링은 멈춥니다.
+    stopPolling();
+  };
+  eventSource.onerror = () => {
+    // 브라우저가 자동으로 재연결하지만, 연결이 완전히 닫히면 폴링으로 전환합니다.
+    if (eventSource.readyState === EventSource.CLOSED) {
+      console.warn("/events 연결 종료 - 폴링으로 전환");
+      startPolling();
+    }
+  };
+}
+
+function startPolling() {
+  if (pollingTimers.length > 0) return;
+  // 5초마다 시스템 상태 체크
+  pollingTimers.push(setInterval(checkSystemStatus, 5000));
   // 10초마다 카메라 상태 체크
-  setInterval(updateCurrentCameraStatus, 10000);
+  pollingTimers.push(setInterval(updateCurrentCameraStatus, 10000));
+}
+
+function stopPolling() {
+  pollingTimers.forEach((timer) => clearInterval(timer));
+  pollingTimers = [];
 }
 
 function checkSystemStatus() {
-  // 시스템 상태 체크 로직 (필요시 구현)
-  console.log("시스템 상태 체크 중...");
+  fetch("/status")
+    .then((response) => response.json())
+    .then((data) => handleStatus(data))
+    .catch((error) => {
+      console.error("시스템 상태 가져오기 오류:", error);
+    });
+}
+
+function handleStatus(status) {
+  if (status.system) {
+    handleSystemStats(status.system);
+  }
+}
+
+function handleCameraState(data) {
+  const currentCameraSpan = document.getElementById("currentCamera");
+  if (currentCameraSpan) {
+    currentCameraSpan.textContent = data.camera_name;
+  }
+  updateCameraButtonStates(data.camera_index);
+}
+
+function handleSystemStats(stats) {
+  // 시스템 상태 패널(yolo_opencv.html)의 CPU/메모리/디스크/온도 칸에 표시합니다.
+  const fields = {
+    cpu_usage: stats.cpu_percent,
+    memory_usage: stats.memory_percent,
+    disk_usage: stats.disk_percent,
+  };
+  Object.entries(fields).forEach(([id, value]) => {
+    const element = document.getElementById(id);
+    if (element && value !== undefined) {
+      element.textContent = `${value}%`;
+    }
+  });
+  const temperature = document.getElementById("temperature");
+  if (temperature && stats.temperature_c != null) {
+    temperature.textContent = `${stats.temperature_c}°C`;
+  }
+}
+
+function handleDetection(data) {
+  const names = data.objects.map((o) => `${o.class_name}(${o.conf.toFixed(2)})`);
+  console.log(`[카메라 ${data.camera}] ${data.source} 탐지:`, names.join(", "));
 }
 
 // ===========================================